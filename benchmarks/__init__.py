@@ -0,0 +1 @@
+"""Benchmarks for the talus_aws_utils package."""
@@ -0,0 +1,82 @@
+"""Benchmark the import time of the talus_aws_utils modules.
+
+Every measurement imports the module in a fresh interpreter so that nothing
+is served from ``sys.modules``.
+
+Usage::
+
+    python benchmarks/import_time.py [--repeat N]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from typing import Dict, List
+
+
+MODULES = [
+    "talus_aws_utils.lambda_",
+    "talus_aws_utils.secrets",
+    "talus_aws_utils.s3",
+]
+
+
+def import_time(module: str) -> float:
+    """Import a module in a fresh interpreter and return the time it took.
+
+    Parameters
+    ----------
+    module : str
+        The module to import.
+
+    Returns
+    -------
+    float
+        The import time in seconds.
+
+    """
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    return float(result.stdout)
+
+
+def main(argv: List[str]) -> Dict[str, Dict[str, float]]:
+    """Run the benchmark and print the results as json.
+
+    Parameters
+    ----------
+    argv : List[str]
+        Command line arguments.
+
+    Returns
+    -------
+    Dict[str, Dict[str, float]]
+        Median and minimum import time in seconds per module.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for module in MODULES:
+        timings = [import_time(module) for _ in range(args.repeat)]
+        results[module] = {
+            "median_s": statistics.median(timings),
+            "min_s": min(timings),
+        }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,367 @@
+"""Benchmark the read and write paths of the s3 module.
+
+By default a local moto server is started as the S3 stand-in, so results
+measure the library overhead (serialization, copies, request handling)
+rather than network conditions. Install its dependencies with
+``pip install -r benchmarks/requirements.txt``. Pass --endpoint-url to run
+against another S3-compatible server such as MinIO. The endpoint is set on
+the shared clients with clients.configure_endpoint, and the benchmark
+refuses to run if the clients use any other endpoint.
+
+Results are written as json. Pass a previous result file as --baseline to
+fail (exit code 1) when a case got slower than the given tolerance.
+
+Usage::
+
+    python benchmarks/s3_benchmark.py --output results.json
+    python benchmarks/s3_benchmark.py --baseline results.json --tolerance 0.25
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import socket
+import statistics
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import talus_aws_utils.s3 as s3_utils
+
+from talus_aws_utils.clients import configure_endpoint, get_client
+
+
+def _free_port() -> int:
+    """Get a free local TCP port.
+
+    Returns
+    -------
+    int
+        The port number.
+
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def start_local_s3() -> Tuple[Any, str]:
+    """Start a moto server and point the s3 clients at it.
+
+    Returns
+    -------
+    Tuple[Any, str]
+        The running ThreadedMotoServer and its endpoint url.
+
+    """
+    # Never send real credentials, even to the local server.
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ.pop("AWS_SESSION_TOKEN", None)
+    os.environ.pop("AWS_PROFILE", None)
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+    from moto.server import ThreadedMotoServer
+
+    port = _free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    endpoint_url = f"http://127.0.0.1:{port}"
+    configure_endpoint("s3", endpoint_url)
+    return server, endpoint_url
+
+
+def make_dataframe(rows: int) -> pd.DataFrame:
+    """Create a results-like DataFrame.
+
+    Parameters
+    ----------
+    rows : int
+        Number of rows.
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame with string, int and float columns.
+
+    """
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "peptide": [f"PEPTIDE{i}" for i in range(rows)],
+            "charge": rng.integers(1, 5, rows),
+            "score": rng.random(rows),
+            "intensity": rng.random(rows) * 1e6,
+        }
+    )
+
+
+def measure(
+    func: Callable[[], Any], repeat: int, concurrency: int = 1
+) -> Dict[str, float]:
+    """Time a function, running it concurrency times in parallel per repeat.
+
+    Parameters
+    ----------
+    func : Callable[[], Any]
+        The function to time.
+    repeat : int
+        Number of timed repetitions.
+    concurrency : int
+        Number of parallel calls per repetition. (Default value = 1).
+
+    Returns
+    -------
+    Dict[str, float]
+        Median, minimum and maximum wall time in seconds.
+
+    """
+    timings = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(pool.map(lambda _: func(), range(concurrency)))
+            timings.append(time.perf_counter() - start)
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "max_s": max(timings),
+    }
+
+
+def run_benchmarks(
+    bucket: str, sizes: List[int], concurrencies: List[int], repeat: int
+) -> List[Dict[str, Any]]:
+    """Run all benchmark cases.
+
+    Parameters
+    ----------
+    bucket : str
+        The bucket to read from and write to.
+    sizes : List[int]
+        Object sizes as number of DataFrame rows (or array elements / 10).
+    concurrencies : List[int]
+        Numbers of parallel reads to measure.
+    repeat : int
+        Number of timed repetitions per case.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        One result per case.
+
+    """
+    results = []
+
+    def add(case: Dict[str, Any], nbytes: int, timing: Dict[str, float]) -> None:
+        calls = case.get("concurrency", 1)
+        throughput = nbytes * calls / timing["median_s"] / 1e6
+        results.append(
+            {**case, "bytes": nbytes, **timing, "throughput_mb_s": throughput}
+        )
+        print(json.dumps(results[-1]), file=sys.stderr)
+
+    for rows in sizes:
+        dataframe = make_dataframe(rows)
+        array = np.random.default_rng(0).random(rows * 10)
+        records = dataframe.to_dict(orient="list")
+        prefix = f"bench/{rows}/"
+        cases: List[Tuple[str, str, str, Callable[..., Any], Callable[..., Any]]] = [
+            (
+                "dataframe",
+                fmt,
+                f"{prefix}dataframe.{fmt}",
+                lambda key: s3_utils.write_dataframe(dataframe, bucket, key),
+                lambda key: s3_utils.read_dataframe(bucket, key),
+            )
+            for fmt in ("parquet", "csv", "tsv")
+        ]
+        cases += [
+            (
+                "numpy_array",
+                "npy",
+                f"{prefix}array.npy",
+                lambda key: s3_utils.write_numpy_array(array, bucket, key),
+                lambda key: s3_utils.read_numpy_array(bucket, key),
+            ),
+            (
+                "joblib",
+                "joblib",
+                f"{prefix}model.joblib",
+                lambda key: s3_utils.write_joblib({"weights": array}, bucket, key),
+                lambda key: s3_utils.read_joblib(bucket, key),
+            ),
+            (
+                "json",
+                "json",
+                f"{prefix}records.json",
+                lambda key: s3_utils.write_json(records, bucket, key),
+                lambda key: s3_utils.read_json(bucket, key),
+            ),
+        ]
+
+        for name, fmt, key, write, read in cases:
+            case = {"format": fmt, "rows": rows}
+            timing = measure(lambda: write(key), repeat)
+            nbytes = int(s3_utils.file_size(bucket=bucket, key=key, raw_size=True))
+            add({"name": f"write_{name}", **case}, nbytes, timing)
+            for concurrency in concurrencies:
+                timing = measure(lambda: read(key), repeat, concurrency)
+                add(
+                    {"name": f"read_{name}", **case, "concurrency": concurrency},
+                    nbytes,
+                    timing,
+                )
+
+    for n_keys in (100, 1000):
+        prefix = f"bench/listing/{n_keys}/"
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(
+                pool.map(
+                    lambda i: s3_utils.write_json({}, bucket, f"{prefix}{i:06d}.json"),
+                    range(n_keys),
+                )
+            )
+        timing = measure(lambda: s3_utils.file_keys_in_bucket(bucket, prefix), repeat)
+        add({"name": "file_keys_in_bucket", "keys": n_keys}, 0, timing)
+
+    return results
+
+
+def _case_key(result: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Identify a benchmark case independent of its timings.
+
+    Parameters
+    ----------
+    result : Dict[str, Any]
+        A benchmark result.
+
+    Returns
+    -------
+    Tuple[Any, ...]
+        The case identifier.
+
+    """
+    return tuple(
+        result.get(field) for field in ("name", "format", "rows", "keys", "concurrency")
+    )
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float
+) -> List[str]:
+    """Find cases whose median time regressed compared to a baseline.
+
+    Parameters
+    ----------
+    results : List[Dict[str, Any]]
+        The current results.
+    baseline : List[Dict[str, Any]]
+        The baseline results.
+    tolerance : float
+        Allowed relative slowdown, e.g. 0.25 for 25%.
+
+    Returns
+    -------
+    List[str]
+        A description of every regression.
+
+    """
+    baseline_by_case = {_case_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = baseline_by_case.get(_case_key(result))
+        if before and result["median_s"] > before["median_s"] * (1 + tolerance):
+            regressions.append(
+                f"{_case_key(result)}: {before['median_s']:.4f}s -> "
+                f"{result['median_s']:.4f}s"
+            )
+    return regressions
+
+
+def main(argv: List[str]) -> int:
+    """Run the benchmarks.
+
+    Parameters
+    ----------
+    argv : List[str]
+        Command line arguments.
+
+    Returns
+    -------
+    int
+        The exit code, 1 if a regression against the baseline was found.
+
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--endpoint-url", help="Use this S3 endpoint instead of moto.")
+    parser.add_argument("--bucket", default="talus-aws-utils-benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results to this json file.")
+    parser.add_argument("--baseline", help="Compare against this results file.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    server: Optional[Any] = None
+    if args.endpoint_url:
+        expected = args.endpoint_url
+        configure_endpoint("s3", expected)
+    else:
+        server, expected = start_local_s3()
+    endpoint = get_client("s3").meta.endpoint_url
+    if endpoint != expected:
+        if server is not None:
+            server.stop()
+        raise SystemExit(f"Refusing to run against unexpected endpoint {endpoint}.")
+
+    try:
+        if server is not None:
+            get_client("s3").create_bucket(Bucket=args.bucket)
+        results = run_benchmarks(
+            bucket=args.bucket,
+            sizes=args.sizes,
+            concurrencies=args.concurrency,
+            repeat=args.repeat,
+        )
+    finally:
+        if server is not None:
+            server.stop()
+
+    report = {
+        "metadata": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "endpoint": endpoint,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
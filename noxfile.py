@@ -173,6 +173,8 @@ def tests(session: Session) -> None:
         "moto",
         "boto3-stubs[s3]",
         "data-science-types",
+        "scipy",
+        "orjson",
     )
     try:
         session.run("coverage", "run", "--parallel", "-m", "pytest", *session.posargs)
@@ -219,6 +221,8 @@ def typeguard(session: Session) -> None:
         "moto",
         "boto3-stubs[s3]",
         "data-science-types",
+        "scipy",
+        "orjson",
     )
     session.run("pytest", f"--typeguard-packages={package}", *session.posargs)
 
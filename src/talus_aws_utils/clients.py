@@ -0,0 +1,154 @@
+"""src/talus_aws_utils/clients.py module."""
+import threading
+
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+
+from botocore.config import Config
+
+from talus_aws_utils import metrics, tracing
+
+
+# Connection pool size per client. boto3 defaults to 10, which throttles the
+# thread pools used for concurrent transfers.
+MAX_POOL_CONNECTIONS = 50
+
+RETRY_MODES = ("legacy", "standard", "adaptive")
+
+_CLIENTS: Dict[Tuple[str, Optional[str]], Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+_CONFIG = Config(max_pool_connections=MAX_POOL_CONNECTIONS)
+_ENDPOINTS: Dict[str, str] = {}
+
+
+def configure_retries(
+    mode: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+    connect_timeout: Optional[float] = None,
+    read_timeout: Optional[float] = None,
+) -> None:
+    """Configure the retry policy and timeouts of all shared clients.
+
+    Both the standard and adaptive modes retry throttling, transient and
+    connection errors with exponential backoff and full jitter. The adaptive
+    mode additionally rate limits the client when it gets throttled.
+    Arguments left as None fall back to the botocore defaults, which can be
+    set with AWS_RETRY_MODE and AWS_MAX_ATTEMPTS. Clients created before
+    this call are dropped, so the next get_client creates them anew.
+
+    Parameters
+    ----------
+    mode : Optional[str]
+        One of legacy, standard or adaptive. (Default value = None).
+    max_attempts : Optional[int]
+        Maximum number of attempts including the initial request.
+        (Default value = None).
+    connect_timeout : Optional[float]
+        Seconds to wait for a connection. (Default value = None).
+    read_timeout : Optional[float]
+        Seconds to wait for data on an open connection. (Default value = None).
+
+    Raises
+    ------
+    ValueError
+        If an unknown mode or fewer than one attempt is given.
+
+    """
+    global _CONFIG
+
+    if mode is not None and mode not in RETRY_MODES:
+        raise ValueError(f"Invalid retry mode. Use one of: {', '.join(RETRY_MODES)}.")
+    if max_attempts is not None and max_attempts < 1:
+        raise ValueError("max_attempts must be at least 1.")
+
+    retries: Dict[str, Any] = {}
+    if mode is not None:
+        retries["mode"] = mode
+    if max_attempts is not None:
+        retries["total_max_attempts"] = max_attempts
+    kwargs: Dict[str, Any] = {"max_pool_connections": MAX_POOL_CONNECTIONS}
+    if retries:
+        kwargs["retries"] = retries
+    if connect_timeout is not None:
+        kwargs["connect_timeout"] = connect_timeout
+    if read_timeout is not None:
+        kwargs["read_timeout"] = read_timeout
+
+    with _CLIENTS_LOCK:
+        _CONFIG = Config(**kwargs)
+        _CLIENTS.clear()
+
+
+def configure_endpoint(service_name: str, endpoint_url: Optional[str] = None) -> None:
+    """Send all requests of the shared clients of a service to an endpoint.
+
+    Unlike the AWS_ENDPOINT_URL_<SERVICE> environment variables, which
+    older botocore versions ignore, this works with every botocore version,
+    e.g. to use a local moto server or MinIO. Clients of the service created
+    before this call are dropped.
+
+    Parameters
+    ----------
+    service_name : str
+        Name of the AWS service, e.g. s3.
+    endpoint_url : Optional[str]
+        The endpoint url, or None to use the default endpoint again.
+        (Default value = None).
+
+    """
+    with _CLIENTS_LOCK:
+        if endpoint_url is None:
+            _ENDPOINTS.pop(service_name, None)
+        else:
+            _ENDPOINTS[service_name] = endpoint_url
+        for key in [key for key in _CLIENTS if key[0] == service_name]:
+            del _CLIENTS[key]
+
+
+def get_client(service_name: str, region_name: Optional[str] = None) -> Any:
+    """Get a boto3 client that is shared for the lifetime of the process.
+
+    Clients are created once per service and region and then reused, so
+    their connection pools stay warm across calls (and across invocations
+    of a warm Lambda container). boto3 clients are thread-safe.
+
+    Parameters
+    ----------
+    service_name : str
+        Name of the AWS service, e.g. s3.
+    region_name : Optional[str]
+        Name of the region. Uses the default region if None.
+        (Default value = None).
+
+    Returns
+    -------
+    Any
+        A boto3 client.
+
+    """
+    key = (service_name, region_name)
+    client = _CLIENTS.get(key)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                client = boto3.session.Session().client(  # type: ignore
+                    service_name=service_name,
+                    region_name=region_name,
+                    endpoint_url=_ENDPOINTS.get(service_name),
+                    config=_CONFIG,
+                )
+                events = client.meta.events
+                events.register("after-call", metrics.record_retries)
+                events.register("before-call", tracing.before_call)
+                events.register("after-call", tracing.after_call)
+                events.register("after-call-error", tracing.after_call)
+                _CLIENTS[key] = client
+    return client
+
+
+def clear_clients() -> None:
+    """Drop all shared clients, e.g. after credentials changed."""
+    with _CLIENTS_LOCK:
+        _CLIENTS.clear()
@@ -0,0 +1,391 @@
+"""src/talus_aws_utils/dataset.py module.
+
+Append-only parquet datasets under an S3 prefix.
+
+Every append writes the new rows as a new parquet part and adds it to a
+small manifest object, so appends only transfer the new rows. Readers read
+the parts listed in the manifest instead of listing the prefix::
+
+    append_dataframe(daily_results, bucket, "results/peptides")
+    peptides = read_dataset(bucket, "results/peptides")
+
+The manifest is replaced with a conditional PUT (If-Match its last ETag),
+so concurrent appends don't lose each other's parts: the loser re-reads
+the manifest and tries again. Run compact_dataset periodically, e.g. from
+a scheduled job, to merge small parts into parts of about target_size.
+Replaced parts are kept for a retention period, so readers that still
+use an older manifest can finish.
+
+Conditional PUTs need botocore 1.35.69 or later, which needs Python 3.8.
+Appends and compactions raise a RuntimeError with older versions instead
+of risking lost parts.
+"""
+import json
+import random
+import time
+import uuid
+
+from io import BytesIO
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from talus_aws_utils import metrics
+from talus_aws_utils.clients import get_client
+from talus_aws_utils.s3 import (
+    _invalidate_prefetched,
+    _write_object,
+    delete_keys,
+    read_dataframes,
+)
+
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+MANIFEST_NAME = "_manifest.json"
+# Size compact_dataset merges small parts up to.
+TARGET_PART_SIZE = 128 * 1024**2
+# Seconds replaced parts are kept for readers of older manifests.
+RETENTION = 3600
+# Attempts to update the manifest when other writers update it concurrently.
+MANIFEST_ATTEMPTS = 10
+_CONFLICT_CODES = ("PreconditionFailed", "ConditionalRequestConflict", "412", "409")
+
+
+def _normalize_prefix(prefix: str) -> str:
+    """Make sure a prefix ends with a single slash.
+
+    Parameters
+    ----------
+    prefix : str
+        The dataset prefix.
+
+    Returns
+    -------
+    str
+        The normalized prefix.
+
+    """
+    return prefix.rstrip("/") + "/"
+
+
+def _read_manifest(bucket: str, prefix: str) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Read the manifest of a dataset.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket of the dataset.
+    prefix : str
+        The normalized dataset prefix.
+
+    Returns
+    -------
+    Tuple[Dict[str, Any], Optional[str]]
+        The manifest and its ETag. An empty manifest and None if the
+        dataset doesn't exist yet.
+
+    """
+    s3_client = get_client("s3")
+    try:
+        with metrics.timed("read_manifest"):
+            response = s3_client.get_object(Bucket=bucket, Key=prefix + MANIFEST_NAME)
+            manifest = json.loads(response["Body"].read())
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            return {"version": 0, "parts": [], "obsolete": []}, None
+        else:
+            raise
+    return manifest, response["ETag"]
+
+
+def _supports_conditional_writes(s3_client: Any) -> bool:
+    """Check whether botocore can send If-Match and If-None-Match on PUTs.
+
+    Parameters
+    ----------
+    s3_client : Any
+        The s3 client.
+
+    Returns
+    -------
+    bool
+        True if PutObject accepts IfMatch and IfNoneMatch.
+
+    """
+    shape = s3_client.meta.service_model.operation_model("PutObject").input_shape
+    return "IfMatch" in shape.members and "IfNoneMatch" in shape.members
+
+
+def _require_conditional_writes() -> None:
+    """Make sure that the manifest can be updated safely.
+
+    Raises
+    ------
+    RuntimeError
+        If botocore doesn't support conditional writes.
+
+    """
+    if not _supports_conditional_writes(get_client("s3")):
+        raise RuntimeError(
+            "Updating a dataset manifest needs conditional writes, which need "
+            "botocore>=1.35.69. Upgrade boto3 and botocore."
+        )
+
+
+def _update_manifest(
+    bucket: str, prefix: str, update: Callable[[Dict[str, Any]], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Replace the manifest of a dataset with an updated version.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket of the dataset.
+    prefix : str
+        The normalized dataset prefix.
+    update : Callable[[Dict[str, Any]], Dict[str, Any]]
+        Creates the new manifest from the current one. Called again with
+        the newer manifest if another writer updated it first.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The new manifest.
+
+    Raises
+    ------
+    RuntimeError
+        If the manifest kept being updated by other writers.
+
+    """
+    s3_client = get_client("s3")
+    for attempt in range(MANIFEST_ATTEMPTS):
+        manifest, etag = _read_manifest(bucket, prefix)
+        new_manifest = {**update(manifest), "version": manifest["version"] + 1}
+        conditions = {"IfMatch": etag} if etag is not None else {"IfNoneMatch": "*"}
+        try:
+            with metrics.timed("write_manifest"):
+                s3_client.put_object(
+                    Bucket=bucket,
+                    Key=prefix + MANIFEST_NAME,
+                    Body=json.dumps(new_manifest).encode("utf-8"),
+                    ContentType="application/json",
+                    **conditions,
+                )
+            _invalidate_prefetched(bucket, [prefix + MANIFEST_NAME])
+            return new_manifest
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in _CONFLICT_CODES:
+                raise
+            metrics.increment("manifest_conflicts", operation="write_manifest")
+            time.sleep(random.uniform(0, 0.05 * 2**attempt))  # noqa: S311
+    raise RuntimeError(
+        f"Couldn't update the manifest of s3://{bucket}/{prefix} "
+        f"after {MANIFEST_ATTEMPTS} attempts."
+    )
+
+
+def _write_part(dataframe: "pd.DataFrame", bucket: str, prefix: str) -> Dict[str, Any]:
+    """Write a DataFrame as a new parquet part.
+
+    Parameters
+    ----------
+    dataframe : pd.DataFrame
+        The rows of the part.
+    bucket : str
+        The S3 bucket of the dataset.
+    prefix : str
+        The normalized dataset prefix.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The manifest entry of the part with its key, rows and bytes.
+
+    """
+    key = f"{prefix}part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+    buffer = BytesIO()
+    dataframe.to_parquet(buffer, engine="pyarrow", index=False)
+    _write_object(bucket=bucket, key=key, buffer=buffer)
+    return {"key": key, "rows": len(dataframe), "bytes": buffer.tell()}
+
+
+def append_dataframe(dataframe: "pd.DataFrame", bucket: str, prefix: str) -> str:
+    """Append rows to a dataset, creating it if it doesn't exist.
+
+    Parameters
+    ----------
+    dataframe : pd.DataFrame
+        The rows to append.
+    bucket : str
+        The S3 bucket of the dataset.
+    prefix : str
+        The dataset prefix.
+
+    Returns
+    -------
+    str
+        The key of the new part.
+
+    Raises
+    ------
+    RuntimeError
+        If botocore doesn't support conditional writes.
+
+    """
+    _require_conditional_writes()
+    prefix = _normalize_prefix(prefix)
+    part = _write_part(dataframe, bucket, prefix)
+    _update_manifest(
+        bucket,
+        prefix,
+        lambda manifest: {**manifest, "parts": manifest["parts"] + [part]},
+    )
+    return str(part["key"])
+
+
+def dataset_parts(bucket: str, prefix: str) -> List[Dict[str, Any]]:
+    """Get the parts of a dataset from its manifest.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket of the dataset.
+    prefix : str
+        The dataset prefix.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The key, rows and bytes of every part, in the order of appends.
+
+    """
+    manifest, _ = _read_manifest(bucket, _normalize_prefix(prefix))
+    return list(manifest["parts"])
+
+
+def read_dataset(
+    bucket: str, prefix: str, max_workers: int = 16, **kwargs: Any
+) -> "pd.DataFrame":
+    """Read all rows of a dataset.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket of the dataset.
+    prefix : str
+        The dataset prefix.
+    max_workers : int
+        Maximum number of concurrent part downloads. (Default value = 16).
+    kwargs : Any
+        Additional keyword arguments for pd.read_parquet, e.g. columns.
+
+    Returns
+    -------
+    pd.DataFrame
+        The rows of all parts, in the order of appends.
+
+    """
+    import pandas as pd
+
+    keys = [part["key"] for part in dataset_parts(bucket, prefix)]
+    if not keys:
+        return pd.DataFrame()
+    dataframes = read_dataframes(bucket, keys, max_workers=max_workers, **kwargs)
+    return pd.concat(dataframes, ignore_index=True)
+
+
+def compact_dataset(
+    bucket: str,
+    prefix: str,
+    target_size: int = TARGET_PART_SIZE,
+    retention: float = RETENTION,
+) -> List[str]:
+    """Merge runs of consecutive small parts into parts of about target_size.
+
+    Parts replaced by an earlier compaction are deleted once they were
+    replaced more than retention seconds ago. Appends during the compaction are kept, and a
+    merge is dropped if another compaction already replaced its parts.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket of the dataset.
+    prefix : str
+        The dataset prefix.
+    target_size : int
+        Maximum size in bytes of merged parts. (Default value = TARGET_PART_SIZE).
+    retention : float
+        Seconds to keep replaced parts for readers of older manifests.
+        (Default value = RETENTION).
+
+    Returns
+    -------
+    List[str]
+        The keys of the merged parts.
+
+    Raises
+    ------
+    RuntimeError
+        If botocore doesn't support conditional writes or replaced parts
+        couldn't be deleted.
+
+    """
+    import pandas as pd
+
+    _require_conditional_writes()
+    prefix = _normalize_prefix(prefix)
+    manifest, _ = _read_manifest(bucket, prefix)
+
+    groups: List[List[Dict[str, Any]]] = [[]]
+    for part in manifest["parts"]:
+        group_size = sum(p["bytes"] for p in groups[-1])
+        if part["bytes"] >= target_size or group_size + part["bytes"] > target_size:
+            groups.append([])
+        if part["bytes"] < target_size:
+            groups[-1].append(part)
+    merges: List[Tuple[List[Dict[str, Any]], Dict[str, Any]]] = []
+    for group in groups:
+        if len(group) > 1:
+            dataframes = read_dataframes(bucket, [part["key"] for part in group])
+            merged = _write_part(
+                pd.concat(dataframes, ignore_index=True), bucket, prefix
+            )
+            merges.append((group, merged))
+
+    now = time.time()
+    expired: List[str] = []
+    applied: List[Dict[str, Any]] = []
+
+    def update(current: Dict[str, Any]) -> Dict[str, Any]:
+        parts = list(current["parts"])
+        obsolete = list(current.get("obsolete", []))
+        applied.clear()
+        for group, merged in merges:
+            keys = [part["key"] for part in parts]
+            group_keys = [part["key"] for part in group]
+            start = keys.index(group_keys[0]) if group_keys[0] in keys else -1
+            if start < 0 or keys[start : start + len(group_keys)] != group_keys:
+                # Another compaction already replaced these parts.
+                continue
+            parts[start : start + len(group_keys)] = [merged]
+            obsolete += [{"key": key, "replaced": now} for key in group_keys]
+            applied.append(merged)
+        expired[:] = [o["key"] for o in obsolete if now - o["replaced"] > retention]
+        obsolete = [o for o in obsolete if now - o["replaced"] <= retention]
+        return {**current, "parts": parts, "obsolete": obsolete}
+
+    if merges or manifest.get("obsolete"):
+        _update_manifest(bucket, prefix, update)
+    unused = [merged["key"] for _, merged in merges if merged not in applied]
+    if expired or unused:
+        result = delete_keys(bucket, expired + unused)
+        if result.errors:
+            raise RuntimeError(
+                f"Compacted the dataset but failed to delete {len(result.errors)} "
+                f"parts, e.g. {next(iter(result.errors.items()))}"
+            )
+    return [merged["key"] for merged in applied]
@@ -1,42 +1,344 @@
 """src/talus_aws_utils/lambda_.py module."""
+import base64
+import dataclasses
+import datetime
+import decimal
+import enum
+import functools
+import gzip
 import json
+import logging
+import math
+import time
+import uuid
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
 
-def error_msg_wrapper(msg: str) -> Dict[str, Any]:
-    """Wrap an error message in a JSON response.
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(obj: Any) -> Any:
+    """Convert objects the json serializer doesn't support natively.
+
+    Handles numpy scalars and arrays, pandas objects, datetimes,
+    decimals, sets, dataclasses, enums and UUIDs.
+
+    Parameters
+    ----------
+    obj : Any
+        The object to convert.
+
+    Returns
+    -------
+    Any
+        A json serializable version of the object.
+
+    Raises
+    ------
+    TypeError
+        If the object can't be converted.
+
+    """
+    # numpy and pandas are only checked by module name, so that neither
+    # has to be imported to serialize plain Python objects.
+    module = type(obj).__module__.split(".")[0]
+    if module == "pandas":
+        if hasattr(obj, "columns"):
+            return obj.to_dict(orient="records")
+        if hasattr(obj, "isoformat"):
+            return obj.isoformat()
+        if hasattr(obj, "tolist"):
+            return obj.tolist()
+    if module == "numpy" and hasattr(obj, "tolist"):
+        kind = getattr(getattr(obj, "dtype", None), "kind", None)
+        if kind == "f" and obj.dtype.itemsize < 8:
+            # Go through str to keep the shortest float32 repr, like orjson.
+            obj = obj.astype(str).astype(float)
+        elif kind == "M":
+            obj = obj.astype("datetime64[us]")
+        return obj.tolist()
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj: Any) -> Any:
+    """Replace NaN and infinite floats with None, like orjson does.
+
+    Parameters
+    ----------
+    obj : Any
+        A json serializable object.
+
+    Returns
+    -------
+    Any
+        A copy of the object without non-finite floats.
+
+    """
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _json_dumps(msg: Any) -> str:
+    """Serialize a message with the standard library like orjson would.
+
+    Parameters
+    ----------
+    msg : Any
+        The message to serialize.
+
+    Returns
+    -------
+    str
+        The compact json string.
+
+    """
+    kwargs: Dict[str, Any] = {
+        "separators": (",", ":"),
+        "ensure_ascii": False,
+        "allow_nan": False,
+    }
+    try:
+        return json.dumps(msg, default=_json_default, **kwargs)
+    except ValueError:
+        # Only walk the message when it actually holds NaN or infinity.
+        return json.dumps(
+            _finite(msg), default=lambda obj: _finite(_json_default(obj)), **kwargs
+        )
+
+
+def dumps(msg: Any) -> str:
+    """Serialize a message to a compact json string.
+
+    Uses orjson if it is installed (the ``orjson`` extra) and falls back
+    to the standard library otherwise. Both produce the same output for
+    the supported types: no whitespace, non-ASCII characters unescaped,
+    and NaN and infinity as ``null``. Values orjson rejects, like integers
+    over 64 bits, are serialized by the standard library.
+
+    The standard library can't serialize dicts with keys other than str,
+    int, float, bool or None, which orjson converts to strings.
+
+    Parameters
+    ----------
+    msg : Any
+        The message to serialize.
+
+    Returns
+    -------
+    str
+        The json string.
+
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                msg,
+                default=_json_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            ).decode("utf-8")
+        except orjson.JSONEncodeError:
+            pass
+    return _json_dumps(msg)
+
+
+def _msg_wrapper(
+    status_code: int, msg: Any, compress_min_size: Optional[int]
+) -> Dict[str, Any]:
+    """Wrap a message in a JSON response with the given status code.
+
+    Parameters
+    ----------
+    status_code : int
+        The HTTP status code of the response.
+    msg : Any
+        The message to wrap.
+    compress_min_size : Optional[int]
+        Gzip and base64 encode the body if it is at least this many bytes.
 
     Returns
     -------
     Dict[str: Any]
         A JSON response.
+
     """
-    return {
-        "statusCode": 500,
-        "headers": {
-            "Access-Control-Allow-Headers": "Content-Type",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "OPTIONS,POST",
-        },
-        "body": json.dumps(msg),
+    headers = {
+        "Access-Control-Allow-Headers": "Content-Type",
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Methods": "OPTIONS,POST",
     }
+    body = dumps(msg)
+    if compress_min_size is not None:
+        encoded_body = body.encode("utf-8")
+        if len(encoded_body) >= compress_min_size:
+            headers["Content-Encoding"] = "gzip"
+            return {
+                "statusCode": status_code,
+                "headers": headers,
+                "body": base64.b64encode(gzip.compress(encoded_body)).decode("ascii"),
+                "isBase64Encoded": True,
+            }
+    return {"statusCode": status_code, "headers": headers, "body": body}
+
 
+def error_msg_wrapper(
+    msg: Any, compress_min_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """Wrap an error message in a JSON response.
 
-def success_msg_wrapper(msg: str) -> Dict[str, Any]:
+    Parameters
+    ----------
+    msg : Any
+        The error message.
+    compress_min_size : Optional[int]
+        If given, bodies of at least this many bytes are gzipped and
+        base64 encoded. Only use this if the client accepts gzip encoding.
+        (Default value = None).
+
+    Returns
+    -------
+    Dict[str: Any]
+        A JSON response.
+    """
+    return _msg_wrapper(status_code=500, msg=msg, compress_min_size=compress_min_size)
+
+
+def success_msg_wrapper(
+    msg: Any, compress_min_size: Optional[int] = None
+) -> Dict[str, Any]:
     """Wrap a success message in a JSON response.
 
+    Parameters
+    ----------
+    msg : Any
+        The success message.
+    compress_min_size : Optional[int]
+        If given, bodies of at least this many bytes are gzipped and
+        base64 encoded. Only use this if the client accepts gzip encoding.
+        (Default value = None).
+
     Returns
     -------
     Dict[str: Any]
         A JSON response.
     """
-    return {
-        "statusCode": 200,
-        "headers": {
-            "Access-Control-Allow-Headers": "Content-Type",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "OPTIONS,POST",
-        },
-        "body": json.dumps(msg),
-    }
+    return _msg_wrapper(status_code=200, msg=msg, compress_min_size=compress_min_size)
+
+
+def lambda_handler(
+    init: Optional[Callable[[], Any]] = None,
+    compress_min_size: Optional[int] = None,
+) -> Callable[[Callable[..., Any]], Callable[[Any, Any], Dict[str, Any]]]:
+    """Decorate a Lambda handler function.
+
+    The decorated function returns the message to send, which is wrapped
+    with success_msg_wrapper. Exceptions are logged and turned into
+    error_msg_wrapper responses.
+
+    If init is given it is called once per container, on the first (cold)
+    invocation, e.g. to create clients with clients.get_client or to load
+    models and secrets. Its return value is passed to the handler as a
+    third argument on every invocation. If init raises, the next invocation
+    tries again.
+
+    After every invocation a structured json log line is emitted on the
+    talus_aws_utils.lambda_ logger (at INFO level) with whether it was a
+    cold start and the time spent in init, the handler and serialization.
+
+    Example::
+
+        @lambda_handler(init=lambda: {"s3": get_client("s3")})
+        def handler(event, context, state):
+            return {"keys": ...}
+
+    Parameters
+    ----------
+    init : Optional[Callable[[], Any]]
+        Called once per container to create state that is reused
+        across invocations. (Default value = None).
+    compress_min_size : Optional[int]
+        Passed on to the msg wrappers. (Default value = None).
+
+    Returns
+    -------
+    Callable[[Callable[..., Any]], Callable[[Any, Any], Dict[str, Any]]]
+        The decorator.
+
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[[Any, Any], Dict[str, Any]]:
+        container: Dict[str, Any] = {}
+
+        @functools.wraps(func)
+        def wrapper(event: Any, context: Any) -> Dict[str, Any]:
+            timings = {"init_ms": 0.0, "handler_ms": 0.0, "serialization_ms": 0.0}
+            cold_start = "state" not in container
+            wrapper_ = success_msg_wrapper
+            try:
+                if cold_start:
+                    start = time.perf_counter()
+                    try:
+                        container["state"] = init() if init is not None else None
+                    finally:
+                        timings["init_ms"] = (time.perf_counter() - start) * 1000
+
+                start = time.perf_counter()
+                try:
+                    if init is not None:
+                        msg = func(event, context, container["state"])
+                    else:
+                        msg = func(event, context)
+                finally:
+                    timings["handler_ms"] = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                logger.exception("Lambda handler %s failed.", func.__name__)
+                msg = str(e)
+                wrapper_ = error_msg_wrapper
+
+            start = time.perf_counter()
+            try:
+                response = wrapper_(msg, compress_min_size=compress_min_size)
+            except TypeError as e:
+                logger.exception("Lambda handler %s result isn't json.", func.__name__)
+                response = error_msg_wrapper(str(e))
+            timings["serialization_ms"] = (time.perf_counter() - start) * 1000
+
+            logger.info(
+                json.dumps(
+                    {
+                        "handler": func.__name__,
+                        "request_id": getattr(context, "aws_request_id", None),
+                        "cold_start": cold_start,
+                        "status_code": response["statusCode"],
+                        **{name: round(ms, 3) for name, ms in timings.items()},
+                    }
+                )
+            )
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,348 @@
+"""src/talus_aws_utils/listing.py module.
+
+A persistent local index of S3 listings for prefixes that are slow to list.
+
+The index is a SQLite database with the key, size, ETag and modification
+time of every listed object. The first refresh of a prefix lists it
+completely, later refreshes only list the keys after the last key seen,
+which picks up new objects of prefixes that only grow, such as prefixes
+with date or run number keys::
+
+    index = ListingIndex("~/.cache/talus/listing.sqlite")
+    index.refresh("talus-raw", "instrument-1/")
+    raw_files = index.keys("talus-raw", "instrument-1/", pattern="*.raw")
+
+Incremental refreshes can't see deleted objects or objects overwritten
+under keys before the last key seen, so they return keys that may no
+longer exist. Refresh the affected prefixes with full=True, or pass
+max_age to list a prefix fully again once its last full listing is older
+than that many seconds.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from talus_aws_utils import metrics
+from talus_aws_utils.s3 import _iter_objects
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    listed REAL NOT NULL,
+    PRIMARY KEY (bucket, key)
+);
+CREATE TABLE IF NOT EXISTS prefixes (
+    bucket TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    last_key TEXT,
+    refreshed REAL NOT NULL,
+    full_refreshed REAL,
+    PRIMARY KEY (bucket, prefix)
+);
+"""
+# Number of listed objects written per transaction.
+_INSERT_BATCH_SIZE = 10000
+
+
+def _prefix_range(prefix: str) -> Tuple[str, Optional[str]]:
+    """Get the range of keys starting with a prefix.
+
+    Parameters
+    ----------
+    prefix : str
+        The key prefix.
+
+    Returns
+    -------
+    Tuple[str, Optional[str]]
+        The inclusive lower and exclusive upper bound, None if unbounded.
+
+    """
+    if not prefix:
+        return "", None
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class ListingIndex:
+    """A SQLite index of S3 object listings."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """Open or create an index.
+
+        Parameters
+        ----------
+        path : str
+            The SQLite database file. (Default value = ":memory:").
+
+        """
+        if path != ":memory:":
+            path = os.path.expanduser(path)
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.executescript(_SCHEMA)
+            columns = [
+                row[1] for row in self._db.execute("PRAGMA table_info(prefixes)")
+            ]
+            if "full_refreshed" not in columns:
+                # Indexes created before full listings were tracked.
+                self._db.execute("ALTER TABLE prefixes ADD COLUMN full_refreshed REAL")
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def refresh(
+        self,
+        bucket: str,
+        prefix: str,
+        full: bool = False,
+        max_age: Optional[float] = None,
+    ) -> int:
+        """Update the index with a listing of a prefix.
+
+        Parameters
+        ----------
+        bucket : str
+            The S3 bucket to list.
+        prefix : str
+            The key prefix to list.
+        full : bool
+            Whether to list the whole prefix and drop objects that no longer
+            exist, instead of only listing keys after the last key seen.
+            Prefixes that were never refreshed are always listed fully.
+            (Default value = False).
+        max_age : Optional[float]
+            If given, also list the whole prefix if it wasn't listed fully
+            in the last max_age seconds. (Default value = None).
+
+        Returns
+        -------
+        int
+            The number of listed objects.
+
+        """
+        refreshed = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT last_key, full_refreshed FROM prefixes"
+                " WHERE bucket = ? AND prefix = ?",
+                (bucket, prefix),
+            ).fetchone()
+        if row is not None and max_age is not None:
+            full = full or row[1] is None or refreshed - row[1] >= max_age
+        start_after = None if full or row is None else row[0]
+
+        lower, upper = _prefix_range(prefix)
+        count = 0
+        last_key = start_after
+        batch: List[Tuple[str, str, int, str, float, float]] = []
+        with metrics.timed("refresh_listing"):
+            for obj in _iter_objects(bucket, prefix, start_after=start_after):
+                batch.append(
+                    (
+                        bucket,
+                        obj["Key"],
+                        obj["Size"],
+                        obj["ETag"],
+                        obj["LastModified"].timestamp(),
+                        refreshed,
+                    )
+                )
+                last_key = obj["Key"]
+                if len(batch) >= _INSERT_BATCH_SIZE:
+                    count += self._insert(batch)
+                    batch = []
+            count += self._insert(batch)
+
+        with self._lock, self._db:
+            if start_after is None:
+                # Drop the objects that weren't listed anymore.
+                self._db.execute(
+                    "DELETE FROM objects WHERE bucket = ? AND key >= ?"
+                    + (" AND key < ?" if upper is not None else "")
+                    + " AND listed < ?",
+                    (bucket, lower)
+                    + ((upper,) if upper is not None else ())
+                    + (refreshed,),
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO prefixes VALUES (?, ?, ?, ?, ?)",
+                (
+                    bucket,
+                    prefix,
+                    last_key,
+                    refreshed,
+                    refreshed if start_after is None else row[1],
+                ),
+            )
+        return count
+
+    def _insert(self, batch: List[Tuple[str, str, int, str, float, float]]) -> int:
+        """Insert or replace listed objects.
+
+        Parameters
+        ----------
+        batch : List[Tuple[str, str, int, str, float, float]]
+            The bucket, key, size, ETag, modification time and listing time
+            of the objects.
+
+        Returns
+        -------
+        int
+            The number of objects.
+
+        """
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?)", batch
+            )
+        return len(batch)
+
+    def refreshed(
+        self, bucket: str, prefix: str, full: bool = False
+    ) -> Optional[float]:
+        """Get the time a prefix was last refreshed.
+
+        Parameters
+        ----------
+        bucket : str
+            The S3 bucket.
+        prefix : str
+            The key prefix.
+        full : bool
+            Whether to get the time the prefix was last listed fully.
+            (Default value = False).
+
+        Returns
+        -------
+        Optional[float]
+            The time as seconds since the epoch, None if never refreshed.
+
+        """
+        column = "full_refreshed" if full else "refreshed"
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {column} FROM prefixes WHERE bucket = ? AND prefix = ?",
+                (bucket, prefix),
+            ).fetchone()
+        return None if row is None or row[0] is None else float(row[0])
+
+    def objects(
+        self,
+        bucket: str,
+        prefix: str = "",
+        suffix: Optional[str] = None,
+        pattern: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Query the indexed objects.
+
+        Parameters
+        ----------
+        bucket : str
+            The S3 bucket.
+        prefix : str
+            Only return keys starting with this prefix. (Default value = "").
+        suffix : Optional[str]
+            Only return keys ending with this suffix. (Default value = None).
+        pattern : Optional[str]
+            Only return keys matching this glob pattern, where * and ?
+            also match slashes. (Default value = None).
+        min_size : Optional[int]
+            Only return objects of at least this size. (Default value = None).
+        max_size : Optional[int]
+            Only return objects of at most this size. (Default value = None).
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            The Key, Size, ETag and LastModified, as seconds since the
+            epoch, of the matching objects, sorted by key.
+
+        """
+        lower, upper = _prefix_range(prefix)
+        conditions = ["bucket = ?", "key >= ?"]
+        params: List[Any] = [bucket, lower]
+        if upper is not None:
+            conditions.append("key < ?")
+            params.append(upper)
+        if suffix:
+            conditions.append("substr(key, -?) = ?")
+            params += [len(suffix), suffix]
+        if pattern is not None:
+            conditions.append("key GLOB ?")
+            params.append(pattern)
+        if min_size is not None:
+            conditions.append("size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            conditions.append("size <= ?")
+            params.append(max_size)
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, size, etag, mtime FROM objects WHERE "
+                + " AND ".join(conditions)
+                + " ORDER BY key",
+                params,
+            ).fetchall()
+        return [
+            {"Key": key, "Size": size, "ETag": etag, "LastModified": mtime}
+            for key, size, etag, mtime in rows
+        ]
+
+    def keys(
+        self,
+        bucket: str,
+        prefix: str = "",
+        suffix: Optional[str] = None,
+        pattern: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> List[str]:
+        """Query the keys of the indexed objects, see objects.
+
+        Parameters
+        ----------
+        bucket : str
+            The S3 bucket.
+        prefix : str
+            Only return keys starting with this prefix. (Default value = "").
+        suffix : Optional[str]
+            Only return keys ending with this suffix. (Default value = None).
+        pattern : Optional[str]
+            Only return keys matching this glob pattern. (Default value = None).
+        min_size : Optional[int]
+            Only return objects of at least this size. (Default value = None).
+        max_size : Optional[int]
+            Only return objects of at most this size. (Default value = None).
+
+        Returns
+        -------
+        List[str]
+            The matching keys, sorted.
+
+        """
+        return [
+            obj["Key"]
+            for obj in self.objects(
+                bucket,
+                prefix=prefix,
+                suffix=suffix,
+                pattern=pattern,
+                min_size=min_size,
+                max_size=max_size,
+            )
+        ]
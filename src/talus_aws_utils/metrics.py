@@ -0,0 +1,281 @@
+"""src/talus_aws_utils/metrics.py module.
+
+Pluggable I/O metrics for the s3 and secrets modules.
+
+Register a callback to receive a Metric for every measurement, e.g. to
+forward them to CloudWatch or StatsD, or use a MetricsRecorder to
+aggregate them in memory::
+
+    recorder = metrics.MetricsRecorder()
+    metrics.register(recorder)
+    ...
+    print(recorder.summary())
+
+When no callback is registered, recording a metric is a single list check.
+
+The following metrics are recorded, tagged by operation:
+
+* requests (counter): number of calls, e.g. read_object or get_secret.
+* errors (counter): number of calls that raised.
+* latency (histogram): duration of calls in seconds.
+* bytes_in / bytes_out (counter): payload bytes read and written.
+* cache_hits / cache_misses (counter): lookups in an in-process cache.
+* evictions (counter): entries dropped from an in-process cache unused.
+* not_modified (counter): conditional reads of unchanged objects.
+* skipped_writes (counter): writes of unchanged content that were skipped.
+* reserved_bytes (histogram): memory reserved by budgeted reads.
+* manifest_conflicts (counter): dataset manifest updates that lost a race
+  with another writer and were retried.
+* write_retries (counter): uploads of batch writes retried after a
+  transient error.
+* stream_retries (counter): parts of reads requested again after their
+  body failed while streaming.
+* retries (counter): retries botocore made for an API call.
+* hedges / hedge_wins (counter): duplicate GETs sent for slow reads and
+  how often the duplicate responded first.
+"""
+import contextlib
+import logging
+import math
+import threading
+import time
+
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Tuple, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+COUNTER = "counter"
+HISTOGRAM = "histogram"
+
+
+class Metric(NamedTuple):
+    """A single measurement passed to the registered callbacks."""
+
+    kind: str
+    name: str
+    value: float
+    tags: Dict[str, str]
+
+
+_CALLBACKS: List[Callable[[Metric], None]] = []
+_Callback = TypeVar("_Callback", bound=Callable[[Metric], None])
+
+
+def register(callback: _Callback) -> _Callback:
+    """Register a callback that receives every recorded Metric.
+
+    Parameters
+    ----------
+    callback : _Callback
+        The callback, called synchronously from the thread doing the I/O.
+
+    Returns
+    -------
+    _Callback
+        The callback, so that register can be used as a decorator.
+
+    """
+    _CALLBACKS.append(callback)
+    return callback
+
+
+def unregister(callback: Callable[[Metric], None]) -> None:
+    """Remove a previously registered callback.
+
+    Parameters
+    ----------
+    callback : Callable[[Metric], None]
+        The callback to remove.
+
+    """
+    _CALLBACKS.remove(callback)
+
+
+def _emit(metric: Metric) -> None:
+    """Send a metric to all registered callbacks.
+
+    Parameters
+    ----------
+    metric : Metric
+        The metric to send.
+
+    """
+    for callback in list(_CALLBACKS):
+        try:
+            callback(metric)
+        except Exception:
+            # A broken exporter must never break the I/O it observes.
+            logger.exception("Metrics callback %r failed.", callback)
+
+
+def increment(name: str, value: float = 1, **tags: str) -> None:
+    """Increment a counter.
+
+    Parameters
+    ----------
+    name : str
+        Name of the counter.
+    value : float
+        The amount to increment by. (Default value = 1).
+    tags : str
+        Tags of the measurement, e.g. operation.
+
+    """
+    if _CALLBACKS:
+        _emit(Metric(COUNTER, name, value, tags))
+
+
+def observe(name: str, value: float, **tags: str) -> None:
+    """Record a value in a histogram.
+
+    Parameters
+    ----------
+    name : str
+        Name of the histogram.
+    value : float
+        The observed value.
+    tags : str
+        Tags of the measurement, e.g. operation.
+
+    """
+    if _CALLBACKS:
+        _emit(Metric(HISTOGRAM, name, value, tags))
+
+
+@contextlib.contextmanager
+def timed(operation: str, **tags: str) -> Iterator[None]:
+    """Record requests, errors and latency of the wrapped block.
+
+    Parameters
+    ----------
+    operation : str
+        Name of the operation, e.g. read_object.
+    tags : str
+        Additional tags of the measurement.
+
+    Yields
+    ------
+    None
+
+    """
+    if not _CALLBACKS:
+        yield
+        return
+
+    tags = {"operation": operation, **tags}
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        _emit(Metric(COUNTER, "errors", 1, tags))
+        raise
+    finally:
+        _emit(Metric(COUNTER, "requests", 1, tags))
+        _emit(Metric(HISTOGRAM, "latency", time.perf_counter() - start, tags))
+
+
+def record_retries(parsed: Dict[str, Any], model: Any, **kwargs: Any) -> None:
+    """Record botocore retries, registered on the after-call client event.
+
+    Parameters
+    ----------
+    parsed : Dict[str, Any]
+        The parsed API response.
+    model : Any
+        The botocore operation model.
+    kwargs : Any
+        Other event arguments.
+
+    """
+    if _CALLBACKS:
+        retries = parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        if retries:
+            increment("retries", retries, operation=model.name)
+
+
+class MetricsRecorder:
+    """Thread-safe in-memory aggregation of metrics.
+
+    Counters are summed and histogram values are kept to compute
+    percentiles, both per metric name and tags.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty recorder."""
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self.histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[float]] = {}
+
+    def __call__(self, metric: Metric) -> None:
+        """Record a metric.
+
+        Parameters
+        ----------
+        metric : Metric
+            The metric to record.
+
+        """
+        key = (metric.name, tuple(sorted(metric.tags.items())))
+        with self._lock:
+            if metric.kind == COUNTER:
+                self.counters[key] = self.counters.get(key, 0) + metric.value
+            else:
+                self.histograms.setdefault(key, []).append(metric.value)
+
+    def reset(self) -> None:
+        """Drop all recorded values."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Summarize the recorded metrics.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            One row per metric name and tags. Counters have a value,
+            histograms have count, sum, min, max, p50, p90 and p99.
+
+        """
+        rows: List[Dict[str, Any]] = []
+        with self._lock:
+            for (name, tags), value in sorted(self.counters.items()):
+                rows.append({"name": name, **dict(tags), "value": value})
+            for (name, tags), values in sorted(self.histograms.items()):
+                values = sorted(values)
+                rows.append(
+                    {
+                        "name": name,
+                        **dict(tags),
+                        "count": len(values),
+                        "sum": sum(values),
+                        "min": values[0],
+                        "max": values[-1],
+                        "p50": _percentile(values, 50),
+                        "p90": _percentile(values, 90),
+                        "p99": _percentile(values, 99),
+                    }
+                )
+        return rows
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Get a percentile of sorted values using the nearest-rank method.
+
+    Parameters
+    ----------
+    sorted_values : List[float]
+        The values, sorted ascending.
+    percentile : float
+        The percentile between 0 and 100.
+
+    Returns
+    -------
+    float
+        The value at the given percentile.
+
+    """
+    rank = max(math.ceil(percentile / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
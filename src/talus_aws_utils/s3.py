@@ -1,24 +1,569 @@
 """src/talus_aws_utils/s3.py module."""
+import datetime
+import gzip
+import hashlib
+import io
+import itertools
 import json
+import math
+import multiprocessing
 import os
 import pathlib
 import pickle
-
+import random
+import socket
+import threading
+import time
+
+from collections import OrderedDict, deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from functools import partial
 from io import BytesIO
-from typing import Any, Dict, List, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+import botocore.exceptions
+
+from botocore.exceptions import (
+    BotoCoreError,
+    ClientError,
+    IncompleteReadError,
+    ReadTimeoutError,
+)
+from urllib3.exceptions import ProtocolError
+
+from talus_aws_utils import metrics, tracing
+from talus_aws_utils.clients import get_client
+
+
+# pandas, numpy, joblib and hurry.filesize are imported by the functions that
+# need them, so that importing this module stays cheap (e.g. on Lambda cold
+# starts that only check for or read json files).
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+    from talus_aws_utils.listing import ListingIndex
+
+
+# Objects up to this size are copied with a single CopyObject request.
+MULTIPART_COPY_THRESHOLD = 256 * 1024**2
+MULTIPART_COPY_PART_SIZE = 128 * 1024**2
+# Metadata of multipart copies with the ETag of their source, as multipart
+# copies get a new ETag.
+SOURCE_ETAG_METADATA = "source-etag"
+# Headers of the source set on multipart copies, which don't copy them.
+_COPIED_HEADERS = (
+    "CacheControl",
+    "ContentDisposition",
+    "ContentEncoding",
+    "ContentLanguage",
+    "ContentType",
+)
+# DeleteObjects accepts at most 1000 keys per request.
+DELETE_BATCH_SIZE = 1000
+# Part size and concurrency of the ranged GETs of the read_* functions.
+DOWNLOAD_PART_SIZE = 8 * 1024**2
+DOWNLOAD_MAX_CONCURRENCY = 10
+# Attempts to read a part whose body fails while streaming, which botocore
+# doesn't retry.
+DOWNLOAD_ATTEMPTS = 5
+_STREAMING_ERRORS: Tuple[Type[Exception], ...] = (
+    ConnectionError,
+    socket.timeout,
+    IncompleteReadError,
+    ReadTimeoutError,
+    ProtocolError,
+    # Newer botocore versions wrap the urllib3 errors while streaming.
+    getattr(botocore.exceptions, "ResponseStreamingError", IncompleteReadError),
+)
+# Size of the reads from a response body into a buffer.
+READ_CHUNK_SIZE = 1024**2
+# Part size of the multipart uploads of write_jsonl, at least 5 MiB.
+UPLOAD_PART_SIZE = 8 * 1024**2
+# Records per batch of iter_jsonl if DataFrames are requested.
+JSONL_BATCH_SIZE = 10000
+# Attempts of every upload of write_dataframes and write_jsons.
+WRITE_ATTEMPTS = 3
+_RETRYABLE_CODES = ("SlowDown", "RequestTimeout", "Throttling", "InternalError")
+# Seconds after which file_keys_in_bucket lists an indexed prefix fully again.
+INDEX_MAX_AGE = 3600.0
+# Range GET size and cache of open_object.
+READ_BLOCK_SIZE = 8 * 1024**2
+READ_CACHE_BLOCKS = 8
+READ_AHEAD_BLOCKS = 2
+
+
+class _NotModifiedType:
+    """Type of the NOT_MODIFIED sentinel."""
+
+    def __repr__(self) -> str:
+        """Represent the sentinel by its name."""
+        return "NOT_MODIFIED"
+
+
+# Returned by the read_*_if_changed functions if the object didn't change.
+NOT_MODIFIED = _NotModifiedType()
+
+
+class VersionedObject(NamedTuple):
+    """An object read by a read_*_if_changed function.
+
+    Pass etag or last_modified to the next call to only read the object
+    again once it changed.
+    """
+
+    value: Any
+    etag: str
+    last_modified: datetime.datetime
+
+
+class _HedgingPolicy:
+    """Decide when to send a duplicate GET for a slow request.
+
+    The hedge delay is the given percentile of the recently observed
+    time to first byte of GET requests.
+    """
+
+    def __init__(
+        self,
+        percentile: float,
+        initial_delay: float,
+        min_delay: float,
+        window: int,
+        max_concurrency: int,
+        max_hedges: int,
+    ) -> None:
+        """Create a hedging policy.
+
+        Parameters
+        ----------
+        percentile : float
+            Percentile of the observed latencies to use as hedge delay.
+        initial_delay : float
+            Hedge delay in seconds until enough latencies were observed.
+        min_delay : float
+            Lower bound of the hedge delay in seconds.
+        window : int
+            Number of recent latencies to keep.
+        max_concurrency : int
+            Number of threads sending the first GET of hedged reads.
+        max_hedges : int
+            Maximum number of duplicate GETs in flight.
+
+        """
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="talus-hedged-get"
+        )
+        # Hedges get their own threads, so they never wait behind the
+        # slow requests they duplicate, and are skipped when none is free.
+        self.hedge_pool = ThreadPoolExecutor(
+            max_workers=max_hedges, thread_name_prefix="talus-hedge"
+        )
+        self.hedges = threading.BoundedSemaphore(max_hedges)
+
+    def shutdown(self) -> None:
+        """Stop the threads once their requests finished."""
+        self.pool.shutdown(wait=False)
+        self.hedge_pool.shutdown(wait=False)
+
+    def record(self, latency: float) -> None:
+        """Record the time to first byte of a GET request.
+
+        Parameters
+        ----------
+        latency : float
+            The latency in seconds.
+
+        """
+        with self._lock:
+            self._latencies.append(latency)
+
+    def delay(self) -> float:
+        """Get the current hedge delay.
+
+        Returns
+        -------
+        float
+            Seconds to wait for a GET before sending a duplicate.
+
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        # Don't hedge based on a handful of samples.
+        if len(latencies) < 20:
+            return self.initial_delay
+        rank = max(math.ceil(self.percentile / 100 * len(latencies)) - 1, 0)
+        return max(latencies[rank], self.min_delay)
+
+
+_HEDGING: Optional[_HedgingPolicy] = None
+
+
+def configure_hedging(
+    enabled: bool = True,
+    percentile: float = 95.0,
+    initial_delay: float = 0.1,
+    min_delay: float = 0.01,
+    window: int = 200,
+    max_concurrency: int = 64,
+    max_hedges: int = 8,
+) -> None:
+    """Enable or disable hedged GETs in all read_* functions.
+
+    With hedging, a read that hasn't received its first byte within the
+    given percentile of recent GET latencies sends a duplicate GET and
+    uses whichever response arrives first. This trades a few extra
+    requests for a shorter tail latency of small reads. Hedged reads use
+    a single GET per object instead of parallel ranged downloads, so only
+    enable this for workloads of small objects. Bodies that fail while
+    streaming are requested again like in non-hedged reads.
+
+    Use configure_retries in the clients module to set the retry policy.
+
+    Parameters
+    ----------
+    enabled : bool
+        Whether to hedge GET requests. (Default value = True).
+    percentile : float
+        Percentile of observed latencies after which to hedge.
+        (Default value = 95.0).
+    initial_delay : float
+        Hedge delay in seconds until 20 latencies were observed.
+        (Default value = 0.1).
+    min_delay : float
+        Lower bound of the hedge delay in seconds. (Default value = 0.01).
+    window : int
+        Number of recent latencies the percentile is computed over.
+        (Default value = 200).
+    max_concurrency : int
+        Maximum number of concurrent hedged reads. The hedge delay only
+        starts once a read's first GET was sent. (Default value = 64).
+    max_hedges : int
+        Maximum number of duplicate GETs in flight. Slow reads aren't
+        hedged while all are in flight. (Default value = 8).
+
+    Raises
+    ------
+    ValueError
+        If the percentile isn't between 0 and 100.
+
+    """
+    global _HEDGING
+
+    if not 0 < percentile <= 100:
+        raise ValueError("percentile must be between 0 and 100.")
+    if _HEDGING is not None:
+        _HEDGING.shutdown()
+    _HEDGING = (
+        _HedgingPolicy(
+            percentile=percentile,
+            initial_delay=initial_delay,
+            min_delay=min_delay,
+            window=window,
+            max_concurrency=max_concurrency,
+            max_hedges=max_hedges,
+        )
+        if enabled
+        else None
+    )
+
+
+def _hedged_get_object(
+    s3_client: Any, bucket: str, key: str, hedging: _HedgingPolicy
+) -> Dict[str, Any]:
+    """Get an object, sending a duplicate request if the first one is slow.
+
+    Parameters
+    ----------
+    s3_client : Any
+        The s3 client.
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+    hedging : _HedgingPolicy
+        The hedging policy.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The GetObject response of the first request to respond
+        successfully, or the error of the first request.
+
+    """
+    started = threading.Event()
+    start_times: List[float] = []
+
+    def get(is_primary: bool) -> Dict[str, Any]:
+        start = time.perf_counter()
+        if is_primary:
+            start_times.append(start)
+            started.set()
+        response: Dict[str, Any] = s3_client.get_object(Bucket=bucket, Key=key)
+        hedging.record(time.perf_counter() - start)
+        return response
+
+    def close_body(future: "Future[Dict[str, Any]]") -> None:
+        if future.exception() is None:
+            future.result()["Body"].close()
+
+    primary = hedging.pool.submit(get, True)
+    # The delay starts when the GET is sent, not while it waits for a thread.
+    while not started.wait(timeout=1.0) and not primary.done():
+        pass
+    if not start_times:
+        return primary.result()
+    remaining = start_times[0] + hedging.delay() - time.perf_counter()
+    done, _ = wait([primary], timeout=max(remaining, 0))
+    if done or not hedging.hedges.acquire(blocking=False):
+        return primary.result()
+
+    metrics.increment("hedges", operation="read_object")
+    hedge = hedging.hedge_pool.submit(get, False)
+    hedge.add_done_callback(lambda _: hedging.hedges.release())
+    done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+    winner = hedge if hedge in done and primary not in done else primary
+    loser = primary if winner is hedge else hedge
+    if winner.exception() is not None and loser.exception() is None:
+        # The slower request may still succeed where the faster one failed.
+        winner, loser = loser, winner
+    if winner is hedge:
+        metrics.increment("hedge_wins", operation="read_object")
+    # Abort the body download of the slower request once it responds.
+    loser.add_done_callback(close_body)
+    return winner.result()
+
+
+def _allocate(size: int) -> BytesIO:
+    """Create a zero-filled BytesIO of a given size with a single allocation.
+
+    Parameters
+    ----------
+    size : int
+        The size in bytes.
+
+    Returns
+    -------
+    BytesIO
+        The buffer, positioned at the start.
+
+    """
+    data = BytesIO()
+    if size:
+        data.seek(size - 1)
+        data.write(b"\0")
+        data.seek(0)
+    return data
+
+
+def _read_body_into(body: Any, data: BytesIO, start: int, end: int) -> None:
+    """Read a response body into a range of a preallocated buffer.
+
+    Parameters
+    ----------
+    body : Any
+        The response body stream.
+    data : BytesIO
+        The preallocated buffer.
+    start : int
+        First byte of the range.
+    end : int
+        End of the range, exclusive.
+
+    """
+    # Views are released right away, a BytesIO with exported views copies
+    # on getvalue.
+    with data.getbuffer() as buffer, buffer[start:end] as view:
+        position = 0
+        while position < len(view):
+            chunk = body.read(min(READ_CHUNK_SIZE, len(view) - position))
+            if not chunk:
+                # botocore raises IncompleteReadError for short bodies.
+                break
+            view[position : position + len(chunk)] = chunk
+            position += len(chunk)
+
+
+def _read_range_into(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    etag: str,
+    data: BytesIO,
+    start: int,
+    end: int,
+    response: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Read a byte range of an object into a preallocated buffer.
+
+    If the body fails while streaming, e.g. with a read timeout or
+    connection reset, the range is requested again, pinned to the ETag,
+    up to DOWNLOAD_ATTEMPTS times.
+
+    Parameters
+    ----------
+    s3_client : Any
+        The s3 client.
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+    etag : str
+        The ETag of the object.
+    data : BytesIO
+        The preallocated buffer.
+    start : int
+        First byte of the range.
+    end : int
+        End of the range, exclusive.
+    response : Optional[Dict[str, Any]]
+        A GetObject response for the range to read before requesting it.
+        (Default value = None).
+
+    """
+    for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+        try:
+            if response is None:
+                response = s3_client.get_object(
+                    Bucket=bucket,
+                    Key=key,
+                    Range=f"bytes={start}-{end - 1}",
+                    IfMatch=etag,
+                )
+            _read_body_into(response["Body"], data, start, end)
+            return
+        except _STREAMING_ERRORS:
+            if attempt == DOWNLOAD_ATTEMPTS:
+                raise
+            metrics.increment("stream_retries", operation="read_object")
+            response = None
+
+
+def _download_object(s3_client: Any, bucket: str, key: str) -> BytesIO:
+    """Download an object into a buffer allocated once at its final size.
+
+    The first part is requested with a range GET, whose Content-Range tells
+    the object size, and the remaining parts are requested concurrently,
+    pinned to the ETag of the first part. Objects up to one part need a
+    single request. Parts whose body fails while streaming, e.g. with a
+    read timeout or connection reset, are requested again up to
+    DOWNLOAD_ATTEMPTS times.
+
+    Parameters
+    ----------
+    s3_client : Any
+        The s3 client.
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+
+    Returns
+    -------
+    BytesIO
+        The object in byte format.
+
+    """
+    try:
+        first = s3_client.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes=0-{DOWNLOAD_PART_SIZE - 1}"
+        )
+        size = int(first["ContentRange"].rpartition("/")[2])
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "InvalidRange":
+            raise
+        # Empty objects have no satisfiable range.
+        first = s3_client.get_object(Bucket=bucket, Key=key)
+        size = first["ContentLength"]
+
+    data = _allocate(size)
 
-import boto3
-import joblib
-import numpy as np
-import pandas as pd
+    def read_part(start: int, response: Optional[Dict[str, Any]] = None) -> None:
+        end = min(start + DOWNLOAD_PART_SIZE, size)
+        _read_range_into(
+            s3_client, bucket, key, first["ETag"], data, start, end, response
+        )
 
-from botocore.exceptions import ClientError
-from hurry.filesize import size
+    read_part(0, first)
+    starts = range(first["ContentLength"], size, DOWNLOAD_PART_SIZE)
+    if starts:
+        with ThreadPoolExecutor(
+            max_workers=min(DOWNLOAD_MAX_CONCURRENCY, len(starts))
+        ) as pool:
+            list(pool.map(read_part, starts))
+    return data
 
 
 def _read_object(bucket: str, key: str) -> BytesIO:
     """Read an object in byte format from a given s3 bucket and key name.
 
+    Objects passed to prefetch are taken from the prefetch cache.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+
+    Returns
+    -------
+    BytesIO
+        The object in byte format.
+
+    """
+    if _PREFETCHED:
+        with _PREFETCH_LOCK:
+            _evict_prefetched()
+            entry = _PREFETCHED.pop((bucket, key), None)
+        if entry is not None:
+            future = entry[1]
+            metrics.increment("cache_hits", operation="prefetch")
+            with tracing.span("read_prefetched", bucket=bucket, key=key):
+                result = future.result()
+            if isinstance(result, str):
+                with open(result, "rb") as f:
+                    size = os.fstat(f.fileno()).st_size
+                    data = _allocate(size)
+                    _read_body_into(f, data, 0, size)
+                return data
+            return result
+    return _fetch_object(bucket=bucket, key=key)
+
+
+def _fetch_object(bucket: str, key: str) -> BytesIO:
+    """Download an object in byte format from a given s3 bucket and key name.
+
+    The object is read into a buffer allocated once at its final size,
+    so getvalue and getbuffer of the result don't copy it.
+
     Parameters
     ----------
     bucket : str
@@ -37,21 +582,309 @@ def _read_object(bucket: str, key: str) -> BytesIO:
         If the file couldn't be found.
 
     """
-    s3_resource = boto3.Session().resource("s3")
-    s3_bucket = s3_resource.Bucket(bucket)
-    data = BytesIO()
+    s3_client = get_client("s3")
+    hedging = _HEDGING
     try:
-        s3_bucket.download_fileobj(Key=key, Fileobj=data)
-        data.seek(0)
+        with tracing.span("read_object", bucket=bucket, key=key) as span:
+            with metrics.timed("read_object"):
+                if hedging is not None:
+                    response = _hedged_get_object(s3_client, bucket, key, hedging)
+                    size = response["ContentLength"]
+                    data = _allocate(size)
+                    _read_range_into(
+                        s3_client,
+                        bucket,
+                        key,
+                        response["ETag"],
+                        data,
+                        0,
+                        size,
+                        response,
+                    )
+                else:
+                    data = _download_object(s3_client, bucket, key)
+            span["bytes"] = len(data.getvalue())
+        metrics.increment("bytes_in", span["bytes"], operation="read_object")
         return data
     except ClientError as e:
-        if e.response["Error"]["Code"] == "404":
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            raise ValueError("File doesn't exist.")
+        else:
+            raise
+
+
+# The time and download of every prefetched object, oldest first.
+_PREFETCHED: "OrderedDict[Tuple[str, str], Tuple[float, Future[Union[BytesIO, str]]]]" = (
+    OrderedDict()
+)
+_PREFETCH_LOCK = threading.Lock()
+_PREFETCH_POOL: Optional[ThreadPoolExecutor] = None
+PREFETCH_MAX_WORKERS = 16
+# Prefetched objects that aren't read are dropped after PREFETCH_TTL seconds
+# or when more than PREFETCH_MAX_OBJECTS are waiting to be read.
+PREFETCH_TTL = 600.0
+PREFETCH_MAX_OBJECTS = 256
+
+
+def _evict_prefetched() -> None:
+    """Drop expired and excess prefetched objects. Hold _PREFETCH_LOCK."""
+    expired = time.monotonic() - PREFETCH_TTL
+    while _PREFETCHED:
+        started, future = next(iter(_PREFETCHED.values()))
+        if started > expired and len(_PREFETCHED) <= PREFETCH_MAX_OBJECTS:
+            return
+        _PREFETCHED.popitem(last=False)
+        future.cancel()
+        metrics.increment("evictions", operation="prefetch")
+
+
+def _invalidate_prefetched(bucket: str, keys: Iterable[str]) -> None:
+    """Drop prefetched objects that were written, copied to or deleted.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket of the objects.
+    keys : Iterable[str]
+        The changed object keys.
+
+    """
+    if not _PREFETCHED:
+        return
+    with _PREFETCH_LOCK:
+        for key in keys:
+            entry = _PREFETCHED.pop((bucket, key), None)
+            if entry is not None:
+                entry[1].cancel()
+
+
+def _prefetch_to_file(bucket: str, key: str, path: str) -> str:
+    """Download an object to a local file.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+    path : str
+        The local file.
+
+    Returns
+    -------
+    str
+        The local file.
+
+    Raises
+    ------
+    ValueError
+        If the file couldn't be found.
+
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = f"{path}.{threading.get_ident()}.part"
+    try:
+        with tracing.span("prefetch_file", bucket=bucket, key=key):
+            with metrics.timed("prefetch_file"):
+                get_client("s3").download_file(
+                    Bucket=bucket, Key=key, Filename=partial_path
+                )
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
             raise ValueError("File doesn't exist.")
         else:
             raise
+    os.replace(partial_path, path)
+    return path
+
+
+def prefetch(
+    bucket: str, keys: Iterable[str], directory: Optional[str] = None
+) -> Dict[str, "Future[Union[BytesIO, str]]"]:
+    """Start downloading objects in the background, ahead of reading them.
+
+    The next read_* call for a prefetched key takes the object from the
+    prefetch cache instead of downloading it, waiting for the download if
+    it hasn't finished yet. Each prefetched object is served once and then
+    dropped from the cache, so it isn't kept in memory after it was read
+    and a later read downloads the current version again. Writes, copies
+    and deletes through this module drop the prefetched objects they
+    change. Objects that aren't read are dropped after PREFETCH_TTL
+    seconds or when more than PREFETCH_MAX_OBJECTS are waiting, use
+    clear_prefetched to drop them earlier::
+
+        prefetch(bucket, keys[1:])
+        for key in keys:
+            process(read_dataframe(bucket, key))  # overlaps with downloads
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    keys : Iterable[str]
+        The object keys within the s3 bucket.
+    directory : Optional[str]
+        Download the objects to files in this local directory instead of
+        keeping them in memory, e.g. for objects that don't fit in memory
+        together. The files are kept after they were read.
+        (Default value = None).
+
+    Returns
+    -------
+    Dict[str, Future[Union[BytesIO, str]]]
+        The download of every key, resulting in the object in byte format
+        or the path of its local file.
+
+    Raises
+    ------
+    ValueError
+        If a key would be downloaded outside of directory, e.g. because it
+        contains "..".
+
+    """
+    global _PREFETCH_POOL
+
+    paths: Dict[str, Optional[str]] = {}
+    for key in keys:
+        paths[key] = None
+        if directory is not None:
+            root = os.path.realpath(directory)
+            path = os.path.realpath(os.path.join(root, bucket, *key.split("/")))
+            if os.path.commonpath([root, path]) != root or path == root:
+                raise ValueError(f"Key {key} would be prefetched outside {root}.")
+            paths[key] = path
+
+    futures = {}
+    with _PREFETCH_LOCK:
+        if _PREFETCH_POOL is None:
+            _PREFETCH_POOL = ThreadPoolExecutor(
+                max_workers=PREFETCH_MAX_WORKERS, thread_name_prefix="prefetch"
+            )
+        _evict_prefetched()
+        for key, target in paths.items():
+            entry = _PREFETCHED.get((bucket, key))
+            if entry is not None:
+                future = entry[1]
+            elif target is None:
+                future = _PREFETCH_POOL.submit(_fetch_object, bucket, key)
+            else:
+                future = _PREFETCH_POOL.submit(_prefetch_to_file, bucket, key, target)
+            if entry is None:
+                _PREFETCHED[(bucket, key)] = (time.monotonic(), future)
+            futures[key] = future
+        _evict_prefetched()
+    return futures
+
+
+def clear_prefetched() -> None:
+    """Drop all prefetched objects and cancel pending downloads."""
+    with _PREFETCH_LOCK:
+        for _, future in _PREFETCHED.values():
+            future.cancel()
+        _PREFETCHED.clear()
+
+
+class _HashingBuffer(BytesIO):
+    """A BytesIO that computes the md5 of the data while it is written."""
+
+    def __init__(self) -> None:
+        """Create an empty buffer."""
+        super().__init__()
+        self._md5 = hashlib.md5()  # noqa: S303
+        self._hashed = 0
+        self._sequential = True
+
+    def write(self, data: Any) -> int:
+        """Write data and add it to the hash.
+
+        Parameters
+        ----------
+        data : Any
+            A bytes-like object.
+
+        Returns
+        -------
+        int
+            The number of bytes written.
+
+        """
+        if self.tell() != self._hashed:
+            # Writers that seek back can't be hashed incrementally.
+            self._sequential = False
+        count = super().write(data)
+        if self._sequential:
+            self._md5.update(data)
+            self._hashed += count
+        return count
+
+    def hexdigest(self) -> str:
+        """Get the md5 of the buffer content.
+
+        Returns
+        -------
+        str
+            The hex md5 digest.
+
+        """
+        if self._sequential and self._hashed == len(self.getvalue()):
+            return self._md5.hexdigest()
+        return hashlib.md5(self.getvalue()).hexdigest()  # noqa: S303
+
+
+def _encode_buffer(skip_if_unchanged: bool) -> BytesIO:
+    """Create the buffer to serialize an object into.
+
+    Parameters
+    ----------
+    skip_if_unchanged : bool
+        Whether the content will be hashed to skip unchanged writes.
+
+    Returns
+    -------
+    BytesIO
+        An empty buffer, which hashes its content if skip_if_unchanged.
+
+    """
+    return _HashingBuffer() if skip_if_unchanged else BytesIO()
+
+
+def _stored_md5s(s3_client: Any, bucket: str, key: str) -> Set[str]:
+    """Get the md5 digests an existing object is known to have.
+
+    Parameters
+    ----------
+    s3_client : Any
+        The s3 client.
+    bucket : str
+        The S3 bucket.
+    key : str
+        The object key.
+
+    Returns
+    -------
+    Set[str]
+        The md5 stored in the object metadata and its ETag, which is the
+        md5 of single part uploads without KMS encryption. Empty if the
+        object doesn't exist.
+
+    """
+    try:
+        with metrics.timed("head_object"):
+            head = s3_client.head_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            return set()
+        else:
+            raise
+    md5s = {head["ETag"].strip('"')}
+    if "md5" in head.get("Metadata", {}):
+        md5s.add(head["Metadata"]["md5"])
+    return md5s
 
 
-def _write_object(bucket: str, key: str, buffer: BytesIO) -> None:
+def _write_object(
+    bucket: str, key: str, buffer: BytesIO, skip_if_unchanged: bool = False
+) -> bool:
     """Write an object in byte format to a given S3 bucket using the given key name.
 
     Parameters
@@ -62,15 +895,106 @@ def _write_object(bucket: str, key: str, buffer: BytesIO) -> None:
         The object key within the s3 bucket to write to.
     buffer : BytesIO
         The BytesIO object containing the data to write.
+    skip_if_unchanged : bool
+        Skip the upload if the object already has this content, comparing
+        its md5 with the ETag and stored md5 from a HEAD request.
+        (Default value = False).
+
+    Returns
+    -------
+    bool
+        False if the upload was skipped.
+
+    """
+    s3_client = get_client("s3")
+    body = buffer.getvalue()
+    kwargs: Dict[str, Any] = {}
+    if skip_if_unchanged:
+        md5 = (
+            buffer.hexdigest()
+            if isinstance(buffer, _HashingBuffer)
+            else hashlib.md5(body).hexdigest()  # noqa: S303
+        )
+        if md5 in _stored_md5s(s3_client, bucket, key):
+            metrics.increment("skipped_writes", operation="write_object")
+            return False
+        kwargs["Metadata"] = {"md5": md5}
+    with tracing.span("write_object", bucket=bucket, key=key, bytes=len(body)):
+        with metrics.timed("write_object"):
+            s3_client.put_object(Bucket=bucket, Key=key, Body=body, **kwargs)
+    _invalidate_prefetched(bucket, [key])
+    metrics.increment("bytes_out", len(body), operation="write_object")
+    return True
+
+
+def _read_object_if_changed(
+    bucket: str,
+    key: str,
+    etag: Optional[str] = None,
+    modified_since: Optional[datetime.datetime] = None,
+) -> Optional[Dict[str, Any]]:
+    """Read an object unless it matches the given ETag or wasn't modified since.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+    etag : Optional[str]
+        Send If-None-Match with this ETag. (Default value = None).
+    modified_since : Optional[datetime.datetime]
+        Send If-Modified-Since with this time. (Default value = None).
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        The GetObject response with the body read into a BytesIO,
+        or None if S3 responded 304 Not Modified.
+
+    Raises
+    ------
+    ValueError
+        If the file couldn't be found.
 
     """
-    s3_client = boto3.Session().client("s3")
-    s3_client.put_object(Bucket=bucket, Key=key, Body=buffer.getvalue())
+    s3_client = get_client("s3")
+    conditions: Dict[str, Any] = {}
+    if etag is not None:
+        conditions["IfNoneMatch"] = etag
+    if modified_since is not None:
+        conditions["IfModifiedSince"] = modified_since
+    try:
+        with tracing.span("read_object_if_changed", bucket=bucket, key=key) as span:
+            with metrics.timed("read_object_if_changed"):
+                try:
+                    response = s3_client.get_object(
+                        Bucket=bucket, Key=key, **conditions
+                    )
+                except ClientError as e:
+                    if e.response["Error"]["Code"] not in ("304", "NotModified"):
+                        raise
+                    span["not_modified"] = True
+                    metrics.increment(
+                        "not_modified", operation="read_object_if_changed"
+                    )
+                    return None
+                data = _allocate(response["ContentLength"])
+                _read_body_into(response["Body"], data, 0, response["ContentLength"])
+                response["Body"] = data
+            span["bytes"] = response["ContentLength"]
+        metrics.increment("bytes_in", span["bytes"], operation="read_object_if_changed")
+        return response  # type: ignore
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            raise ValueError("File doesn't exist.")
+        else:
+            raise
 
 
 def read_dataframe(
     bucket: str, key: str, inputformat: Optional[str] = None, **kwargs: str
-) -> pd.DataFrame:
+) -> "pd.DataFrame":
     """Read a pandas dataframe from a given s3 bucket and key.
     An input format can be manually specified. Otherwise the
     function will try to infer it from the given object key.
@@ -100,167 +1024,1799 @@ def read_dataframe(
         when None is given.
 
     """
+    data = _read_object(bucket=bucket, key=key)
+    return _decode_dataframe(data, key=key, inputformat=inputformat, **kwargs)
+
+
+def _decode_dataframe(
+    data: BytesIO, key: str, inputformat: Optional[str] = None, **kwargs: str
+) -> "pd.DataFrame":
+    """Decode a pandas dataframe read from S3.
+
+    Parameters
+    ----------
+    data : BytesIO
+        The object in byte format.
+    key : str
+        The object key, to infer the inputformat from.
+    inputformat : Optional[str]
+        The inputformat, one of {parquet, txt, csv, tsv}.
+        (Default value = None).
+    kwargs : Dict
+        Additional keyword arguments.
+
+    Returns
+    -------
+    pd.DataFrame
+        A pandas DataFrame.
+
+    Raises
+    ------
+    ValueError
+        If either an incorrect inputformat is given or inferred
+        when None is given.
+
+    """
+    import pandas as pd
+
     if not inputformat:
         inputformat = pathlib.Path(key).suffix[1:]
 
-    data = _read_object(bucket=bucket, key=key)
-
-    if inputformat == "parquet":
-        return pd.read_parquet(data, **kwargs)
-    elif inputformat == "csv":
-        return pd.read_csv(data, **kwargs)
-    elif inputformat == "tsv" or inputformat == "txt":
-        return pd.read_csv(data, sep="\t", **kwargs)
-    else:
-        raise ValueError(
-            "Invalid (inferred) inputformat. Use one of: parquet, txt, csv, tsv."
-        )
+    with tracing.span("decode", category="codec", format=inputformat) as span:
+        if inputformat == "parquet":
+            import pyarrow as pa
+
+            # Read the columns straight from the buffer instead of copying
+            # them out through BytesIO.read.
+            dataframe = pd.read_parquet(pa.BufferReader(data.getvalue()), **kwargs)
+        elif inputformat == "csv":
+            dataframe = pd.read_csv(data, **kwargs)
+        elif inputformat == "tsv" or inputformat == "txt":
+            dataframe = pd.read_csv(data, sep="\t", **kwargs)
+        else:
+            raise ValueError(
+                "Invalid (inferred) inputformat. Use one of: parquet, txt, csv, tsv."
+            )
+        span["rows"] = len(dataframe)
+    return dataframe
 
 
-def write_dataframe(
-    dataframe: pd.DataFrame,
-    bucket: str,
+def _encode_dataframe(
+    dataframe: "pd.DataFrame",
     key: str,
-    outputformat: Optional[str] = None,
-    **kwargs: str,
+    buffer: BytesIO,
+    outputformat: Optional[str],
+    kwargs: Dict[str, Any],
 ) -> None:
+    """Encode a pandas dataframe into a buffer.
+
+    Parameters
+    ----------
+    dataframe : pd.DataFrame
+        The pandas DataFrame to encode.
+    key : str
+        The object key, to infer the format from.
+    buffer : BytesIO
+        The buffer to write to.
+    outputformat : Optional[str]
+        One of {parquet, txt, csv, tsv}, or None to infer it from the key.
+    kwargs : Dict[str, Any]
+        Additional keyword arguments for the pandas writer.
+
+    Raises
+    ------
+    ValueError
+        If either an incorrect outputformat is given or inferred
+        when None is given.
+
+    """
+    if not outputformat:
+        outputformat = pathlib.Path(key).suffix[1:]
+
+    with tracing.span(
+        "encode", category="codec", format=outputformat, rows=len(dataframe)
+    ) as span:
+        if outputformat == "parquet":
+            dataframe.to_parquet(buffer, engine="pyarrow", index=False, **kwargs)
+        elif outputformat == "csv":
+            dataframe.to_csv(buffer, index=False, **kwargs)
+        elif outputformat == "tsv" or outputformat == "txt":
+            dataframe.to_csv(buffer, sep="\t", index=False, **kwargs)
+        else:
+            raise ValueError(
+                "Invalid (inferred) outputformat. Use one of: parquet, txt, csv, tsv."
+            )
+        span["bytes"] = buffer.tell()
+
+
+def write_dataframe(
+    dataframe: "pd.DataFrame",
+    bucket: str,
+    key: str,
+    outputformat: Optional[str] = None,
+    skip_if_unchanged: bool = False,
+    **kwargs: str,
+) -> bool:
     """Write a pandas dataframe to a given s3 bucket using the given key.
     An output format can be manually specified. Otherwise the
     function will try to infer it from the given object key.
 
     Parameters
     ----------
-    dataframe : pd.DataFrame
-        The pandas DataFrame to write.
+    dataframe : pd.DataFrame
+        The pandas DataFrame to write.
+    bucket : str
+        The S3 bucket to write to.
+    key : str
+        The object key within the s3 bucket to write to.
+    outputformat : Optional[str]
+        The target output format.
+        Can be one of {parquet, txt, csv, tsv}.
+        (Default value = None).
+    skip_if_unchanged : bool
+        Skip the upload if the object already has the same content.
+        (Default value = False).
+    kwargs : Dict
+        Additional keyword arguments.
+
+    Returns
+    -------
+    bool
+        False if the upload was skipped because the object was unchanged.
+
+    Raises
+    ------
+    ValueError
+        If either an incorrect inputformat is given or inferred
+        when None is given.
+
+    """
+    buffer = _encode_buffer(skip_if_unchanged)
+    _encode_dataframe(dataframe, key, buffer, outputformat, kwargs)
+    return _write_object(
+        bucket=bucket, key=key, buffer=buffer, skip_if_unchanged=skip_if_unchanged
+    )
+
+
+def read_numpy_array(
+    bucket: str,
+    key: str,
+) -> Any:
+    """Read a numpy array from a given s3 bucket and key.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+
+    Returns
+    -------
+    np.array
+        A numpy array.
+
+    """
+    import numpy as np
+
+    data = _read_object(bucket=bucket, key=key)
+    with tracing.span("decode", category="codec", format="numpy"):
+        return np.load(data, allow_pickle=True)
+
+
+def write_numpy_array(
+    array: "np.array",
+    bucket: str,
+    key: str,
+    skip_if_unchanged: bool = False,
+) -> bool:
+    """Write a numpy array to a given s3 bucket using the given key.
+
+    Parameters
+    ----------
+    array : np.array
+        The numpy array to write.
+    bucket : str
+        The S3 bucket to write to.
+    key : str
+        The object key within the s3 bucket to write to.
+    skip_if_unchanged : bool
+        Skip the upload if the object already has the same content.
+        (Default value = False).
+
+    Returns
+    -------
+    bool
+        False if the upload was skipped because the object was unchanged.
+
+    """
+    buffer = _encode_buffer(skip_if_unchanged)
+    with tracing.span("encode", category="codec", format="numpy") as span:
+        pickle.dump(array, buffer)
+        span["bytes"] = buffer.tell()
+    buffer.seek(0)
+    return _write_object(
+        bucket=bucket, key=key, buffer=buffer, skip_if_unchanged=skip_if_unchanged
+    )
+
+
+def _import_scipy_sparse() -> Any:
+    """Import scipy.sparse, which is installed with the sparse extra.
+
+    Returns
+    -------
+    Any
+        The scipy.sparse module.
+
+    Raises
+    ------
+    ImportError
+        If scipy isn't installed.
+
+    """
+    try:
+        import scipy.sparse
+    except ImportError as e:
+        raise ImportError(
+            "Sparse matrices need scipy, install talus-aws-utils[sparse]."
+        ) from e
+    return scipy.sparse
+
+
+def read_sparse_matrix(bucket: str, key: str) -> Any:
+    """Read a scipy sparse matrix from a given s3 bucket and key.
+
+    Requires scipy, install the sparse extra.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+
+    Returns
+    -------
+    scipy.sparse.spmatrix
+        The sparse matrix, in the format it was written in.
+
+    Raises
+    ------
+    ImportError
+        If scipy isn't installed.
+
+    """
+    sparse = _import_scipy_sparse()
+    data = _read_object(bucket=bucket, key=key)
+    with tracing.span("decode", category="codec", format="sparse"):
+        return sparse.load_npz(data)
+
+
+def write_sparse_matrix(
+    matrix: Any,
+    bucket: str,
+    key: str,
+    compressed: bool = False,
+    skip_if_unchanged: bool = False,
+) -> bool:
+    """Write a scipy sparse matrix to a given s3 bucket using the given key.
+
+    Only the nonzero values and their indices are stored, in the npz
+    format of scipy.sparse.save_npz. Requires scipy, install the sparse extra.
+
+    Parameters
+    ----------
+    matrix : scipy.sparse.spmatrix
+        The CSR, CSC, COO, BSR or DIA matrix to write.
+    bucket : str
+        The S3 bucket to write to.
+    key : str
+        The object key within the s3 bucket to write to.
+    compressed : bool
+        Whether to compress the arrays with zlib, trading encode and
+        decode time for a smaller object. (Default value = False).
+    skip_if_unchanged : bool
+        Skip the upload if the object already has the same content.
+        (Default value = False).
+
+    Returns
+    -------
+    bool
+        False if the upload was skipped because the object was unchanged.
+
+    Raises
+    ------
+    ImportError
+        If scipy isn't installed.
+
+    """
+    sparse = _import_scipy_sparse()
+    buffer = _encode_buffer(skip_if_unchanged)
+    with tracing.span(
+        "encode", category="codec", format="sparse", rows=matrix.shape[0]
+    ) as span:
+        sparse.save_npz(buffer, matrix, compressed=compressed)
+        span["bytes"] = buffer.tell()
+    buffer.seek(0)
+    return _write_object(
+        bucket=bucket, key=key, buffer=buffer, skip_if_unchanged=skip_if_unchanged
+    )
+
+
+def read_joblib(
+    bucket: str,
+    key: str,
+) -> Any:
+    """Read a joblib model from a given s3 bucket and key.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+
+    Returns
+    -------
+    np.array
+        A joblib model.
+
+    """
+    import joblib
+
+    data = _read_object(bucket=bucket, key=key)
+    with tracing.span("decode", category="codec", format="joblib"):
+        return joblib.load(data)
+
+
+def write_joblib(
+    model: Any,
+    bucket: str,
+    key: str,
+    skip_if_unchanged: bool = False,
+) -> bool:
+    """Write a joblib model to a given s3 bucket using the given key.
+
+    Parameters
+    ----------
+    array : np.array
+        The joblib model to write.
+    bucket : str
+        The S3 bucket to write to.
+    key : str
+        The object key within the s3 bucket to write to.
+    skip_if_unchanged : bool
+        Skip the upload if the object already has the same content.
+        (Default value = False).
+
+    Returns
+    -------
+    bool
+        False if the upload was skipped because the object was unchanged.
+
+    """
+    import joblib
+
+    buffer = _encode_buffer(skip_if_unchanged)
+    with tracing.span("encode", category="codec", format="joblib") as span:
+        joblib.dump(model, buffer)
+        span["bytes"] = buffer.tell()
+    buffer.seek(0)
+    return _write_object(
+        bucket=bucket, key=key, buffer=buffer, skip_if_unchanged=skip_if_unchanged
+    )
+
+
+def read_json(bucket: str, key: str) -> Union[Any, Dict[str, Any]]:
+    """Read a json object from a given s3 bucket and key.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+
+    Returns
+    -------
+    Dict
+        A Python Dict of the loaded json object.
+
+    """
+    file_content = _read_object(bucket=bucket, key=key)
+    with tracing.span("decode", category="codec", format="json"):
+        return json.loads(file_content.getvalue())
+
+
+def write_json(
+    dict_obj: Dict[str, Any], bucket: str, key: str, skip_if_unchanged: bool = False
+) -> bool:
+    """Write a Dict to S3 as a json file.
+
+    Parameters
+    ----------
+    dict_obj : Dict[str, Any]
+        The Dict object to save as json.
+    bucket : str
+        The S3 bucket to write to.
+    key : str
+        The object key within the s3 bucket to write to.
+    skip_if_unchanged : bool
+        Skip the upload if the object already has the same content.
+        (Default value = False).
+
+    Returns
+    -------
+    bool
+        False if the upload was skipped because the object was unchanged.
+
+    """
+    buffer = _encode_buffer(skip_if_unchanged)
+    with tracing.span("encode", category="codec", format="json") as span:
+        span["bytes"] = buffer.write(json.dumps(dict_obj).encode("utf-8"))
+    buffer.seek(0)
+    return _write_object(
+        bucket=bucket, key=key, buffer=buffer, skip_if_unchanged=skip_if_unchanged
+    )
+
+
+def read_dataframe_if_changed(
+    bucket: str,
+    key: str,
+    etag: Optional[str] = None,
+    modified_since: Optional[datetime.datetime] = None,
+    inputformat: Optional[str] = None,
+    **kwargs: str,
+) -> Union[VersionedObject, _NotModifiedType]:
+    """Read a pandas dataframe from S3 only if it changed.
+
+    Sends the given ETag as If-None-Match and the given time as
+    If-Modified-Since, so an unchanged object is neither transferred
+    nor decoded::
+
+        result = read_dataframe_if_changed(bucket, key, etag=last.etag)
+        if result is not NOT_MODIFIED:
+            last = result
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+    etag : Optional[str]
+        The ETag of the last read. (Default value = None).
+    modified_since : Optional[datetime.datetime]
+        The last modified time of the last read. (Default value = None).
+    inputformat : Optional[str]
+        The target inputformat.
+        Can be one of {parquet, txt, csv, tsv}.
+        (Default value = None).
+    kwargs : Dict
+        Additional keyword arguments.
+
+    Returns
+    -------
+    Union[VersionedObject, _NotModifiedType]
+        The DataFrame with its ETag and last modified time,
+        or NOT_MODIFIED if the object didn't change.
+
+    """
+    response = _read_object_if_changed(
+        bucket=bucket, key=key, etag=etag, modified_since=modified_since
+    )
+    if response is None:
+        return NOT_MODIFIED
+    return VersionedObject(
+        value=_decode_dataframe(
+            response["Body"], key=key, inputformat=inputformat, **kwargs
+        ),
+        etag=response["ETag"],
+        last_modified=response["LastModified"],
+    )
+
+
+def read_json_if_changed(
+    bucket: str,
+    key: str,
+    etag: Optional[str] = None,
+    modified_since: Optional[datetime.datetime] = None,
+) -> Union[VersionedObject, _NotModifiedType]:
+    """Read a json object from S3 only if it changed.
+
+    See read_dataframe_if_changed.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+    etag : Optional[str]
+        The ETag of the last read. (Default value = None).
+    modified_since : Optional[datetime.datetime]
+        The last modified time of the last read. (Default value = None).
+
+    Returns
+    -------
+    Union[VersionedObject, _NotModifiedType]
+        The loaded json object with its ETag and last modified time,
+        or NOT_MODIFIED if the object didn't change.
+
+    """
+    response = _read_object_if_changed(
+        bucket=bucket, key=key, etag=etag, modified_since=modified_since
+    )
+    if response is None:
+        return NOT_MODIFIED
+    with tracing.span("decode", category="codec", format="json"):
+        value = json.loads(response["Body"].read())
+    return VersionedObject(
+        value=value, etag=response["ETag"], last_modified=response["LastModified"]
+    )
+
+
+def _jsonl_compression(key: str, compression: Optional[str]) -> Optional[str]:
+    """Resolve the compression of a JSON Lines object.
+
+    Parameters
+    ----------
+    key : str
+        The object key.
+    compression : Optional[str]
+        One of infer, gzip or None.
+
+    Returns
+    -------
+    Optional[str]
+        gzip or None.
+
+    Raises
+    ------
+    ValueError
+        If an unknown compression is given.
+
+    """
+    if compression == "infer":
+        return "gzip" if key.endswith(".gz") else None
+    if compression not in ("gzip", None):
+        raise ValueError("Invalid compression. Use one of: infer, gzip, None.")
+    return compression
+
+
+def _iter_lines(stream: Any) -> Iterator[bytes]:
+    """Split a byte stream into lines, one chunk at a time.
+
+    Parameters
+    ----------
+    stream : Any
+        A readable binary stream.
+
+    Yields
+    ------
+    bytes
+        The lines without their line break.
+
+    """
+    pending = b""
+    for chunk in iter(lambda: stream.read(READ_CHUNK_SIZE), b""):
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def iter_jsonl(
+    bucket: str,
+    key: str,
+    batch_size: Optional[int] = None,
+    as_dataframe: bool = False,
+    compression: Optional[str] = "infer",
+) -> Iterator[Any]:
+    """Stream the records of a JSON Lines object.
+
+    The object is parsed while it downloads, so only the current chunk and
+    batch are held in memory::
+
+        for psms in iter_jsonl(bucket, "psms.jsonl.gz", as_dataframe=True):
+            process(psms)
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    key : str
+        The object key within the s3 bucket.
+    batch_size : Optional[int]
+        Yield lists of this many records instead of single records.
+        (Default value = None).
+    as_dataframe : bool
+        Yield every batch as a pandas DataFrame. Batches have
+        JSONL_BATCH_SIZE records if no batch_size is given.
+        (Default value = False).
+    compression : Optional[str]
+        One of gzip, None or infer, which uses gzip for keys ending
+        with .gz. (Default value = "infer").
+
+    Yields
+    ------
+    Any
+        Every record, or lists or DataFrames of records.
+
+    Raises
+    ------
+    ValueError
+        If the file couldn't be found or an invalid compression is given.
+
+    """
+    compression = _jsonl_compression(key, compression)
+    if as_dataframe:
+        import pandas as pd
+
+        batch_size = batch_size or JSONL_BATCH_SIZE
+
+    s3_client = get_client("s3")
+    try:
+        with metrics.timed("iter_jsonl"):
+            response = s3_client.get_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            raise ValueError("File doesn't exist.")
+        else:
+            raise
+
+    body = response["Body"]
+    stream = gzip.GzipFile(fileobj=body, mode="rb") if compression else body
+    records = (json.loads(line) for line in _iter_lines(stream) if line.strip())
+    try:
+        if batch_size is None:
+            yield from records
+            return
+        while True:
+            with tracing.span("decode", category="codec", format="jsonl") as span:
+                batch = list(itertools.islice(records, batch_size))
+                span["rows"] = len(batch)
+            if not batch:
+                return
+            yield pd.DataFrame.from_records(batch) if as_dataframe else batch
+    finally:
+        body.close()
+        metrics.increment("bytes_in", response["ContentLength"], operation="iter_jsonl")
+
+
+class _MultipartWriter(io.RawIOBase):
+    """A writable stream that uploads to S3 in parts of a fixed size.
+
+    Objects smaller than one part are uploaded with a single PUT.
+    """
+
+    def __init__(self, bucket: str, key: str, part_size: int) -> None:
+        """Create a writer.
+
+        Parameters
+        ----------
+        bucket : str
+            The S3 bucket to write to.
+        key : str
+            The object key within the s3 bucket to write to.
+        part_size : int
+            Size of the uploaded parts in bytes.
+
+        """
+        super().__init__()
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self._client = get_client("s3")
+        self._buffer = BytesIO()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict[str, Any]] = []
+
+    def writable(self) -> bool:
+        """Return True, the stream can be written."""
+        return True
+
+    def write(self, data: Any) -> int:
+        """Buffer data and upload every full part.
+
+        Parameters
+        ----------
+        data : Any
+            A bytes-like object.
+
+        Returns
+        -------
+        int
+            The number of bytes written.
+
+        """
+        count = self._buffer.write(data)
+        if self._buffer.tell() >= self.part_size:
+            self._upload_part()
+        return count
+
+    def _upload_part(self) -> None:
+        """Upload the buffered data as the next part."""
+        if self._upload_id is None:
+            with metrics.timed("create_multipart_upload"):
+                self._upload_id = self._client.create_multipart_upload(
+                    Bucket=self.bucket, Key=self.key
+                )["UploadId"]
+        body = self._buffer.getvalue()
+        self._buffer = BytesIO()
+        number = len(self._parts) + 1
+        with tracing.span("upload_part", bucket=self.bucket, key=self.key) as span:
+            with metrics.timed("upload_part"):
+                response = self._client.upload_part(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self._upload_id,
+                    PartNumber=number,
+                    Body=body,
+                )
+            span["bytes"] = len(body)
+        metrics.increment("bytes_out", len(body), operation="upload_part")
+        self._parts.append({"PartNumber": number, "ETag": response["ETag"]})
+
+    def complete(self) -> None:
+        """Upload the remaining data and finish the object."""
+        if self._upload_id is None:
+            _write_object(bucket=self.bucket, key=self.key, buffer=self._buffer)
+            return
+        if self._buffer.tell():
+            self._upload_part()
+        with metrics.timed("complete_multipart_upload"):
+            self._client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+        _invalidate_prefetched(self.bucket, [self.key])
+
+    def abort(self) -> None:
+        """Abort the upload, dropping the uploaded parts."""
+        if self._upload_id is not None:
+            with metrics.timed("abort_multipart_upload"):
+                self._client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+                )
+
+
+def write_jsonl(
+    records: Iterable[Any],
+    bucket: str,
+    key: str,
+    compression: Optional[str] = "infer",
+    part_size: int = UPLOAD_PART_SIZE,
+) -> int:
+    """Stream records to S3 as a JSON Lines object.
+
+    Records are serialized one at a time and uploaded in parts of
+    part_size while the iterable is consumed, so records can come from a
+    generator and memory stays bounded by one part. pandas DataFrames in
+    records are written as their rows. If the iterable raises, the
+    upload is aborted and no object is written.
+
+    Parameters
+    ----------
+    records : Iterable[Any]
+        The json serializable records or DataFrames of records.
+    bucket : str
+        The S3 bucket to write to.
+    key : str
+        The object key within the s3 bucket to write to.
+    compression : Optional[str]
+        One of gzip, None or infer, which uses gzip for keys ending
+        with .gz. (Default value = "infer").
+    part_size : int
+        Size of the uploaded parts in bytes, at least 5 MiB.
+        (Default value = UPLOAD_PART_SIZE).
+
+    Returns
+    -------
+    int
+        The number of records written.
+
+    Raises
+    ------
+    ValueError
+        If an invalid compression is given.
+
+    """
+    compression = _jsonl_compression(key, compression)
+    if part_size < 5 * 1024**2:
+        raise ValueError("part_size must be at least 5 MiB.")
+
+    writer = _MultipartWriter(bucket=bucket, key=key, part_size=part_size)
+    stream: Any = gzip.GzipFile(fileobj=writer, mode="wb") if compression else writer
+    count = 0
+    try:
+        with tracing.span("encode", category="codec", format="jsonl") as span:
+            for record in records:
+                if hasattr(record, "to_json") and hasattr(record, "columns"):
+                    if len(record):
+                        stream.write(
+                            record.to_json(orient="records", lines=True)
+                            .rstrip("\n")
+                            .encode("utf-8")
+                            + b"\n"
+                        )
+                    count += len(record)
+                else:
+                    stream.write(json.dumps(record).encode("utf-8") + b"\n")
+                    count += 1
+            span["rows"] = count
+        if compression:
+            stream.close()
+        writer.complete()
+    except BaseException:
+        writer.abort()
+        raise
+    return count
+
+
+def _decode_dataframe_bytes(
+    data: bytes,
+    key: str,
+    inputformat: Optional[str],
+    kwargs: Dict[str, str],
+    ipc: bool,
+) -> Any:
+    """Decode a dataframe, optionally serialized as Arrow IPC stream.
+
+    Parameters
+    ----------
+    data : bytes
+        The object in byte format.
+    key : str
+        The object key, to infer the inputformat from.
+    inputformat : Optional[str]
+        The inputformat, one of {parquet, txt, csv, tsv}.
+    kwargs : Dict[str, str]
+        Additional keyword arguments.
+    ipc : bool
+        Whether to return the DataFrame as Arrow IPC stream, to send it
+        from a worker process without pickling its columns.
+
+    Returns
+    -------
+    Any
+        The DataFrame, or its Arrow IPC stream as bytes.
+
+    """
+    dataframe = _decode_dataframe(
+        BytesIO(data), key=key, inputformat=inputformat, **kwargs
+    )
+    if not ipc:
+        return dataframe
+
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(dataframe)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _load_ipc(data: bytes) -> "pd.DataFrame":
+    """Load a DataFrame from an Arrow IPC stream.
+
+    Parameters
+    ----------
+    data : bytes
+        The Arrow IPC stream.
+
+    Returns
+    -------
+    pd.DataFrame
+        The DataFrame.
+
+    """
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(data).read_all().to_pandas()
+
+
+def _decode_json_bytes(data: bytes, key: str) -> Any:
+    """Decode a json object.
+
+    Parameters
+    ----------
+    data : bytes
+        The object in byte format.
+    key : str
+        The object key.
+
+    Returns
+    -------
+    Any
+        The loaded json object.
+
+    """
+    return json.loads(data)
+
+
+def _read_many(
+    bucket: str,
+    keys: List[str],
+    decode: Callable[[bytes, str], Any],
+    max_workers: int,
+    processes: Optional[int],
+    load: Optional[Callable[[Any], Any]] = None,
+) -> List[Any]:
+    """Download objects on a thread pool and decode them in threads or processes.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    keys : List[str]
+        The object keys.
+    decode : Callable[[bytes, str], Any]
+        Decodes the bytes of the object with the given key. Must be
+        picklable if processes is given.
+    max_workers : int
+        Maximum number of concurrent downloads.
+    processes : Optional[int]
+        Number of decoding processes, or None to decode in the download
+        threads.
+    load : Optional[Callable[[Any], Any]]
+        Converts the result of decode in the calling process.
+        (Default value = None).
+
+    Returns
+    -------
+    List[Any]
+        The decoded objects in the order of keys.
+
+    """
+    if processes is None:
+
+        def read(key: str) -> Any:
+            return decode(_read_object(bucket=bucket, key=key).getvalue(), key)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(read, keys))
+
+    # Spawn instead of fork: forking a process with running boto3 threads
+    # can deadlock on locks held by those threads.
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+    ) as decoders, ThreadPoolExecutor(max_workers=max_workers) as downloads:
+        downloaded = {
+            downloads.submit(_read_object, bucket=bucket, key=key): index
+            for index, key in enumerate(keys)
+        }
+        decoded = {}
+        for future in as_completed(downloaded):
+            index = downloaded[future]
+            data = future.result().getvalue()
+            decoded[decoders.submit(decode, data, keys[index])] = index
+        results: List[Any] = [None] * len(keys)
+        for future in as_completed(decoded):
+            results[decoded[future]] = future.result()
+            if load is not None:
+                with tracing.span("load", category="codec"):
+                    results[decoded[future]] = load(results[decoded[future]])
+    return results
+
+
+def read_dataframes(
+    bucket: str,
+    keys: List[str],
+    inputformat: Optional[str] = None,
+    max_workers: int = 16,
+    processes: Optional[int] = None,
+    **kwargs: str,
+) -> List["pd.DataFrame"]:
+    """Read many pandas dataframes concurrently.
+
+    Objects are downloaded on a thread pool. Parsing csv and tsv files is
+    CPU-bound and holds the GIL, so with processes the raw bytes are
+    decoded on a process pool instead, and the DataFrames are sent back
+    as Arrow IPC streams, which is much cheaper than pickling them. The
+    pool is started for each call, so only use processes for many or
+    large objects. Decode spans within the processes aren't traced.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    keys : List[str]
+        The object keys within the s3 bucket.
+    inputformat : Optional[str]
+        The target inputformat.
+        Can be one of {parquet, txt, csv, tsv}.
+        If None, it is inferred from each key.
+        (Default value = None).
+    max_workers : int
+        Maximum number of concurrent downloads. (Default value = 16).
+    processes : Optional[int]
+        Number of decoding processes. Decodes in the download threads if
+        None. (Default value = None).
+    kwargs : Dict
+        Additional keyword arguments.
+
+    Returns
+    -------
+    List[pd.DataFrame]
+        The DataFrames in the order of keys.
+
+    """
+    ipc = processes is not None
+    return _read_many(
+        bucket=bucket,
+        keys=list(keys),
+        decode=partial(
+            _decode_dataframe_bytes, inputformat=inputformat, kwargs=kwargs, ipc=ipc
+        ),
+        max_workers=max_workers,
+        processes=processes,
+        load=_load_ipc if ipc else None,
+    )
+
+
+def read_jsons(
+    bucket: str,
+    keys: List[str],
+    max_workers: int = 16,
+    processes: Optional[int] = None,
+) -> List[Any]:
+    """Read many json objects concurrently.
+
+    See read_dataframes. The json objects decoded in processes are sent
+    back pickled, which is still much faster than parsing them.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to load from.
+    keys : List[str]
+        The object keys within the s3 bucket.
+    max_workers : int
+        Maximum number of concurrent downloads. (Default value = 16).
+    processes : Optional[int]
+        Number of decoding processes. Decodes in the download threads if
+        None. (Default value = None).
+
+    Returns
+    -------
+    List[Any]
+        The loaded json objects in the order of keys.
+
+    """
+    return _read_many(
+        bucket=bucket,
+        keys=list(keys),
+        decode=_decode_json_bytes,
+        max_workers=max_workers,
+        processes=processes,
+    )
+
+
+class WriteResult(NamedTuple):
+    """The outcome of a batch write."""
+
+    written: List[str]
+    skipped: List[str]
+    errors: Dict[str, str]
+
+
+def _encode_dataframe_bytes(
+    dataframe: "pd.DataFrame",
+    key: str,
+    outputformat: Optional[str],
+    kwargs: Dict[str, Any],
+) -> bytes:
+    """Encode a pandas dataframe, see _encode_dataframe.
+
+    Parameters
+    ----------
+    dataframe : pd.DataFrame
+        The pandas DataFrame to encode.
+    key : str
+        The object key, to infer the format from.
+    outputformat : Optional[str]
+        One of {parquet, txt, csv, tsv}, or None to infer it from the key.
+    kwargs : Dict[str, Any]
+        Additional keyword arguments for the pandas writer.
+
+    Returns
+    -------
+    bytes
+        The encoded DataFrame.
+
+    """
+    buffer = BytesIO()
+    _encode_dataframe(dataframe, key, buffer, outputformat, kwargs)
+    return buffer.getvalue()
+
+
+def _encode_json_bytes(obj: Any, key: str) -> bytes:
+    """Encode a json object.
+
+    Parameters
+    ----------
+    obj : Any
+        The json serializable object.
+    key : str
+        The object key.
+
+    Returns
+    -------
+    bytes
+        The utf-8 encoded json.
+
+    """
+    with tracing.span("encode", category="codec", format="json") as span:
+        data = json.dumps(obj).encode("utf-8")
+        span["bytes"] = len(data)
+    return data
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Check whether a failed upload may succeed when tried again.
+
+    Parameters
+    ----------
+    error : Exception
+        The error of the upload.
+
+    Returns
+    -------
+    bool
+        True for connection errors, throttling and server errors.
+
+    """
+    if isinstance(error, BotoCoreError):
+        return True
+    if isinstance(error, ClientError):
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        code = error.response.get("Error", {}).get("Code")
+        return status >= 500 or code in _RETRYABLE_CODES
+    return False
+
+
+def _upload_with_retry(
+    bucket: str, key: str, data: bytes, skip_if_unchanged: bool, attempts: int
+) -> bool:
+    """Upload an object, retrying transient errors with exponential backoff.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to write to.
+    key : str
+        The object key within the s3 bucket to write to.
+    data : bytes
+        The content of the object.
+    skip_if_unchanged : bool
+        Skip the upload if the object already has this content.
+    attempts : int
+        Maximum number of attempts.
+
+    Returns
+    -------
+    bool
+        False if the upload was skipped.
+
+    """
+    attempt = 1
+    while True:
+        try:
+            return _write_object(
+                bucket=bucket,
+                key=key,
+                buffer=BytesIO(data),
+                skip_if_unchanged=skip_if_unchanged,
+            )
+        except Exception as e:
+            if attempt >= attempts or not _is_retryable(e):
+                raise
+            metrics.increment("write_retries", operation="write_object")
+            time.sleep(random.uniform(0, 0.1 * 2**attempt))  # noqa: S311
+            attempt += 1
+
+
+def _write_many(
+    bucket: str,
+    items: Iterable[Tuple[Any, str]],
+    encode: Callable[[Any, str], bytes],
+    max_workers: int,
+    processes: Optional[int],
+    attempts: int,
+    skip_if_unchanged: bool,
+) -> WriteResult:
+    """Encode and upload objects on a thread pool, encoding in threads or processes.
+
+    Every worker thread encodes an object, or waits for a process to encode
+    it, and then uploads it, so encoding and uploading of different objects
+    overlap. Items are only consumed as workers become free, which bounds
+    the memory to about 2 * max_workers encoded objects.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to write to.
+    items : Iterable[Tuple[Any, str]]
+        The objects and their keys.
+    encode : Callable[[Any, str], bytes]
+        Encodes an object for the given key. Must be picklable if
+        processes is given.
+    max_workers : int
+        Maximum number of concurrent uploads.
+    processes : Optional[int]
+        Number of encoding processes, or None to encode in the upload
+        threads.
+    attempts : int
+        Maximum number of attempts of every upload.
+    skip_if_unchanged : bool
+        Skip uploads of objects that already have the same content.
+
+    Returns
+    -------
+    WriteResult
+        The written and skipped keys and the error of every failed key.
+
+    """
+    result = WriteResult(written=[], skipped=[], errors={})
+    encoders = (
+        # Spawn instead of fork, see _read_many.
+        ProcessPoolExecutor(
+            max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+        )
+        if processes is not None
+        else None
+    )
+
+    def write(obj: Any, key: str) -> bool:
+        if encoders is not None:
+            data = encoders.submit(encode, obj, key).result()
+        else:
+            data = encode(obj, key)
+        return _upload_with_retry(bucket, key, data, skip_if_unchanged, attempts)
+
+    def collect(futures: Iterable["Future[bool]"]) -> None:
+        for future in futures:
+            key = in_flight.pop(future)
+            error = future.exception()
+            if error is not None:
+                result.errors[key] = f"{type(error).__name__}: {error}"
+            elif future.result():
+                result.written.append(key)
+            else:
+                result.skipped.append(key)
+
+    in_flight: Dict["Future[bool]", str] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for obj, key in items:
+                if len(in_flight) >= 2 * max_workers:
+                    collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                in_flight[pool.submit(write, obj, key)] = key
+            collect(wait(in_flight).done)
+    finally:
+        if encoders is not None:
+            encoders.shutdown()
+    return result
+
+
+def write_dataframes(
+    items: Iterable[Tuple["pd.DataFrame", str]],
+    bucket: str,
+    outputformat: Optional[str] = None,
+    max_workers: int = 16,
+    processes: Optional[int] = None,
+    attempts: int = WRITE_ATTEMPTS,
+    skip_if_unchanged: bool = False,
+    **kwargs: str,
+) -> WriteResult:
+    """Write many pandas dataframes concurrently.
+
+    Objects are encoded and uploaded on a thread pool, see write_dataframe.
+    Writing csv and tsv files is CPU-bound and holds the GIL, so with
+    processes they are encoded on a process pool instead, which costs
+    pickling every DataFrame to a process. Uploads that fail with
+    throttling, server or connection errors are retried. Writing doesn't
+    stop at failed keys, they are reported in the result instead::
+
+        result = write_dataframes(
+            ((df, f"samples/{name}.parquet") for name, df in results.items()),
+            bucket,
+        )
+        if result.errors:
+            ...
+
+    Parameters
+    ----------
+    items : Iterable[Tuple[pd.DataFrame, str]]
+        The DataFrames and the object keys to write them to. Consumed
+        lazily, so the DataFrames can be generated.
     bucket : str
         The S3 bucket to write to.
-    key : str
-        The object key within the s3 bucket to write to.
     outputformat : Optional[str]
         The target output format.
         Can be one of {parquet, txt, csv, tsv}.
+        If None, it is inferred from each key.
         (Default value = None).
+    max_workers : int
+        Maximum number of concurrent uploads. (Default value = 16).
+    processes : Optional[int]
+        Number of encoding processes. Encodes in the upload threads if
+        None. (Default value = None).
+    attempts : int
+        Maximum number of attempts of every upload.
+        (Default value = WRITE_ATTEMPTS).
+    skip_if_unchanged : bool
+        Skip uploads of objects that already have the same content.
+        (Default value = False).
     kwargs : Dict
         Additional keyword arguments.
 
-    Raises
-    ------
-    ValueError
-        If either an incorrect inputformat is given or inferred
-        when None is given.
+    Returns
+    -------
+    WriteResult
+        The written and skipped keys and the error of every failed key.
 
     """
-    if not outputformat:
-        outputformat = pathlib.Path(key).suffix[1:]
-
-    buffer = BytesIO()
-    if outputformat == "parquet":
-        dataframe.to_parquet(buffer, engine="pyarrow", index=False, **kwargs)
-    elif outputformat == "csv":
-        dataframe.to_csv(buffer, index=False, **kwargs)
-    elif outputformat == "tsv" or outputformat == "txt":
-        dataframe.to_csv(buffer, sep="\t", index=False, **kwargs)
-    else:
-        raise ValueError(
-            "Invalid (inferred) outputformat. Use one of: parquet, txt, csv, tsv."
-        )
-    _write_object(bucket=bucket, key=key, buffer=buffer)
-
-
-def read_numpy_array(
+    return _write_many(
+        bucket=bucket,
+        items=items,
+        encode=partial(
+            _encode_dataframe_bytes, outputformat=outputformat, kwargs=kwargs
+        ),
+        max_workers=max_workers,
+        processes=processes,
+        attempts=attempts,
+        skip_if_unchanged=skip_if_unchanged,
+    )
+
+
+def write_jsons(
+    items: Iterable[Tuple[Any, str]],
     bucket: str,
-    key: str,
-) -> Any:
-    """Read a numpy array from a given s3 bucket and key.
+    max_workers: int = 16,
+    processes: Optional[int] = None,
+    attempts: int = WRITE_ATTEMPTS,
+    skip_if_unchanged: bool = False,
+) -> WriteResult:
+    """Write many json objects concurrently.
+
+    See write_dataframes.
 
     Parameters
     ----------
+    items : Iterable[Tuple[Any, str]]
+        The json serializable objects and the object keys to write them to.
     bucket : str
-        The S3 bucket to load from.
-    key : str
-        The object key within the s3 bucket.
+        The S3 bucket to write to.
+    max_workers : int
+        Maximum number of concurrent uploads. (Default value = 16).
+    processes : Optional[int]
+        Number of encoding processes. Encodes in the upload threads if
+        None. (Default value = None).
+    attempts : int
+        Maximum number of attempts of every upload.
+        (Default value = WRITE_ATTEMPTS).
+    skip_if_unchanged : bool
+        Skip uploads of objects that already have the same content.
+        (Default value = False).
 
     Returns
     -------
-    np.array
-        A numpy array.
+    WriteResult
+        The written and skipped keys and the error of every failed key.
 
     """
-    data = _read_object(bucket=bucket, key=key)
-    return np.load(data, allow_pickle=True)
+    return _write_many(
+        bucket=bucket,
+        items=items,
+        encode=_encode_json_bytes,
+        max_workers=max_workers,
+        processes=processes,
+        attempts=attempts,
+        skip_if_unchanged=skip_if_unchanged,
+    )
 
 
-def write_numpy_array(
-    array: np.array,
-    bucket: str,
-    key: str,
-) -> None:
-    """Write a numpy array to a given s3 bucket using the given key.
+def _object_sizes(bucket: str, keys: List[str], max_workers: int) -> Dict[str, int]:
+    """Get the sizes of objects with concurrent HEAD requests.
 
     Parameters
     ----------
-    array : np.array
-        The numpy array to write.
     bucket : str
-        The S3 bucket to write to.
-    key : str
-        The object key within the s3 bucket to write to.
+        The S3 bucket.
+    keys : List[str]
+        The object keys.
+    max_workers : int
+        Maximum number of concurrent requests.
+
+    Returns
+    -------
+    Dict[str, int]
+        The size in bytes of every object.
+
+    Raises
+    ------
+    ValueError
+        If an object doesn't exist.
 
     """
-    buffer = BytesIO()
-    pickle.dump(array, buffer)
-    buffer.seek(0)
-    _write_object(bucket=bucket, key=key, buffer=buffer)
+    s3_client = get_client("s3")
 
+    def head(key: str) -> int:
+        try:
+            with metrics.timed("head_object"):
+                return int(
+                    s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+                )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise ValueError(f"File doesn't exist: {key}.")
+            else:
+                raise
 
-def read_joblib(
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(keys, pool.map(head, keys)))
+
+
+def iter_dataframes(
     bucket: str,
-    key: str,
-) -> Any:
-    """Read a joblib model from a given s3 bucket and key.
+    keys: List[str],
+    memory_budget: int,
+    expansion: float = 1.0,
+    sizes: Optional[Dict[str, int]] = None,
+    max_workers: int = 16,
+    inputformat: Optional[str] = None,
+    **kwargs: str,
+) -> Iterator[Tuple[str, "pd.DataFrame"]]:
+    """Read many pandas dataframes concurrently within a memory budget.
+
+    Each object reserves its size times expansion from the budget, and is
+    only downloaded once its reservation fits. Downloads start in the order
+    of keys and the DataFrames are yielded as they finish. A reservation is
+    released when the caller asks for the next DataFrame, so a slow
+    consumer holds back further downloads instead of letting finished
+    DataFrames pile up. An object larger than the whole budget is read
+    once nothing else is in flight::
+
+        for key, dataframe in iter_dataframes(bucket, keys, 4 * 1024**3, 5):
+            process(dataframe)
 
     Parameters
     ----------
     bucket : str
         The S3 bucket to load from.
-    key : str
-        The object key within the s3 bucket.
+    keys : List[str]
+        The object keys within the s3 bucket.
+    memory_budget : int
+        Maximum bytes reserved by downloads in flight and DataFrames
+        not yet consumed.
+    expansion : float
+        Estimated memory use per downloaded byte, e.g. 5 for compressed
+        parquet files that take five times their size once decoded.
+        (Default value = 1.0).
+    sizes : Optional[Dict[str, int]]
+        Object sizes, e.g. from a listing. Objects not in it are sized
+        with HEAD requests. (Default value = None).
+    max_workers : int
+        Maximum number of concurrent downloads. (Default value = 16).
+    inputformat : Optional[str]
+        The target inputformat.
+        Can be one of {parquet, txt, csv, tsv}.
+        If None, it is inferred from each key.
+        (Default value = None).
+    kwargs : Dict
+        Additional keyword arguments.
 
-    Returns
-    -------
-    np.array
-        A joblib model.
+    Yields
+    ------
+    Tuple[str, pd.DataFrame]
+        The key and DataFrame of every object, in order of completion.
+
+    Raises
+    ------
+    ValueError
+        If the memory budget isn't positive.
 
     """
-    data = _read_object(bucket=bucket, key=key)
-    return joblib.load(data)
+    if memory_budget <= 0:
+        raise ValueError("memory_budget must be positive.")
+
+    keys = list(keys)
+    sizes = dict(sizes or {})
+    missing = [key for key in keys if key not in sizes]
+    if missing:
+        sizes.update(_object_sizes(bucket, missing, max_workers=max_workers))
+
+    def read(key: str) -> "pd.DataFrame":
+        data = _read_object(bucket=bucket, key=key)
+        return _decode_dataframe(data, key=key, inputformat=inputformat, **kwargs)
+
+    pending = deque((key, math.ceil(sizes[key] * expansion)) for key in keys)
+    in_flight: Dict["Future[pd.DataFrame]", Tuple[str, int]] = {}
+    reserved = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or in_flight:
+            while (
+                pending
+                and len(in_flight) < max_workers
+                and (not in_flight or reserved + pending[0][1] <= memory_budget)
+            ):
+                key, cost = pending.popleft()
+                reserved += cost
+                in_flight[pool.submit(read, key)] = (key, cost)
+            metrics.observe("reserved_bytes", reserved, operation="iter_dataframes")
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, cost = in_flight.pop(future)
+                try:
+                    yield key, future.result()
+                finally:
+                    reserved -= cost
+
+
+class S3ObjectReader(io.RawIOBase):
+    """A seekable, read-only file object backed by S3 range GETs.
+
+    The object is read in blocks that are kept in a least recently used
+    cache. When blocks are read in order, the following blocks are fetched
+    with the same request, so sequential scans need few requests while
+    random access only fetches the blocks it touches. All range GETs are
+    pinned to the ETag of the object when it was opened, so an object that
+    is overwritten while being read raises an error instead of returning
+    mixed content. Use open_object to create a reader.
+    """
 
+    def __init__(
+        self,
+        bucket: str,
+        key: str,
+        block_size: int = READ_BLOCK_SIZE,
+        cache_blocks: int = READ_CACHE_BLOCKS,
+        readahead_blocks: int = READ_AHEAD_BLOCKS,
+    ) -> None:
+        """Open an object for reading.
+
+        Parameters
+        ----------
+        bucket : str
+            The S3 bucket to load from.
+        key : str
+            The object key within the s3 bucket.
+        block_size : int
+            Size of the cached blocks in bytes. (Default value = READ_BLOCK_SIZE).
+        cache_blocks : int
+            Maximum number of cached blocks. (Default value = READ_CACHE_BLOCKS).
+        readahead_blocks : int
+            Number of blocks to fetch ahead of sequential reads.
+            (Default value = READ_AHEAD_BLOCKS).
+
+        Raises
+        ------
+        ValueError
+            If the file couldn't be found or the block settings are invalid.
+
+        """
+        super().__init__()
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1.")
+        if readahead_blocks < 0 or cache_blocks < readahead_blocks + 1:
+            raise ValueError("cache_blocks must be larger than readahead_blocks.")
+
+        self.bucket = bucket
+        self.key = key
+        self.block_size = block_size
+        self.cache_blocks = cache_blocks
+        self.readahead_blocks = readahead_blocks
+        self._client = get_client("s3")
+        try:
+            with metrics.timed("head_object"):
+                head = self._client.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise ValueError("File doesn't exist.")
+            else:
+                raise
+        self.size: int = head["ContentLength"]
+        self.etag: str = head["ETag"]
+        self._position = 0
+        self._last_block = -1
+        self._cache: "OrderedDict[int, bytes]" = OrderedDict()
+
+    def readable(self) -> bool:
+        """Return True, the object can be read."""
+        return True
 
-def write_joblib(
-    model: Any,
-    bucket: str,
-    key: str,
-) -> None:
-    """Write a joblib model to a given s3 bucket using the given key.
+    def seekable(self) -> bool:
+        """Return True, the object supports random access."""
+        return True
 
-    Parameters
-    ----------
-    array : np.array
-        The joblib model to write.
-    bucket : str
-        The S3 bucket to write to.
-    key : str
-        The object key within the s3 bucket to write to.
+    def tell(self) -> int:
+        """Return the current position.
+
+        Returns
+        -------
+        int
+            The position in bytes from the start of the object.
+
+        """
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Change the position.
+
+        Parameters
+        ----------
+        offset : int
+            The offset relative to whence.
+        whence : int
+            One of io.SEEK_SET, io.SEEK_CUR or io.SEEK_END.
+            (Default value = io.SEEK_SET).
+
+        Returns
+        -------
+        int
+            The new position.
+
+        Raises
+        ------
+        ValueError
+            If the new position would be negative or whence is invalid.
+
+        """
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}.")
+        if position < 0:
+            raise ValueError("Negative seek position.")
+        self._position = position
+        return position
+
+    def readinto(self, buffer: Any) -> int:
+        """Read bytes into a pre-allocated buffer.
+
+        Unlike raw files this fills the whole buffer unless the end of the
+        object is reached, which parsers like pickle and np.load rely on.
+
+        Parameters
+        ----------
+        buffer : Any
+            A writable bytes-like object.
+
+        Returns
+        -------
+        int
+            The number of bytes read, 0 at the end of the object.
+
+        """
+        view = memoryview(buffer).cast("B")
+        end = min(self._position + len(view), self.size)
+        written = 0
+        while self._position < end:
+            block, offset = divmod(self._position, self.block_size)
+            data = self._get_block(block)
+            count = min(len(data) - offset, end - self._position)
+            view[written : written + count] = data[offset : offset + count]
+            written += count
+            self._position += count
+        return written
+
+    def readall(self) -> bytes:
+        """Read until the end of the object.
+
+        Returns
+        -------
+        bytes
+            The remaining bytes.
+
+        """
+        buffer = bytearray(max(self.size - self._position, 0))
+        return bytes(buffer[: self.readinto(buffer)])
+
+    def _get_block(self, block: int) -> bytes:
+        """Get a block from the cache or fetch it.
+
+        Parameters
+        ----------
+        block : int
+            Index of the block.
+
+        Returns
+        -------
+        bytes
+            The content of the block.
+
+        """
+        sequential = block == self._last_block + 1
+        self._last_block = block
+        if block in self._cache:
+            self._cache.move_to_end(block)
+            metrics.increment("cache_hits", operation="open_object")
+            return self._cache[block]
+
+        metrics.increment("cache_misses", operation="open_object")
+        last = block
+        if sequential:
+            n_blocks = math.ceil(self.size / self.block_size)
+            while (
+                last - block < self.readahead_blocks
+                and last + 1 < n_blocks
+                and last + 1 not in self._cache
+            ):
+                last += 1
+        data = self._fetch(
+            block * self.block_size,
+            min((last + 1) * self.block_size, self.size),
+        )
+        for index in range(block, last + 1):
+            start = (index - block) * self.block_size
+            self._cache[index] = data[start : start + self.block_size]
+        while len(self._cache) > self.cache_blocks:
+            self._cache.popitem(last=False)
+        return self._cache[block]
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        """Fetch a byte range of the object.
+
+        Parameters
+        ----------
+        start : int
+            First byte of the range.
+        end : int
+            End of the range, exclusive.
+
+        Returns
+        -------
+        bytes
+            The content of the range.
+
+        """
+        with tracing.span(
+            "read_range", bucket=self.bucket, key=self.key, bytes=end - start
+        ):
+            with metrics.timed("read_range"):
+                response = self._client.get_object(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    Range=f"bytes={start}-{end - 1}",
+                    IfMatch=self.etag,
+                )
+                data: bytes = response["Body"].read()
+        metrics.increment("bytes_in", len(data), operation="read_range")
+        return data
 
-    """
-    buffer = BytesIO()
-    joblib.dump(model, buffer)
-    buffer.seek(0)
-    _write_object(bucket=bucket, key=key, buffer=buffer)
+    def close(self) -> None:
+        """Close the reader and drop the cached blocks."""
+        self._cache.clear()
+        super().close()
 
 
-def read_json(bucket: str, key: str) -> Union[Any, Dict[str, Any]]:
-    """Read a json object from a given s3 bucket and key.
+def open_object(
+    bucket: str,
+    key: str,
+    block_size: int = READ_BLOCK_SIZE,
+    cache_blocks: int = READ_CACHE_BLOCKS,
+    readahead_blocks: int = READ_AHEAD_BLOCKS,
+) -> S3ObjectReader:
+    """Open an object as a seekable, read-only file object.
+
+    Unlike the read_* functions, which download the whole object, only the
+    parts of the object that are read are fetched, with range GETs. The
+    reader can be passed to anything that reads from a file object, e.g.
+    pd.read_parquet, pyarrow.parquet.ParquetFile, np.load or joblib.load::
+
+        with open_object(bucket, "results.parquet") as f:
+            scores = pd.read_parquet(f, columns=["score"])
 
     Parameters
     ----------
@@ -268,38 +2824,36 @@ def read_json(bucket: str, key: str) -> Union[Any, Dict[str, Any]]:
         The S3 bucket to load from.
     key : str
         The object key within the s3 bucket.
+    block_size : int
+        Size of the range GETs and cached blocks in bytes.
+        (Default value = READ_BLOCK_SIZE).
+    cache_blocks : int
+        Maximum number of cached blocks. (Default value = READ_CACHE_BLOCKS).
+    readahead_blocks : int
+        Number of blocks to fetch ahead of sequential reads.
+        (Default value = READ_AHEAD_BLOCKS).
 
     Returns
     -------
-    Dict
-        A Python Dict of the loaded json object.
-
-    """
-    file_content = _read_object(bucket=bucket, key=key)
-    return json.loads(file_content.read())
-
-
-def write_json(dict_obj: Dict[str, Any], bucket: str, key: str) -> None:
-    """Write a Dict to S3 as a json file.
-
-    Parameters
-    ----------
-    dict_obj : Dict[str, Any]
-        The Dict object to save as json.
-    bucket : str
-        The S3 bucket to write to.
-    key : str
-        The object key within the s3 bucket to write to.
+    S3ObjectReader
+        The file object.
 
     """
-    buffer = BytesIO()
-    buffer.write(json.dumps(dict_obj).encode("utf-8"))
-    buffer.seek(0)
-    _write_object(bucket=bucket, key=key, buffer=buffer)
+    return S3ObjectReader(
+        bucket=bucket,
+        key=key,
+        block_size=block_size,
+        cache_blocks=cache_blocks,
+        readahead_blocks=readahead_blocks,
+    )
 
 
 def file_keys_in_bucket(
-    bucket: str, key: str, file_type: Optional[str] = ""
+    bucket: str,
+    key: str,
+    file_type: Optional[str] = "",
+    index: Optional["ListingIndex"] = None,
+    index_max_age: Optional[float] = INDEX_MAX_AGE,
 ) -> List[Optional[str]]:
     """Get all the file keys in a given bucket, return empty list if none exist.
 
@@ -312,6 +2866,15 @@ def file_keys_in_bucket(
     file_type : str
         A specific file type we want
         to filter for. (Default value = "").
+    index : Optional[ListingIndex]
+        A local listing index to query instead of listing the whole prefix.
+        The index is refreshed incrementally, so it only lists keys after
+        the last key seen and still returns deleted keys until the prefix
+        is listed fully again. (Default value = None).
+    index_max_age : Optional[float]
+        List the whole prefix again, dropping deleted keys, if the index
+        didn't list it fully in the last index_max_age seconds. None only
+        lists it fully once. (Default value = INDEX_MAX_AGE).
 
     Returns
     -------
@@ -319,14 +2882,23 @@ def file_keys_in_bucket(
         A List of S3 file keys.
 
     """
-    s3_client = boto3.Session().client("s3")
+    if index is not None:
+        index.refresh(bucket, key, max_age=index_max_age)
+        return [
+            k
+            for k in index.keys(bucket, prefix=key, suffix=file_type)
+            if os.path.splitext(k)[1]
+        ]
+
+    s3_client = get_client("s3")
     keys_left = True
     keys = []
     while keys_left:
         start_tkn = keys[-1] if keys else ""
-        response = s3_client.list_objects_v2(
-            Bucket=bucket, Prefix=key, StartAfter=start_tkn
-        )
+        with metrics.timed("list_objects"):
+            response = s3_client.list_objects_v2(
+                Bucket=bucket, Prefix=key, StartAfter=start_tkn
+            )
         contents = response.get("Contents", [])
         keys_left = contents != []
         keys += [obj.get("Key") for obj in contents]
@@ -355,9 +2927,10 @@ def file_exists_in_bucket(bucket: str, key: str) -> bool:
         If boto3 fails to retrieve the file metadata.
 
     """
-    s3_client = boto3.Session().client("s3")
+    s3_client = get_client("s3")
     try:
-        _ = s3_client.head_object(Bucket=bucket, Key=key)
+        with metrics.timed("head_object"):
+            _ = s3_client.head_object(Bucket=bucket, Key=key)
         return True
     except ClientError as e:
         if e.response["Error"]["Code"] == "404":
@@ -391,9 +2964,12 @@ def file_size(bucket: str, key: str, raw_size: bool = False) -> Union[str, Any]:
         If file doesn't exist.
 
     """
-    s3_client = boto3.Session().client("s3")
+    from hurry.filesize import size
+
+    s3_client = get_client("s3")
     try:
-        file = s3_client.head_object(Bucket=bucket, Key=key)
+        with metrics.timed("head_object"):
+            file = s3_client.head_object(Bucket=bucket, Key=key)
         content_length = file["ContentLength"]
         if raw_size:
             return str(content_length)
@@ -404,3 +2980,489 @@ def file_size(bucket: str, key: str, raw_size: bool = False) -> Union[str, Any]:
             raise ValueError("File doesn't exist. Couldn't retrieve file size.")
         else:
             raise
+
+
+def _iter_objects(
+    bucket: str, prefix: str, start_after: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """Iterate over the objects under a prefix, one listing page at a time.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to list.
+    prefix : str
+        The key prefix to list.
+    start_after : Optional[str]
+        Only list keys after this key. (Default value = None).
+
+    Yields
+    ------
+    Dict[str, Any]
+        The listed objects with Key, Size, ETag and LastModified.
+
+    """
+    s3_client = get_client("s3")
+    kwargs = {"Bucket": bucket, "Prefix": prefix}
+    if start_after is not None:
+        kwargs["StartAfter"] = start_after
+    while True:
+        with metrics.timed("list_objects"):
+            response = s3_client.list_objects_v2(**kwargs)
+        yield from response.get("Contents", [])
+        if not response.get("IsTruncated"):
+            return
+        kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+
+def copy_object(
+    src_bucket: str,
+    src_key: str,
+    dst_bucket: str,
+    dst_key: str,
+    multipart_threshold: int = MULTIPART_COPY_THRESHOLD,
+    part_size: int = MULTIPART_COPY_PART_SIZE,
+    max_concurrency: int = 10,
+) -> None:
+    """Copy an object within S3 without downloading it.
+
+    Objects of at least multipart_threshold bytes are copied with parallel
+    UploadPartCopy requests, smaller ones with a single CopyObject.
+    Multipart copies get a new ETag, so the ETag of the source is stored
+    in their SOURCE_ETAG_METADATA metadata.
+
+    Parameters
+    ----------
+    src_bucket : str
+        The S3 bucket to copy from.
+    src_key : str
+        The object key to copy.
+    dst_bucket : str
+        The S3 bucket to copy to.
+    dst_key : str
+        The object key to copy to.
+    multipart_threshold : int
+        Size in bytes from which to use a multipart copy.
+        (Default value = MULTIPART_COPY_THRESHOLD).
+    part_size : int
+        Size in bytes of each part of a multipart copy.
+        (Default value = MULTIPART_COPY_PART_SIZE).
+    max_concurrency : int
+        Maximum number of parts copied in parallel. (Default value = 10).
+
+    Raises
+    ------
+    ValueError
+        If the source file doesn't exist.
+
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    s3_client = get_client("s3")
+    config = TransferConfig(
+        multipart_threshold=multipart_threshold,
+        multipart_chunksize=part_size,
+        max_concurrency=max_concurrency,
+    )
+    try:
+        with metrics.timed("head_object"):
+            head = s3_client.head_object(Bucket=src_bucket, Key=src_key)
+        extra_args: Dict[str, Any] = {}
+        # s3transfer switches to a multipart copy at the threshold itself.
+        if head["ContentLength"] >= multipart_threshold:
+            extra_args = {name: head[name] for name in _COPIED_HEADERS if name in head}
+            extra_args["Metadata"] = {
+                **head.get("Metadata", {}),
+                SOURCE_ETAG_METADATA: head["ETag"],
+            }
+            # Don't record the ETag if the source changes during the copy.
+            extra_args["CopySourceIfMatch"] = head["ETag"]
+        with tracing.span("copy_object", bucket=dst_bucket, key=dst_key):
+            with metrics.timed("copy_object"):
+                s3_client.copy(
+                    CopySource={"Bucket": src_bucket, "Key": src_key},
+                    Bucket=dst_bucket,
+                    Key=dst_key,
+                    ExtraArgs=extra_args,
+                    Config=config,
+                )
+        _invalidate_prefetched(dst_bucket, [dst_key])
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            raise ValueError("File doesn't exist.")
+        else:
+            raise
+
+
+def _check_disjoint(
+    src_bucket: str, src_prefix: str, dst_bucket: str, dst_prefix: str
+) -> None:
+    """Make sure that a copy doesn't write to the prefix it copies.
+
+    Parameters
+    ----------
+    src_bucket : str
+        The S3 bucket to copy from.
+    src_prefix : str
+        The key prefix to copy.
+    dst_bucket : str
+        The S3 bucket to copy to.
+    dst_prefix : str
+        The key prefix to copy to.
+
+    Raises
+    ------
+    ValueError
+        If one prefix contains the other in the same bucket.
+
+    """
+    if src_bucket == dst_bucket and (
+        src_prefix.startswith(dst_prefix) or dst_prefix.startswith(src_prefix)
+    ):
+        raise ValueError(
+            f"Source s3://{src_bucket}/{src_prefix} and destination "
+            f"s3://{dst_bucket}/{dst_prefix} overlap."
+        )
+
+
+def _is_copy(src_obj: Dict[str, Any], dst_bucket: str, dst_obj: Dict[str, Any]) -> bool:
+    """Check whether an object is a copy of another, see copy_object.
+
+    Parameters
+    ----------
+    src_obj : Dict[str, Any]
+        The listed source object.
+    dst_bucket : str
+        The S3 bucket of the destination object.
+    dst_obj : Dict[str, Any]
+        The listed destination object.
+
+    Returns
+    -------
+    bool
+        True if both have the same size and ETag, or the destination is a
+        multipart copy of the source with its ETag.
+
+    """
+    if src_obj["Size"] != dst_obj["Size"]:
+        return False
+    if src_obj["ETag"] == dst_obj["ETag"]:
+        return True
+    if "-" not in dst_obj["ETag"]:
+        return False
+    s3_client = get_client("s3")
+    with metrics.timed("head_object"):
+        head = s3_client.head_object(Bucket=dst_bucket, Key=dst_obj["Key"])
+    return bool(head.get("Metadata", {}).get(SOURCE_ETAG_METADATA) == src_obj["ETag"])
+
+
+def copy_prefix(
+    src_bucket: str,
+    src_prefix: str,
+    dst_bucket: str,
+    dst_prefix: str,
+    max_workers: int = 16,
+    skip_existing: bool = True,
+    progress: Optional[Callable[[int, int], None]] = None,
+    **kwargs: int,
+) -> List[str]:
+    """Copy all objects under a prefix within S3 without downloading them.
+
+    Objects are copied in parallel on a bounded thread pool. With
+    skip_existing, objects that already exist at the destination with the
+    same content are skipped, so an interrupted copy can be resumed by
+    simply calling copy_prefix again.
+
+    Parameters
+    ----------
+    src_bucket : str
+        The S3 bucket to copy from.
+    src_prefix : str
+        The key prefix to copy.
+    dst_bucket : str
+        The S3 bucket to copy to.
+    dst_prefix : str
+        The key prefix to copy to, replacing src_prefix in every key.
+    max_workers : int
+        Maximum number of objects copied in parallel. (Default value = 16).
+    skip_existing : bool
+        Skip objects that already exist at the destination with the same
+        content, see _is_copy. (Default value = True).
+    progress : Optional[Callable[[int, int], None]]
+        Called with the number of finished and total objects after
+        each object. (Default value = None).
+    kwargs : int
+        Additional keyword arguments passed to copy_object, e.g. part_size.
+
+    Returns
+    -------
+    List[str]
+        The source keys that are present at the destination, whether they
+        were copied now or skipped.
+
+    Raises
+    ------
+    ValueError
+        If the source and destination prefixes overlap.
+    RuntimeError
+        If any object couldn't be copied, after all others were copied.
+
+    """
+    _check_disjoint(src_bucket, src_prefix, dst_bucket, dst_prefix)
+    sources = list(_iter_objects(bucket=src_bucket, prefix=src_prefix))
+    existing = (
+        {obj["Key"]: obj for obj in _iter_objects(dst_bucket, dst_prefix)}
+        if skip_existing
+        else {}
+    )
+
+    def dst_key(src_key: str) -> str:
+        return dst_prefix + src_key[len(src_prefix) :]
+
+    done = []
+    to_copy = []
+    for obj in sources:
+        dst_obj = existing.get(dst_key(obj["Key"]))
+        if dst_obj is not None and _is_copy(obj, dst_bucket, dst_obj):
+            done.append(obj["Key"])
+        else:
+            to_copy.append(obj["Key"])
+    if progress is not None:
+        progress(len(done), len(sources))
+
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(
+                copy_object, src_bucket, key, dst_bucket, dst_key(key), **kwargs
+            ): key
+            for key in to_copy
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            if future.exception() is not None:
+                errors[key] = future.exception()
+            else:
+                done.append(key)
+            if progress is not None:
+                progress(len(done) + len(errors), len(sources))
+
+    if errors:
+        raise RuntimeError(
+            f"Failed to copy {len(errors)} of {len(sources)} objects, "
+            f"e.g. {next(iter(errors))}: {next(iter(errors.values()))!r}"
+        )
+    return done
+
+
+def move_prefix(
+    src_bucket: str,
+    src_prefix: str,
+    dst_bucket: str,
+    dst_prefix: str,
+    max_workers: int = 16,
+    progress: Optional[Callable[[int, int], None]] = None,
+    **kwargs: int,
+) -> List[str]:
+    """Move all objects under a prefix within S3 without downloading them.
+
+    The objects are copied with copy_prefix and the source objects are
+    only deleted once all of them are present at the destination with the
+    same content.
+
+    Parameters
+    ----------
+    src_bucket : str
+        The S3 bucket to move from.
+    src_prefix : str
+        The key prefix to move.
+    dst_bucket : str
+        The S3 bucket to move to.
+    dst_prefix : str
+        The key prefix to move to, replacing src_prefix in every key.
+    max_workers : int
+        Maximum number of objects copied in parallel. (Default value = 16).
+    progress : Optional[Callable[[int, int], None]]
+        Called with the number of copied and total objects after
+        each object. (Default value = None).
+    kwargs : int
+        Additional keyword arguments passed to copy_object, e.g. part_size.
+
+    Returns
+    -------
+    List[str]
+        The moved source keys.
+
+    Raises
+    ------
+    ValueError
+        If the source and destination prefixes overlap.
+    RuntimeError
+        If any source object couldn't be deleted.
+
+    """
+    keys = copy_prefix(
+        src_bucket=src_bucket,
+        src_prefix=src_prefix,
+        dst_bucket=dst_bucket,
+        dst_prefix=dst_prefix,
+        max_workers=max_workers,
+        skip_existing=True,
+        progress=progress,
+        **kwargs,
+    )
+    result = delete_keys(bucket=src_bucket, keys=keys, max_workers=max_workers)
+    if result.errors:
+        raise RuntimeError(
+            f"Copied all objects but failed to delete {len(result.errors)} sources, "
+            f"e.g. {next(iter(result.errors.items()))}"
+        )
+    return keys
+
+
+class DeleteResult(NamedTuple):
+    """The outcome of a bulk deletion."""
+
+    deleted: List[str]
+    errors: Dict[str, str]
+
+
+def _delete_batch(bucket: str, keys: List[str]) -> DeleteResult:
+    """Delete up to DELETE_BATCH_SIZE keys with a single DeleteObjects request.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to delete from.
+    keys : List[str]
+        The object keys to delete.
+
+    Returns
+    -------
+    DeleteResult
+        The deleted keys and the error of every key that wasn't deleted.
+
+    """
+    s3_client = get_client("s3")
+    try:
+        with metrics.timed("delete_objects"):
+            response = s3_client.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            )
+    except ClientError as e:
+        error = f"{e.response['Error']['Code']}: {e.response['Error']['Message']}"
+        return DeleteResult(deleted=[], errors={key: error for key in keys})
+    except BotoCoreError as e:
+        # Connection errors and read timeouts left after botocore's retries.
+        # The request may still have deleted some of the keys.
+        _invalidate_prefetched(bucket, keys)
+        error = f"{type(e).__name__}: {e}"
+        return DeleteResult(deleted=[], errors={key: error for key in keys})
+
+    _invalidate_prefetched(bucket, keys)
+    # In quiet mode only the keys that couldn't be deleted are returned.
+    errors = {
+        error["Key"]: f"{error.get('Code')}: {error.get('Message')}"
+        for error in response.get("Errors", [])
+    }
+    return DeleteResult(
+        deleted=[key for key in keys if key not in errors], errors=errors
+    )
+
+
+def delete_keys(
+    bucket: str, keys: Iterable[str], max_workers: int = 8, dry_run: bool = False
+) -> DeleteResult:
+    """Delete objects in batches of DELETE_BATCH_SIZE keys.
+
+    Keys are consumed lazily and batches are deleted concurrently, so the
+    keys can be streamed from a listing. Deletion doesn't stop at failed
+    keys, they are reported in the result instead.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to delete from.
+    keys : Iterable[str]
+        The object keys to delete.
+    max_workers : int
+        Maximum number of concurrent DeleteObjects requests.
+        (Default value = 8).
+    dry_run : bool
+        If True, nothing is deleted and all keys are reported as deleted.
+        (Default value = False).
+
+    Returns
+    -------
+    DeleteResult
+        The deleted keys and the error of every key that wasn't deleted.
+
+    """
+    result = DeleteResult(deleted=[], errors={})
+
+    def collect(futures: Iterable["Future[DeleteResult]"]) -> None:
+        for future in futures:
+            batch_result = future.result()
+            result.deleted.extend(batch_result.deleted)
+            result.errors.update(batch_result.errors)
+
+    keys = iter(keys)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        in_flight: Set["Future[DeleteResult]"] = set()
+        while True:
+            batch = list(itertools.islice(keys, DELETE_BATCH_SIZE))
+            if not batch:
+                break
+            if dry_run:
+                result.deleted.extend(batch)
+                continue
+            # Bound the number of pending batches, so keys are only pulled
+            # from the listing as fast as they can be deleted.
+            if len(in_flight) >= max_workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            in_flight.add(pool.submit(_delete_batch, bucket, batch))
+        collect(wait(in_flight).done)
+    return result
+
+
+def delete_prefix(
+    bucket: str, prefix: str, max_workers: int = 8, dry_run: bool = False
+) -> DeleteResult:
+    """Delete all objects under a prefix.
+
+    Keys are streamed from the listing into concurrent DeleteObjects
+    batches, see delete_keys.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to delete from.
+    prefix : str
+        The key prefix to delete.
+    max_workers : int
+        Maximum number of concurrent DeleteObjects requests.
+        (Default value = 8).
+    dry_run : bool
+        If True, nothing is deleted and all keys under the prefix are
+        reported as deleted. (Default value = False).
+
+    Returns
+    -------
+    DeleteResult
+        The deleted keys and the error of every key that wasn't deleted.
+
+    Raises
+    ------
+    ValueError
+        If the prefix is empty, to avoid accidentally emptying the bucket.
+
+    """
+    if not prefix:
+        raise ValueError("Prefix must not be empty.")
+
+    keys = (obj["Key"] for obj in _iter_objects(bucket=bucket, prefix=prefix))
+    return delete_keys(
+        bucket=bucket, keys=keys, max_workers=max_workers, dry_run=dry_run
+    )
@@ -1,15 +1,93 @@
 """src/talus_aws_utils/secrets.py module."""
 import base64
+import copy
 import json
 
-from typing import Dict
-
-import boto3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 from botocore.exceptions import ClientError
 
+from talus_aws_utils import metrics
+from talus_aws_utils.clients import get_client
+
+
+# BatchGetSecretValue accepts at most 20 secret ids per request.
+BATCH_SIZE = 20
+# Error codes that mean the batch API can't be used with the current
+# botocore version, endpoint or IAM policy, so we fall back to single calls.
+_BATCH_UNSUPPORTED_CODES = {
+    "AccessDeniedException",
+    "InvalidAction",
+    "UnknownOperationException",
+    "UnrecognizedClientException",
+}
+
+_SECRET_CACHE: Dict[Tuple[str, str], Dict[str, str]] = {}
+
+
+def _decode_secret(secret_value: Dict[str, Any]) -> Dict[str, str]:
+    """Decode a secret value returned by the Secrets Manager API.
+
+    Parameters
+    ----------
+    secret_value : Dict[str, Any]
+        A GetSecretValue response or a BatchGetSecretValue SecretValues entry.
+
+    Returns
+    -------
+    Dict[str, str]
+        The secret value
+    """
+    # Decrypts secret using the associated KMS CMK.
+    # Depending on whether the secret is a string or binary, one of these fields will be populated.
+    if "SecretString" in secret_value:
+        secret = secret_value["SecretString"]
+    else:
+        secret = base64.b64decode(secret_value["SecretBinary"])
+
+    return json.loads(secret)  # type: ignore
 
-def get_secret(secret_name: str, region_name: str) -> Dict[str, str]:
+
+def _requested_ids(secret_value: Dict[str, Any], batch: List[str]) -> List[str]:
+    """Find the requested secret ids that a BatchGetSecretValue entry answers.
+
+    Parameters
+    ----------
+    secret_value : Dict[str, Any]
+        A BatchGetSecretValue SecretValues entry.
+    batch : List[str]
+        Names, ARNs or partial ARNs that were requested.
+
+    Returns
+    -------
+    List[str]
+        The requested ids matching the entry's name or ARN.
+    """
+    name: Optional[str] = secret_value.get("Name")
+    arn: Optional[str] = secret_value.get("ARN")
+    return [
+        secret_id
+        for secret_id in batch
+        if secret_id in (name, arn)
+        # A partial ARN is the full ARN without its "-" and random 6 character
+        # suffix, so secrets whose names extend the requested one don't match.
+        or (
+            arn is not None
+            and len(arn) == len(secret_id) + 7
+            and arn.startswith(secret_id + "-")
+        )
+    ]
+
+
+def clear_cache() -> None:
+    """Clear all secrets cached by get_secret and get_secrets."""
+    _SECRET_CACHE.clear()
+
+
+def get_secret(
+    secret_name: str, region_name: str, use_cache: bool = False
+) -> Dict[str, str]:
     """Get a secret value from AWS Secret Manager.
 
     Parameters
@@ -18,6 +96,11 @@ def get_secret(secret_name: str, region_name: str) -> Dict[str, str]:
         Name of the secret to get
     region_name : str
         Name of the region to get the secret from
+    use_cache : bool
+        If True, return a previously fetched value for the same secret
+        and region instead of calling the API again. Cached values are
+        never refreshed, so a rotated secret is only picked up after
+        clear_cache(). (Default value = False).
 
     Returns
     -------
@@ -30,20 +113,159 @@ def get_secret(secret_name: str, region_name: str) -> Dict[str, str]:
     ClientError
         If the secret is not found
     """
-    # Create a Secrets Manager client
-    session = boto3.session.Session()
-    client = session.client(service_name="secretsmanager", region_name=region_name)
+    cache_key = (region_name, secret_name)
+    if use_cache and cache_key in _SECRET_CACHE:
+        metrics.increment("cache_hits", operation="get_secret")
+        return copy.deepcopy(_SECRET_CACHE[cache_key])
+    metrics.increment("cache_misses", operation="get_secret")
+
+    client = get_client(service_name="secretsmanager", region_name=region_name)
 
     try:
-        get_secret_value_response = client.get_secret_value(SecretId=secret_name)
+        with metrics.timed("get_secret"):
+            get_secret_value_response = client.get_secret_value(SecretId=secret_name)
     except ClientError as e:
         raise e
     else:
-        # Decrypts secret using the associated KMS CMK.
-        # Depending on whether the secret is a string or binary, one of these fields will be populated.
-        if "SecretString" in get_secret_value_response:
-            secret = get_secret_value_response["SecretString"]
+        secret = _decode_secret(get_secret_value_response)
+
+    _SECRET_CACHE[cache_key] = copy.deepcopy(secret)
+    return secret
+
+
+def _batch_get_secret_values(
+    client: Any, secret_names: List[str]
+) -> Dict[str, Dict[str, str]]:
+    """Get secret values in batches of BATCH_SIZE using BatchGetSecretValue.
+
+    Parameters
+    ----------
+    client : Any
+        A Secrets Manager client.
+    secret_names : List[str]
+        Names, ARNs or partial ARNs of the secrets to get.
+
+    Returns
+    -------
+    Dict[str, Dict[str, str]]
+        The secret values keyed by the requested secret name.
+
+    Raises
+    ------
+    ClientError
+        If any of the secrets couldn't be retrieved or a requested secret
+        is missing from the response.
+    """
+    secrets: Dict[str, Dict[str, str]] = {}
+    for i in range(0, len(secret_names), BATCH_SIZE):
+        batch = secret_names[i : i + BATCH_SIZE]
+        with metrics.timed("batch_get_secret_value"):
+            response = client.batch_get_secret_value(SecretIdList=batch)
+        if response.get("Errors"):
+            error = response["Errors"][0]
+            raise ClientError(
+                {
+                    "Error": {
+                        "Code": error.get("ErrorCode", ""),
+                        "Message": f"{error.get('SecretId')}: {error.get('Message')}",
+                    }
+                },
+                "BatchGetSecretValue",
+            )
+        for secret_value in response.get("SecretValues", []):
+            # The API returns both name and ARN, match whichever was requested.
+            for secret_id in _requested_ids(secret_value, batch):
+                secrets[secret_id] = _decode_secret(secret_value)
+        unmatched = [secret_id for secret_id in batch if secret_id not in secrets]
+        if unmatched:
+            raise ClientError(
+                {
+                    "Error": {
+                        "Code": "ResourceNotFoundException",
+                        "Message": f"{unmatched[0]}: not in the response.",
+                    }
+                },
+                "BatchGetSecretValue",
+            )
+    return secrets
+
+
+def get_secrets(
+    secret_names: List[str],
+    region_name: str,
+    use_cache: bool = False,
+    max_workers: int = 10,
+) -> Dict[str, Dict[str, str]]:
+    """Get multiple secret values from AWS Secret Manager.
+
+    Uses BatchGetSecretValue where available and otherwise falls back to
+    concurrent GetSecretValue calls.
+
+    Parameters
+    ----------
+    secret_names : List[str]
+        Names of the secrets to get
+    region_name : str
+        Name of the region to get the secrets from
+    use_cache : bool
+        If True, secrets already fetched by get_secret or get_secrets
+        aren't requested again. Cached values are never refreshed, so a
+        rotated secret is only picked up after clear_cache().
+        (Default value = False).
+    max_workers : int
+        Maximum number of concurrent requests when falling back to
+        single secret calls. (Default value = 10).
+
+    Returns
+    -------
+    Dict[str, Dict[str, str]]
+        The secret values keyed by secret name.
+
+    Raises
+    ------
+    ClientError
+        If any of the secrets is not found
+    """
+    secrets = {}
+    missing = []
+    for secret_name in dict.fromkeys(secret_names):
+        cache_key = (region_name, secret_name)
+        if use_cache and cache_key in _SECRET_CACHE:
+            secrets[secret_name] = copy.deepcopy(_SECRET_CACHE[cache_key])
         else:
-            secret = base64.b64decode(get_secret_value_response["SecretBinary"])
+            missing.append(secret_name)
+    metrics.increment("cache_hits", len(secrets), operation="get_secrets")
+    metrics.increment("cache_misses", len(missing), operation="get_secrets")
+
+    if not missing:
+        return secrets
+
+    client = get_client(service_name="secretsmanager", region_name=region_name)
+
+    try:
+        fetched = _batch_get_secret_values(client=client, secret_names=missing)
+    except AttributeError:
+        # botocore versions older than 1.32 don't know about the batch API.
+        fetched = None
+    except ClientError as e:
+        if e.response["Error"]["Code"] not in _BATCH_UNSUPPORTED_CODES:
+            raise
+        fetched = None
+
+    if fetched is None:
+
+        def get_secret_value(secret_name: str) -> Dict[str, Any]:
+            with metrics.timed("get_secret"):
+                return client.get_secret_value(SecretId=secret_name)  # type: ignore
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+            responses = pool.map(get_secret_value, missing)
+            fetched = {
+                name: _decode_secret(response)
+                for name, response in zip(missing, responses)
+            }
 
-    return json.loads(secret)
+    for secret_name, secret in fetched.items():
+        _SECRET_CACHE[(region_name, secret_name)] = copy.deepcopy(secret)
+    secrets.update(fetched)
+    return secrets
@@ -0,0 +1,487 @@
+"""src/talus_aws_utils/sync.py module."""
+import hashlib
+import math
+import os
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from boto3.s3.transfer import TransferConfig
+
+from talus_aws_utils import metrics, tracing
+from talus_aws_utils.clients import get_client
+from talus_aws_utils.s3 import _invalidate_prefetched, _iter_objects
+
+
+COMPARE_MODES = ("size", "mtime", "etag")
+# Multipart threshold and part size of boto3's managed transfers, which
+# determine the ETags of the objects we upload.
+MULTIPART_THRESHOLD = 8 * 1024**2
+MULTIPART_CHUNKSIZE = 8 * 1024**2
+# Size of the reads when computing the md5 of a file.
+HASH_CHUNK_SIZE = 1024**2
+
+
+class SyncResult(NamedTuple):
+    """The outcome of a directory transfer."""
+
+    transferred: List[str]
+    skipped: List[str]
+
+
+def _parse_s3_url(url: str) -> Tuple[str, str]:
+    """Split an s3://bucket/prefix url into bucket and prefix.
+
+    Parameters
+    ----------
+    url : str
+        The s3 url.
+
+    Returns
+    -------
+    Tuple[str, str]
+        The bucket and prefix.
+
+    """
+    bucket, _, prefix = url[len("s3://") :].partition("/")
+    return bucket, prefix
+
+
+def _normalize_prefix(prefix: str) -> str:
+    """Make sure a non-empty prefix ends with a slash.
+
+    Parameters
+    ----------
+    prefix : str
+        The key prefix.
+
+    Returns
+    -------
+    str
+        The normalized prefix.
+
+    """
+    return prefix if not prefix or prefix.endswith("/") else prefix + "/"
+
+
+def _iter_local_files(directory: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """Iterate over all files below a directory.
+
+    Parameters
+    ----------
+    directory : str
+        The local directory.
+
+    Yields
+    ------
+    Tuple[str, os.stat_result]
+        The path relative to directory, with / as separator, and its stat.
+
+    """
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, directory).replace(os.sep, "/")
+            yield relative, os.stat(path)
+
+
+def _md5_parts(path: str, part_size: int) -> List[bytes]:
+    """Compute the md5 digest of every part of a file.
+
+    Parameters
+    ----------
+    path : str
+        The local file.
+    part_size : int
+        The part size in bytes.
+
+    Returns
+    -------
+    List[bytes]
+        The md5 digest of every part.
+
+    """
+    digests: List[bytes] = []
+    with open(path, "rb") as f:
+        while True:
+            md5 = hashlib.md5()  # noqa: S303
+            remaining = part_size
+            # Hash in chunks, parts can be up to 5 GiB.
+            while remaining:
+                chunk = f.read(min(remaining, HASH_CHUNK_SIZE))
+                if not chunk:
+                    break
+                md5.update(chunk)
+                remaining -= len(chunk)
+            if remaining == part_size:
+                return digests
+            digests.append(md5.digest())
+
+
+def _etag_matches(path: str, size: int, etag: str) -> bool:
+    """Check whether a local file has the content of an object with an ETag.
+
+    Single part ETags are the md5 of the content. Multipart ETags are the
+    md5 of the part md5s followed by the number of parts, so the part size
+    of the upload has to be guessed: boto3's default part size and the
+    part size implied by the number of parts, rounded up to whole MiB, are
+    tried.
+
+    Parameters
+    ----------
+    path : str
+        The local file.
+    size : int
+        The size of the local file.
+    etag : str
+        The ETag of the object.
+
+    Returns
+    -------
+    bool
+        True if the file has the same ETag.
+
+    """
+    etag = etag.strip('"')
+    if "-" not in etag:
+        digests = _md5_parts(path, part_size=max(size, 1))
+        return (digests[0] if digests else hashlib.md5(b"").digest()).hex() == etag
+
+    digest, _, n_parts = etag.partition("-")
+    parts = int(n_parts)
+    implied = math.ceil(size / parts)
+    candidates = [
+        MULTIPART_CHUNKSIZE,
+        math.ceil(implied / 1024**2) * 1024**2,
+        implied,
+    ]
+    for part_size in dict.fromkeys(candidates):
+        if part_size > 0 and math.ceil(size / part_size) == parts:
+            digests = _md5_parts(path, part_size=part_size)
+            if hashlib.md5(b"".join(digests)).hexdigest() == digest:  # noqa: S303
+                return True
+    return False
+
+
+def _is_unchanged(
+    compare: str,
+    path: str,
+    local: os.stat_result,
+    remote: Dict[str, Any],
+    upload: bool,
+) -> bool:
+    """Check whether a file doesn't need to be transferred.
+
+    Parameters
+    ----------
+    compare : str
+        One of size, mtime or etag.
+    path : str
+        The local file.
+    local : os.stat_result
+        The stat of the local file.
+    remote : Dict[str, Any]
+        The listed object.
+    upload : bool
+        True if the file is uploaded, False if it is downloaded.
+
+    Returns
+    -------
+    bool
+        True if the file can be skipped.
+
+    """
+    if local.st_size != remote["Size"]:
+        return False
+    if compare == "size":
+        return True
+    if compare == "mtime":
+        remote_mtime: float = remote["LastModified"].timestamp()
+        if upload:
+            return local.st_mtime <= remote_mtime
+        # Downloaded files get the modification time of their object.
+        return abs(local.st_mtime - remote_mtime) < 1e-3
+    return _etag_matches(path, local.st_size, remote["ETag"])
+
+
+def _transfer(
+    tasks: List[Tuple[str, Callable[[], bool]]],
+    max_workers: int,
+    progress: Optional[Callable[[int, int], None]],
+) -> SyncResult:
+    """Run file comparisons and transfers on a thread pool.
+
+    Comparing files can mean hashing them, so it runs on the pool too.
+
+    Parameters
+    ----------
+    tasks : List[Tuple[str, Callable[[], bool]]]
+        The name of every file and a function that transfers it unless it
+        is unchanged, returning whether it was transferred.
+    max_workers : int
+        Maximum number of concurrent transfers.
+    progress : Optional[Callable[[int, int], None]]
+        Called with the number of finished and total files.
+
+    Returns
+    -------
+    SyncResult
+        The transferred and skipped files.
+
+    Raises
+    ------
+    RuntimeError
+        If any file couldn't be transferred, after all others were.
+
+    """
+    total = len(tasks)
+    transferred: List[str] = []
+    skipped: List[str] = []
+    errors = {}
+    if progress is not None:
+        progress(0, total)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(func): name for name, func in tasks}
+        for future in as_completed(futures):
+            if future.exception() is not None:
+                errors[futures[future]] = future.exception()
+            elif future.result():
+                transferred.append(futures[future])
+            else:
+                skipped.append(futures[future])
+            if progress is not None:
+                progress(len(skipped) + len(transferred) + len(errors), total)
+
+    if errors:
+        raise RuntimeError(
+            f"Failed to transfer {len(errors)} of {total} files, "
+            f"e.g. {next(iter(errors))}: {next(iter(errors.values()))!r}"
+        )
+    return SyncResult(transferred=transferred, skipped=skipped)
+
+
+def upload_directory(
+    directory: str,
+    bucket: str,
+    prefix: str,
+    compare: str = "etag",
+    max_workers: int = 16,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> SyncResult:
+    """Upload all files below a local directory to an S3 prefix.
+
+    Files are compared and uploaded concurrently. Files whose object
+    already exists and is unchanged according to compare are skipped:
+
+    * size: the object has the same size. Misses edits that keep the size.
+    * mtime: the object has the same size and isn't older than the file.
+      When downloading, the file has the same size and the modification
+      time of the object, which it got when it was downloaded.
+    * etag: the object has the same size and ETag, including multipart
+      ETags. Reads every file with a matching size to compute its md5.
+
+    Parameters
+    ----------
+    directory : str
+        The local directory.
+    bucket : str
+        The S3 bucket to upload to.
+    prefix : str
+        The key prefix to upload to.
+    compare : str
+        How to detect unchanged files, one of size, mtime or etag.
+        (Default value = "etag").
+    max_workers : int
+        Maximum number of concurrent uploads. (Default value = 16).
+    progress : Optional[Callable[[int, int], None]]
+        Called with the number of finished and total files after
+        each file. (Default value = None).
+
+    Returns
+    -------
+    SyncResult
+        The uploaded and skipped files, relative to directory.
+
+    Raises
+    ------
+    ValueError
+        If an invalid compare mode is given.
+
+    """
+    if compare not in COMPARE_MODES:
+        raise ValueError(
+            f"Invalid compare mode. Use one of: {', '.join(COMPARE_MODES)}."
+        )
+
+    prefix = _normalize_prefix(prefix)
+    remote = {obj["Key"]: obj for obj in _iter_objects(bucket=bucket, prefix=prefix)}
+    s3_client = get_client("s3")
+    transfer_config = TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD, multipart_chunksize=MULTIPART_CHUNKSIZE
+    )
+
+    def upload(path: str, key: str, stat: os.stat_result) -> bool:
+        if key in remote and _is_unchanged(compare, path, stat, remote[key], True):
+            return False
+        size = stat.st_size
+        with tracing.span("upload_file", bucket=bucket, key=key, bytes=size):
+            with metrics.timed("upload_file"):
+                s3_client.upload_file(
+                    Filename=path, Bucket=bucket, Key=key, Config=transfer_config
+                )
+        _invalidate_prefetched(bucket, [key])
+        metrics.increment("bytes_out", size, operation="upload_file")
+        return True
+
+    tasks: List[Tuple[str, Callable[[], bool]]] = []
+    for relative, stat in _iter_local_files(directory):
+        path = os.path.join(directory, *relative.split("/"))
+        tasks.append((relative, partial(upload, path, prefix + relative, stat)))
+    return _transfer(tasks, max_workers, progress)
+
+
+def download_directory(
+    bucket: str,
+    prefix: str,
+    directory: str,
+    compare: str = "etag",
+    max_workers: int = 16,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> SyncResult:
+    """Download all objects under an S3 prefix to a local directory.
+
+    Objects are compared and downloaded concurrently and each file gets
+    the modification time of its object. Objects whose file already exists
+    and is unchanged according to compare are skipped, see upload_directory.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket to download from.
+    prefix : str
+        The key prefix to download.
+    directory : str
+        The local directory.
+    compare : str
+        How to detect unchanged files, one of size, mtime or etag.
+        (Default value = "etag").
+    max_workers : int
+        Maximum number of concurrent downloads. (Default value = 16).
+    progress : Optional[Callable[[int, int], None]]
+        Called with the number of finished and total files after
+        each file. (Default value = None).
+
+    Returns
+    -------
+    SyncResult
+        The downloaded and skipped files, relative to directory.
+
+    Raises
+    ------
+    ValueError
+        If an invalid compare mode is given or a key would be downloaded
+        outside of directory, e.g. because it contains "..".
+
+    """
+    if compare not in COMPARE_MODES:
+        raise ValueError(
+            f"Invalid compare mode. Use one of: {', '.join(COMPARE_MODES)}."
+        )
+
+    prefix = _normalize_prefix(prefix)
+    root = os.path.realpath(directory)
+    local = dict(_iter_local_files(directory)) if os.path.isdir(directory) else {}
+    s3_client = get_client("s3")
+
+    def download(
+        obj: Dict[str, Any], path: str, stat: Optional[os.stat_result]
+    ) -> bool:
+        if stat is not None and _is_unchanged(compare, path, stat, obj, False):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tracing.span("download_file", bucket=bucket, key=obj["Key"]) as span:
+            with metrics.timed("download_file"):
+                s3_client.download_file(Bucket=bucket, Key=obj["Key"], Filename=path)
+            span["bytes"] = obj["Size"]
+        metrics.increment("bytes_in", obj["Size"], operation="download_file")
+        mtime = obj["LastModified"].timestamp()
+        os.utime(path, (mtime, mtime))
+        return True
+
+    tasks: List[Tuple[str, Callable[[], bool]]] = []
+    for obj in _iter_objects(bucket=bucket, prefix=prefix):
+        relative = obj["Key"][len(prefix) :]
+        if not relative or relative.endswith("/"):
+            # Skip "directory" placeholder objects.
+            continue
+        path = os.path.realpath(os.path.join(root, *relative.split("/")))
+        if os.path.commonpath([root, path]) != root or path == root:
+            raise ValueError(f"Key {obj['Key']} would be downloaded outside {root}.")
+        tasks.append((relative, partial(download, obj, path, local.get(relative))))
+    return _transfer(tasks, max_workers, progress)
+
+
+def sync(
+    source: str,
+    destination: str,
+    compare: str = "etag",
+    max_workers: int = 16,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> SyncResult:
+    """Sync a local directory to an S3 prefix or an S3 prefix to a local directory.
+
+    Example::
+
+        sync("/scratch/raw", "s3://talus-raw/instrument-1/")
+        sync("s3://talus-results/run-1/", "/scratch/results")
+
+    Parameters
+    ----------
+    source : str
+        A local directory or an s3://bucket/prefix url.
+    destination : str
+        A local directory or an s3://bucket/prefix url.
+    compare : str
+        How to detect unchanged files, one of size, mtime or etag.
+        (Default value = "etag").
+    max_workers : int
+        Maximum number of concurrent transfers. (Default value = 16).
+    progress : Optional[Callable[[int, int], None]]
+        Called with the number of finished and total files after
+        each file. (Default value = None).
+
+    Returns
+    -------
+    SyncResult
+        The transferred and skipped files.
+
+    Raises
+    ------
+    ValueError
+        If not exactly one of source and destination is an s3 url.
+
+    """
+    source_is_s3 = source.startswith("s3://")
+    if source_is_s3 == destination.startswith("s3://"):
+        raise ValueError("Exactly one of source and destination must be an s3:// url.")
+
+    if source_is_s3:
+        bucket, prefix = _parse_s3_url(source)
+        return download_directory(
+            bucket=bucket,
+            prefix=prefix,
+            directory=destination,
+            compare=compare,
+            max_workers=max_workers,
+            progress=progress,
+        )
+    bucket, prefix = _parse_s3_url(destination)
+    return upload_directory(
+        directory=source,
+        bucket=bucket,
+        prefix=prefix,
+        compare=compare,
+        max_workers=max_workers,
+        progress=progress,
+    )
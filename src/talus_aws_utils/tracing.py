@@ -0,0 +1,283 @@
+"""src/talus_aws_utils/tracing.py module.
+
+Opt-in per-phase profiling spans for the s3 module.
+
+Within a trace block, every S3 API call (HeadObject, GetObject, PutObject,
+CreateMultipartUpload, UploadPart, CompleteMultipartUpload, ...) and every
+transfer, decode and encode step of the read_* and write_* functions is
+recorded as a span with its byte and row counts::
+
+    with tracing.trace() as t:
+        df = s3.read_dataframe(bucket, "results.parquet")
+    print(t.format_summary())
+    t.save_chrome_trace("read.json")  # open in chrome://tracing or Perfetto
+
+Spans are recorded from all threads, including the s3transfer worker threads.
+Outside of a trace block recording a span is a single list check.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+from typing import Any, Dict, Iterator, List, NamedTuple
+
+
+class Span(NamedTuple):
+    """A timed phase of an operation."""
+
+    name: str
+    category: str
+    start: float
+    duration: float
+    thread_id: int
+    attrs: Dict[str, Any]
+
+
+class Trace:
+    """A collection of spans recorded within a trace block."""
+
+    def __init__(self) -> None:
+        """Create an empty trace."""
+        self._lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+
+    def add(self, span: Span) -> None:
+        """Add a finished span.
+
+        Parameters
+        ----------
+        span : Span
+            The span to add.
+
+        """
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Aggregate the spans by name.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            One row per span name with count, total and mean seconds and,
+            where recorded, the total bytes and rows.
+
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            row = rows.setdefault(
+                span.name,
+                {"name": span.name, "category": span.category, "count": 0},
+            )
+            row["count"] += 1
+            row["total_s"] = row.get("total_s", 0.0) + span.duration
+            for attr in ("bytes", "rows"):
+                if attr in span.attrs:
+                    row[attr] = row.get(attr, 0) + span.attrs[attr]
+        for row in rows.values():
+            row["mean_s"] = row["total_s"] / row["count"]
+        return sorted(rows.values(), key=lambda row: -row["total_s"])
+
+    def format_summary(self) -> str:
+        """Format the summary as a plain text table.
+
+        Returns
+        -------
+        str
+            The summary table.
+
+        """
+        lines = [
+            f"{'name':<28}{'category':<10}{'count':>7}{'total_s':>11}"
+            f"{'mean_s':>11}{'bytes':>14}{'rows':>11}"
+        ]
+        for row in self.summary():
+            lines.append(
+                f"{row['name']:<28}{row['category']:<10}{row['count']:>7}"
+                f"{row['total_s']:>11.4f}{row['mean_s']:>11.4f}"
+                f"{row.get('bytes', ''):>14}{row.get('rows', ''):>11}"
+            )
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Convert the spans to the Chrome trace event format.
+
+        Returns
+        -------
+        Dict[str, Any]
+            A json serializable trace with one complete event per span.
+
+        """
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": (span.start - self.start) * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": os.getpid(),
+                    "tid": span.thread_id,
+                    "args": {k: str(v) for k, v in span.attrs.items()},
+                }
+                for span in spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def save_chrome_trace(self, path: str) -> None:
+        """Write the spans to a Chrome trace json file.
+
+        Parameters
+        ----------
+        path : str
+            The file to write to.
+
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+_TRACES: List[Trace] = []
+
+
+@contextlib.contextmanager
+def trace() -> Iterator[Trace]:
+    """Record spans of all s3 operations within the block.
+
+    Yields
+    ------
+    Trace
+        The trace the spans are recorded in.
+
+    """
+    t = Trace()
+    _TRACES.append(t)
+    try:
+        yield t
+    finally:
+        _TRACES.remove(t)
+
+
+def _add(span: Span) -> None:
+    """Add a span to all active traces.
+
+    Parameters
+    ----------
+    span : Span
+        The span to add.
+
+    """
+    for t in list(_TRACES):
+        t.add(span)
+
+
+@contextlib.contextmanager
+def span(name: str, category: str = "io", **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """Record the wrapped block as a span if a trace is active.
+
+    Parameters
+    ----------
+    name : str
+        Name of the span, e.g. decode.
+    category : str
+        Category of the span. (Default value = "io").
+    attrs : Any
+        Attributes of the span, e.g. bucket and key.
+
+    Yields
+    ------
+    Dict[str, Any]
+        The span attributes, to add e.g. bytes or rows within the block.
+
+    """
+    if not _TRACES:
+        yield attrs
+        return
+
+    start = time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        _add(
+            Span(
+                name=name,
+                category=category,
+                start=start,
+                duration=time.perf_counter() - start,
+                thread_id=threading.get_ident(),
+                attrs=attrs,
+            )
+        )
+
+
+def before_call(
+    model: Any, params: Dict[str, Any], context: Dict[str, Any], **kwargs: Any
+) -> None:
+    """Start an API call span, registered on the before-call client event.
+
+    Parameters
+    ----------
+    model : Any
+        The botocore operation model.
+    params : Dict[str, Any]
+        The serialized request.
+    context : Dict[str, Any]
+        The request context shared with the after-call events.
+    kwargs : Any
+        Other event arguments.
+
+    """
+    if _TRACES:
+        attrs: Dict[str, Any] = {}
+        body: Any = params.get("body")
+        if isinstance(body, (bytes, bytearray)):
+            attrs["bytes"] = len(body)
+        elif hasattr(body, "seekable") and body.seekable():
+            # Uploads are wrapped in file objects; measure without consuming.
+            position = body.tell()
+            attrs["bytes"] = body.seek(0, os.SEEK_END) - position
+            body.seek(position)
+        context["talus_span"] = (model.name, time.perf_counter(), attrs)
+
+
+def after_call(context: Dict[str, Any], **kwargs: Any) -> None:
+    """Finish an API call span, registered on the after-call(-error) client events.
+
+    Parameters
+    ----------
+    context : Dict[str, Any]
+        The request context shared with the before-call event.
+    kwargs : Any
+        Other event arguments, parsed for finished calls and
+        exception for calls that raised.
+
+    """
+    if "talus_span" not in context:
+        return
+
+    name, start, attrs = context.pop("talus_span")
+    parsed = kwargs.get("parsed") or {}
+    if name == "GetObject" and "ContentLength" in parsed:
+        attrs["bytes"] = parsed["ContentLength"]
+    if "Error" in parsed:
+        attrs["error"] = parsed["Error"].get("Code")
+    if "exception" in kwargs:
+        attrs["error"] = repr(kwargs["exception"])
+    _add(
+        Span(
+            name=name,
+            category="s3 api",
+            start=start,
+            duration=time.perf_counter() - start,
+            thread_id=threading.get_ident(),
+            attrs=attrs,
+        )
+    )
@@ -7,6 +7,23 @@ import pytest
 from moto import mock_s3
 from mypy_boto3_s3.service_resource import Bucket
 
+from talus_aws_utils.clients import clear_clients
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients() -> Iterable[None]:
+    """Make sure no boto3 client is shared between tests.
+
+    Returns
+    -------
+    Iterable[None]
+        Fixture that clears the shared clients.
+
+    """
+    clear_clients()
+    yield
+    clear_clients()
+
 
 @pytest.fixture
 def env_vars(monkeypatch: Any) -> None:
@@ -0,0 +1,126 @@
+"""Test cases for append-only parquet datasets."""
+import json
+
+from typing import Any, Dict, List
+
+import pandas as pd
+import pytest
+
+from botocore.exceptions import ClientError
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.dataset as dataset_utils
+
+from talus_aws_utils.clients import get_client
+
+
+PREFIX = "results/peptides"
+
+
+def _batch(day: int) -> pd.DataFrame:
+    return pd.DataFrame({"day": [day] * 3, "peptide": ["A", "B", "C"]})
+
+
+def _manifest(bucket: Bucket) -> Dict[str, Any]:
+    body = bucket.Object(f"{PREFIX}/_manifest.json").get()["Body"].read()
+    return json.loads(body)  # type: ignore
+
+
+def test_append_and_read(bucket: Bucket) -> None:
+    """Tests appending batches and reading them in order."""
+    assert dataset_utils.read_dataset(bucket.name, PREFIX).empty
+
+    keys = [
+        dataset_utils.append_dataframe(_batch(i), bucket.name, PREFIX) for i in range(3)
+    ]
+
+    manifest = _manifest(bucket)
+    assert manifest["version"] == 3
+    assert [part["key"] for part in manifest["parts"]] == keys
+    assert all(part["rows"] == 3 for part in manifest["parts"])
+    result = dataset_utils.read_dataset(bucket.name, PREFIX)
+    pd.testing.assert_frame_equal(
+        result, pd.concat([_batch(i) for i in range(3)], ignore_index=True)
+    )
+    columns = dataset_utils.read_dataset(bucket.name, PREFIX, columns=["day"])
+    assert list(columns.columns) == ["day"]
+
+
+def test_compact_dataset(bucket: Bucket) -> None:
+    """Tests merging small parts and deleting them after the retention."""
+    for i in range(5):
+        dataset_utils.append_dataframe(_batch(i), bucket.name, PREFIX)
+    old_keys = [
+        part["key"] for part in dataset_utils.dataset_parts(bucket.name, PREFIX)
+    ]
+    expected = dataset_utils.read_dataset(bucket.name, PREFIX)
+
+    merged = dataset_utils.compact_dataset(bucket.name, PREFIX)
+
+    assert len(merged) == 1
+    parts = dataset_utils.dataset_parts(bucket.name, PREFIX)
+    assert [part["key"] for part in parts] == merged
+    assert parts[0]["rows"] == 15
+    pd.testing.assert_frame_equal(
+        dataset_utils.read_dataset(bucket.name, PREFIX), expected
+    )
+    # Replaced parts are kept for readers of the previous manifest.
+    assert [o["key"] for o in _manifest(bucket)["obsolete"]] == old_keys
+    bucket.Object(old_keys[0]).load()
+
+    assert dataset_utils.compact_dataset(bucket.name, PREFIX, retention=0) == []
+    assert _manifest(bucket)["obsolete"] == []
+    with pytest.raises(ClientError):
+        bucket.Object(old_keys[0]).load()
+
+
+def test_compact_dataset_target_size(bucket: Bucket) -> None:
+    """Tests that merged parts stay within the target size."""
+    for i in range(4):
+        dataset_utils.append_dataframe(_batch(i), bucket.name, PREFIX)
+    size = dataset_utils.dataset_parts(bucket.name, PREFIX)[0]["bytes"]
+
+    merged = dataset_utils.compact_dataset(bucket.name, PREFIX, target_size=2 * size)
+
+    assert len(merged) == 2
+    assert len(dataset_utils.dataset_parts(bucket.name, PREFIX)) == 2
+
+
+def test_append_conflict(bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests that an append retries after losing a manifest update race."""
+    dataset_utils.append_dataframe(_batch(0), bucket.name, PREFIX)
+    s3_client = get_client("s3")
+    put_object = s3_client.put_object
+    calls: List[Dict[str, Any]] = []
+
+    def racing_put_object(**kwargs: Any) -> Any:
+        if kwargs["Key"].endswith("_manifest.json") and not calls:
+            calls.append(kwargs)
+            # Another writer appends between our read and write.
+            dataset_utils.append_dataframe(_batch(1), bucket.name, PREFIX)
+            raise ClientError(
+                {"Error": {"Code": "PreconditionFailed", "Message": ""}}, "PutObject"
+            )
+        return put_object(**kwargs)
+
+    monkeypatch.setattr(s3_client, "put_object", racing_put_object)
+    dataset_utils.append_dataframe(_batch(2), bucket.name, PREFIX)
+
+    assert "IfMatch" in calls[0]
+    days = dataset_utils.read_dataset(bucket.name, PREFIX)["day"].unique()
+    assert days.tolist() == [0, 1, 2]
+
+
+def test_append_without_conditional_writes(bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests that appends fail clearly if botocore can't write conditionally."""
+    assert dataset_utils._supports_conditional_writes(get_client("s3"))
+    monkeypatch.setattr(
+        dataset_utils, "_supports_conditional_writes", lambda s3_client: False
+    )
+
+    with pytest.raises(RuntimeError, match="botocore"):
+        dataset_utils.append_dataframe(_batch(0), bucket.name, PREFIX)
+    with pytest.raises(RuntimeError, match="botocore"):
+        dataset_utils.compact_dataset(bucket.name, PREFIX)
+
+    assert list(bucket.objects.all()) == []
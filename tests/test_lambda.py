@@ -0,0 +1,163 @@
+"""Test cases for the lambda_ module."""
+import base64
+import dataclasses
+import datetime
+import enum
+import gzip
+import json
+import logging
+import uuid
+
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import talus_aws_utils.lambda_ as lambda_utils
+
+
+MSG = {
+    "count": np.int64(3),
+    "score": np.float32(0.5),
+    "values": np.arange(3),
+    "table": pd.DataFrame({"peptide": ["PEPTIDE", "PEPTIDES"], "charge": [2, 3]}),
+    "created": datetime.datetime(2021, 8, 23, 15, 29, 9),
+    "tags": pd.Series(["a", "b"]),
+}
+MSG_EXPECTED = {
+    "count": 3,
+    "score": 0.5,
+    "values": [0, 1, 2],
+    "table": [
+        {"peptide": "PEPTIDE", "charge": 2},
+        {"peptide": "PEPTIDES", "charge": 3},
+    ],
+    "created": "2021-08-23T15:29:09",
+    "tags": ["a", "b"],
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def serializer(request: Any, monkeypatch: Any) -> str:
+    """Run a test with orjson and with the standard library serializer."""
+    if request.param == "json":
+        monkeypatch.setattr(lambda_utils, "orjson", None)
+    else:
+        pytest.importorskip("orjson")
+    return str(request.param)
+
+
+def test_success_msg_wrapper(serializer: str) -> None:
+    """Tests success_msg_wrapper with numpy, pandas and datetime values."""
+    response = lambda_utils.success_msg_wrapper(MSG)
+
+    assert response["statusCode"] == 200
+    assert "isBase64Encoded" not in response
+    assert json.loads(response["body"]) == MSG_EXPECTED
+
+
+def test_error_msg_wrapper(serializer: str) -> None:
+    """Tests error_msg_wrapper with a string message."""
+    response = lambda_utils.error_msg_wrapper("Something went wrong.")
+
+    assert response["statusCode"] == 500
+    assert json.loads(response["body"]) == "Something went wrong."
+
+
+class Charge(enum.Enum):
+    """An enum to serialize."""
+
+    DOUBLE = 2
+
+
+@dataclasses.dataclass
+class Peptide:
+    """A dataclass to serialize."""
+
+    sequence: str
+    charge: Charge
+
+
+def test_dumps(serializer: str) -> None:
+    """Tests that both serializers produce the same compact output."""
+    msg = {
+        "name": "Ångström",
+        "values": [float("nan"), float("inf"), np.float32(0.1)],
+        "array": np.array([np.nan, 0.5], dtype=np.float32),
+        "created": np.datetime64("2021-08-23T15:29:09.123456789"),
+        "id": uuid.UUID(int=1),
+        "peptide": Peptide("PEPTIDE", Charge.DOUBLE),
+        "large": 2**70,
+        1: True,
+    }
+
+    assert lambda_utils.dumps(msg) == (
+        '{"name":"Ångström","values":[null,null,0.1],"array":[null,0.5],'
+        '"created":"2021-08-23T15:29:09.123456",'
+        '"id":"00000000-0000-0000-0000-000000000001",'
+        '"peptide":{"sequence":"PEPTIDE","charge":2},'
+        '"large":1180591620717411303424,"1":true}'
+    )
+
+
+def test_msg_wrapper_unserializable(serializer: str) -> None:
+    """Tests that unsupported types raise a TypeError."""
+    with pytest.raises(TypeError):
+        _ = lambda_utils.success_msg_wrapper({"obj": object()})
+
+
+def test_msg_wrapper_compressed(serializer: str) -> None:
+    """Tests that large bodies are gzipped and base64 encoded."""
+    msg = {"values": list(range(1000))}
+    response = lambda_utils.success_msg_wrapper(msg, compress_min_size=1024)
+
+    assert response["isBase64Encoded"] is True
+    assert response["headers"]["Content-Encoding"] == "gzip"
+    body = gzip.decompress(base64.b64decode(response["body"]))
+    assert json.loads(body) == msg
+
+    # small bodies stay uncompressed
+    response = lambda_utils.success_msg_wrapper("ok", compress_min_size=1024)
+    assert "isBase64Encoded" not in response
+    assert json.loads(response["body"]) == "ok"
+
+
+def test_lambda_handler(caplog: Any) -> None:
+    """Tests that lambda_handler runs init once and wraps results."""
+    init_calls = []
+
+    def init() -> Dict[str, int]:
+        init_calls.append(1)
+        return {"offset": 10}
+
+    @lambda_utils.lambda_handler(init=init)
+    def handler(event: Dict[str, int], context: Any, state: Dict[str, int]) -> Any:
+        return {"value": np.int64(event["value"] + state["offset"])}
+
+    with caplog.at_level(logging.INFO, logger="talus_aws_utils.lambda_"):
+        first = handler({"value": 1}, None)
+        second = handler({"value": 2}, None)
+
+    assert init_calls == [1]
+    assert first["statusCode"] == 200
+    assert json.loads(first["body"]) == {"value": 11}
+    assert json.loads(second["body"]) == {"value": 12}
+
+    logs = [json.loads(record.getMessage()) for record in caplog.records]
+    assert [log["cold_start"] for log in logs] == [True, False]
+    assert logs[0]["init_ms"] >= 0 and logs[1]["init_ms"] == 0
+    assert {"handler_ms", "serialization_ms", "status_code"} <= set(logs[0])
+
+
+def test_lambda_handler_error() -> None:
+    """Tests that lambda_handler turns exceptions into error responses."""
+
+    @lambda_utils.lambda_handler()
+    def handler(event: Any, context: Any) -> Any:
+        raise ValueError("File doesn't exist.")
+
+    response = handler({}, None)
+
+    assert response["statusCode"] == 500
+    assert json.loads(response["body"]) == "File doesn't exist."
@@ -0,0 +1,150 @@
+"""Test cases for the local listing index."""
+import sqlite3
+
+from pathlib import Path
+from typing import List
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+from talus_aws_utils import metrics
+from talus_aws_utils.listing import ListingIndex
+
+
+KEYS = [
+    "runs/2021-01/a.raw",
+    "runs/2021-01/a.json",
+    "runs/2021-02/b.raw",
+    "runs/2021-02/nested/c.raw",
+]
+
+
+def _put(bucket: Bucket, keys: List[str], size: int = 3) -> None:
+    for key in keys:
+        bucket.put_object(Key=key, Body=b"x" * size)
+
+
+def test_listing_index_query(bucket: Bucket, tmp_path: Path) -> None:
+    """Tests querying the index by prefix, suffix, glob and size."""
+    _put(bucket, KEYS)
+    bucket.put_object(Key="runs/2021-02/large.raw", Body=b"x" * 100)
+    bucket.put_object(Key="other/d.raw", Body=b"x")
+    index = ListingIndex(str(tmp_path / "index.sqlite"))
+
+    assert index.refresh(bucket.name, "runs/") == 5
+
+    assert index.keys(bucket.name, "runs/", suffix=".json") == ["runs/2021-01/a.json"]
+    assert index.keys(bucket.name, pattern="runs/*/b.raw") == ["runs/2021-02/b.raw"]
+    assert index.keys(bucket.name, "runs/2021-02/", min_size=10) == [
+        "runs/2021-02/large.raw"
+    ]
+    assert index.keys(bucket.name, max_size=3) == sorted(KEYS)
+    objects = index.objects(bucket.name, "runs/2021-01/a.raw")
+    assert objects[0]["Size"] == 3
+    assert objects[0]["ETag"] == bucket.Object("runs/2021-01/a.raw").e_tag
+
+    index.close()
+    reopened = ListingIndex(str(tmp_path / "index.sqlite"))
+    assert len(reopened.keys(bucket.name, "runs/")) == 5
+    assert reopened.refreshed(bucket.name, "runs/") is not None
+    assert reopened.refreshed(bucket.name, "other/") is None
+
+
+def test_listing_index_refresh(bucket: Bucket) -> None:
+    """Tests incremental and full refreshes."""
+    _put(bucket, KEYS)
+    index = ListingIndex()
+    index.refresh(bucket.name, "runs/")
+
+    _put(bucket, ["runs/2021-03/d.raw"])
+    bucket.Object("runs/2021-01/a.json").delete()
+    assert index.refresh(bucket.name, "runs/") == 1
+    assert "runs/2021-03/d.raw" in index.keys(bucket.name, "runs/")
+    # Deleted objects are only dropped by a full refresh.
+    assert "runs/2021-01/a.json" in index.keys(bucket.name, "runs/")
+
+    assert index.refresh(bucket.name, "runs/2021-01/", full=True) == 1
+    assert index.keys(bucket.name, "runs/2021-01/") == ["runs/2021-01/a.raw"]
+    assert len(index.keys(bucket.name, "runs/")) == 4
+
+
+def test_listing_index_max_age(bucket: Bucket) -> None:
+    """Tests that prefixes are listed fully again once max_age has passed."""
+    _put(bucket, KEYS)
+    index = ListingIndex()
+    index.refresh(bucket.name, "runs/")
+    full_refreshed = index.refreshed(bucket.name, "runs/", full=True)
+    assert full_refreshed is not None
+
+    bucket.Object("runs/2021-01/a.json").delete()
+    assert index.refresh(bucket.name, "runs/", max_age=3600) == 0
+    assert "runs/2021-01/a.json" in index.keys(bucket.name, "runs/")
+    assert index.refreshed(bucket.name, "runs/", full=True) == full_refreshed
+
+    assert index.refresh(bucket.name, "runs/", max_age=0) == 3
+    assert "runs/2021-01/a.json" not in index.keys(bucket.name, "runs/")
+    assert (index.refreshed(bucket.name, "runs/", full=True) or 0) > full_refreshed
+
+
+def test_listing_index_old_schema(bucket: Bucket, tmp_path: Path) -> None:
+    """Tests that indexes without full listing times are listed fully."""
+    path = str(tmp_path / "index.sqlite")
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE prefixes (bucket TEXT NOT NULL, prefix TEXT NOT NULL,"
+        " last_key TEXT, refreshed REAL NOT NULL, PRIMARY KEY (bucket, prefix))"
+    )
+    db.execute(
+        "INSERT INTO prefixes VALUES (?, ?, ?, ?)",
+        (bucket.name, "runs/", "runs/9999", 0.0),
+    )
+    db.commit()
+    db.close()
+    _put(bucket, KEYS)
+    index = ListingIndex(path)
+
+    assert index.refreshed(bucket.name, "runs/", full=True) is None
+    assert index.refresh(bucket.name, "runs/") == 0
+    assert index.refresh(bucket.name, "runs/", max_age=3600) == 4
+
+
+def test_file_keys_in_bucket_index(bucket: Bucket) -> None:
+    """Tests that file_keys_in_bucket only lists new keys with an index."""
+    _put(bucket, KEYS)
+    index = ListingIndex()
+    expected = s3_utils.file_keys_in_bucket(bucket.name, "runs/", ".raw")
+
+    recorder = metrics.register(metrics.MetricsRecorder())
+    try:
+        assert (
+            s3_utils.file_keys_in_bucket(bucket.name, "runs/", ".raw", index=index)
+            == expected
+        )
+        _put(bucket, ["runs/2021-03/d.raw"])
+        keys = s3_utils.file_keys_in_bucket(bucket.name, "runs/", ".raw", index=index)
+    finally:
+        metrics.unregister(recorder)
+
+    assert keys == expected + ["runs/2021-03/d.raw"]
+    requests = [
+        row["value"]
+        for row in recorder.summary()
+        if row["name"] == "requests" and row["operation"] == "list_objects"
+    ]
+    assert requests == [2]
+
+
+def test_file_keys_in_bucket_index_deleted(bucket: Bucket) -> None:
+    """Tests that file_keys_in_bucket drops deleted keys after index_max_age."""
+    _put(bucket, KEYS)
+    index = ListingIndex()
+    _ = s3_utils.file_keys_in_bucket(bucket.name, "runs/", ".raw", index=index)
+    bucket.Object("runs/2021-01/a.raw").delete()
+
+    assert "runs/2021-01/a.raw" in s3_utils.file_keys_in_bucket(
+        bucket.name, "runs/", ".raw", index=index
+    )
+    assert s3_utils.file_keys_in_bucket(
+        bucket.name, "runs/", ".raw", index=index, index_max_age=0
+    ) == ["runs/2021-02/b.raw", "runs/2021-02/nested/c.raw"]
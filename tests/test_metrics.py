@@ -0,0 +1,82 @@
+"""Test cases for the metrics module."""
+from typing import Any, Iterable, List
+
+import pytest
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+from talus_aws_utils import metrics
+
+
+JSON_FILE_KEY = "peptide_proteins.json"
+JSON_OBJECT = {"PEPTIDE": ["PROTEIN1", "PROTEIN2"]}
+
+
+@pytest.fixture
+def recorder() -> Iterable[metrics.MetricsRecorder]:
+    """Fixture for a registered MetricsRecorder."""
+    recorder = metrics.register(metrics.MetricsRecorder())
+    yield recorder
+    metrics.unregister(recorder)
+
+
+def _rows(recorder: metrics.MetricsRecorder, name: str) -> List[Any]:
+    return [row for row in recorder.summary() if row["name"] == name]
+
+
+def test_s3_metrics(bucket: Bucket, recorder: metrics.MetricsRecorder) -> None:
+    """Tests that s3 reads, writes, lists and heads are recorded."""
+    s3_utils.write_json(dict_obj=JSON_OBJECT, bucket=bucket.name, key=JSON_FILE_KEY)
+    _ = s3_utils.read_json(bucket=bucket.name, key=JSON_FILE_KEY)
+    _ = s3_utils.file_keys_in_bucket(bucket=bucket.name, key="")
+    assert not s3_utils.file_exists_in_bucket(bucket=bucket.name, key="random.json")
+
+    requests = {row["operation"]: row["value"] for row in _rows(recorder, "requests")}
+    assert requests["write_object"] == 1
+    assert requests["read_object"] == 1
+    assert requests["list_objects"] == 2
+    assert requests["head_object"] == 1
+    assert {row["operation"] for row in _rows(recorder, "errors")} == {"head_object"}
+
+    bytes_in = _rows(recorder, "bytes_in")
+    bytes_out = _rows(recorder, "bytes_out")
+    assert bytes_in[0]["value"] == bytes_out[0]["value"] > 0
+
+    latency = {row["operation"]: row for row in _rows(recorder, "latency")}
+    assert latency["read_object"]["count"] == 1
+    assert latency["list_objects"]["count"] == 2
+
+
+def test_metrics_recorder_summary(recorder: metrics.MetricsRecorder) -> None:
+    """Tests the counter and histogram aggregation of MetricsRecorder."""
+    for value in range(1, 101):
+        metrics.observe("latency", value, operation="test")
+    metrics.increment("cache_hits", operation="test")
+    metrics.increment("cache_hits", 2, operation="test")
+
+    assert _rows(recorder, "cache_hits") == [
+        {"name": "cache_hits", "operation": "test", "value": 3}
+    ]
+    latency = _rows(recorder, "latency")[0]
+    assert (latency["count"], latency["min"], latency["max"]) == (100, 1, 100)
+    assert (latency["p50"], latency["p90"], latency["p99"]) == (50, 90, 99)
+
+    recorder.reset()
+    assert recorder.summary() == []
+
+
+def test_failing_callback_is_ignored(recorder: metrics.MetricsRecorder) -> None:
+    """Tests that an exception in a callback doesn't propagate."""
+
+    def broken(metric: metrics.Metric) -> None:
+        raise RuntimeError("exporter is down")
+
+    metrics.register(broken)
+    try:
+        metrics.increment("requests", operation="test")
+    finally:
+        metrics.unregister(broken)
+
+    assert _rows(recorder, "requests")[0]["value"] == 1
@@ -0,0 +1,81 @@
+"""Test cases for memory-budgeted reads from S3."""
+import threading
+import time
+
+from io import BytesIO
+from typing import Any, Dict
+
+import pandas as pd
+import pytest
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+
+KEYS = [f"results/{i}.parquet" for i in range(6)]
+
+
+@pytest.fixture
+def parquet_bucket(bucket: Bucket) -> Bucket:
+    """Fixture for a bucket with parquet files."""
+    for i, key in enumerate(KEYS):
+        s3_utils.write_dataframe(pd.DataFrame({"i": [i] * 10}), bucket.name, key)
+    return bucket
+
+
+def _track_concurrency(monkeypatch: Any) -> Dict[str, int]:
+    state = {"current": 0, "max": 0}
+    lock = threading.Lock()
+    read_object = s3_utils._read_object
+
+    def tracked(bucket: str, key: str) -> BytesIO:
+        with lock:
+            state["current"] += 1
+            state["max"] = max(state["max"], state["current"])
+        time.sleep(0.05)
+        try:
+            return read_object(bucket=bucket, key=key)
+        finally:
+            with lock:
+                state["current"] -= 1
+
+    monkeypatch.setattr(s3_utils, "_read_object", tracked)
+    return state
+
+
+def test_iter_dataframes(parquet_bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests that reads in flight stay within the memory budget."""
+    state = _track_concurrency(monkeypatch)
+
+    results = dict(
+        s3_utils.iter_dataframes(
+            parquet_bucket.name,
+            KEYS,
+            memory_budget=250,
+            sizes={key: 100 for key in KEYS},
+        )
+    )
+
+    assert sorted(results) == KEYS
+    for i, key in enumerate(KEYS):
+        assert results[key]["i"].tolist() == [i] * 10
+    assert state["max"] == 2
+
+
+def test_iter_dataframes_oversized(parquet_bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests that objects larger than the budget are read one at a time."""
+    state = _track_concurrency(monkeypatch)
+
+    results = list(s3_utils.iter_dataframes(parquet_bucket.name, KEYS, 1))
+
+    assert len(results) == len(KEYS)
+    assert state["max"] == 1
+
+
+def test_iter_dataframes_errors(parquet_bucket: Bucket) -> None:
+    """Tests invalid budgets and missing objects."""
+    with pytest.raises(ValueError):
+        list(s3_utils.iter_dataframes(parquet_bucket.name, KEYS, 0))
+    with pytest.raises(ValueError):
+        list(s3_utils.iter_dataframes(parquet_bucket.name, ["missing.parquet"], 100))
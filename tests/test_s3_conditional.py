@@ -0,0 +1,60 @@
+"""Test cases for conditional reads from S3."""
+import pandas as pd
+import pytest
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+from talus_aws_utils import metrics
+
+
+def test_read_json_if_changed(bucket: Bucket) -> None:
+    """Tests that an unchanged json object isn't read again."""
+    s3_utils.write_json({"status": "running"}, bucket.name, "status.json")
+
+    first = s3_utils.read_json_if_changed(bucket.name, "status.json")
+    assert isinstance(first, s3_utils.VersionedObject)
+    assert first.value == {"status": "running"}
+
+    recorder = metrics.register(metrics.MetricsRecorder())
+    try:
+        result = s3_utils.read_json_if_changed(
+            bucket.name, "status.json", etag=first.etag
+        )
+    finally:
+        metrics.unregister(recorder)
+    assert result is s3_utils.NOT_MODIFIED
+    counters = {
+        row["name"]: row["value"] for row in recorder.summary() if "value" in row
+    }
+    assert counters["not_modified"] == 1
+    assert "errors" not in counters
+    assert "bytes_in" not in counters
+
+    s3_utils.write_json({"status": "done"}, bucket.name, "status.json")
+    result = s3_utils.read_json_if_changed(bucket.name, "status.json", etag=first.etag)
+    assert isinstance(result, s3_utils.VersionedObject)
+    assert result.value == {"status": "done"}
+    assert result.etag != first.etag
+
+
+def test_read_dataframe_if_changed(bucket: Bucket) -> None:
+    """Tests conditional dataframe reads by last modified time."""
+    dataframe = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    s3_utils.write_dataframe(dataframe, bucket.name, "results.parquet")
+
+    first = s3_utils.read_dataframe_if_changed(bucket.name, "results.parquet")
+    assert isinstance(first, s3_utils.VersionedObject)
+    pd.testing.assert_frame_equal(first.value, dataframe)
+
+    result = s3_utils.read_dataframe_if_changed(
+        bucket.name, "results.parquet", modified_since=first.last_modified
+    )
+    assert result is s3_utils.NOT_MODIFIED
+
+
+def test_read_if_changed_missing(bucket: Bucket) -> None:
+    """Tests conditional reads of missing objects."""
+    with pytest.raises(ValueError):
+        s3_utils.read_json_if_changed(bucket.name, "missing.json", etag='"abc"')
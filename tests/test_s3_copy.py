@@ -0,0 +1,184 @@
+"""Test cases for copying and moving objects within S3."""
+from typing import Any, Dict, Iterable, List, Tuple
+
+import pytest
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+
+SRC_PREFIX = "results/run1/"
+DST_PREFIX = "promoted/run1/"
+KEYS = [f"{SRC_PREFIX}sample{i}.json" for i in range(5)] + [
+    f"{SRC_PREFIX}nested/summary.csv"
+]
+
+
+@pytest.fixture
+def prefix_bucket(bucket: Bucket) -> Iterable[Bucket]:
+    """Fixture for a bucket with objects under a prefix."""
+    for key in KEYS:
+        bucket.put_object(Key=key, Body=key.encode("utf-8"))
+    bucket.put_object(Key="results/run10/other.json", Body=b"{}")
+    yield bucket
+
+
+def _body(bucket: Bucket, key: str) -> bytes:
+    return bucket.Object(key).get()["Body"].read()
+
+
+def test_copy_object(prefix_bucket: Bucket) -> None:
+    """Tests copy_object with a single CopyObject request."""
+    s3_utils.copy_object(
+        prefix_bucket.name, KEYS[0], prefix_bucket.name, "copy/sample0.json"
+    )
+
+    assert _body(prefix_bucket, "copy/sample0.json") == KEYS[0].encode("utf-8")
+
+
+def test_copy_object_multipart(bucket: Bucket) -> None:
+    """Tests copy_object with parallel UploadPartCopy requests."""
+    data = bytes(range(256)) * (11 * 1024**2 // 256)
+    bucket.put_object(Key="large.bin", Body=data)
+
+    s3_utils.copy_object(
+        bucket.name,
+        "large.bin",
+        bucket.name,
+        "copy/large.bin",
+        multipart_threshold=5 * 1024**2,
+        part_size=5 * 1024**2,
+    )
+
+    assert _body(bucket, "copy/large.bin") == data
+    # multipart ETags end in the number of parts
+    assert bucket.Object("copy/large.bin").e_tag.strip('"').endswith("-3")
+
+
+def test_copy_object_file_doesnt_exist(bucket: Bucket) -> None:
+    """Tests copy_object with a nonexisting file."""
+    with pytest.raises(ValueError, match="File doesn't exist."):
+        s3_utils.copy_object(bucket.name, "random_file.csv", bucket.name, "copy.csv")
+
+
+def test_copy_prefix(prefix_bucket: Bucket) -> None:
+    """Tests copy_prefix and that it resumes by skipping copied objects."""
+    progress: List[Tuple[int, int]] = []
+    # simulate an interrupted earlier run that copied one object
+    s3_utils.copy_object(
+        prefix_bucket.name,
+        KEYS[0],
+        prefix_bucket.name,
+        KEYS[0].replace(SRC_PREFIX, DST_PREFIX),
+    )
+
+    copied = s3_utils.copy_prefix(
+        prefix_bucket.name,
+        SRC_PREFIX,
+        prefix_bucket.name,
+        DST_PREFIX,
+        progress=lambda done, total: progress.append((done, total)),
+    )
+
+    assert set(copied) == set(KEYS)
+    assert progress[0] == (1, len(KEYS))
+    assert progress[-1] == (len(KEYS), len(KEYS))
+    for key in KEYS:
+        dst_key = key.replace(SRC_PREFIX, DST_PREFIX)
+        assert _body(prefix_bucket, dst_key) == key.encode("utf-8")
+    assert not s3_utils.file_exists_in_bucket(
+        prefix_bucket.name, "promoted/run10/other.json"
+    )
+
+
+def test_move_prefix(prefix_bucket: Bucket) -> None:
+    """Tests move_prefix."""
+    moved = s3_utils.move_prefix(
+        prefix_bucket.name, SRC_PREFIX, prefix_bucket.name, DST_PREFIX
+    )
+
+    assert set(moved) == set(KEYS)
+    remaining = {obj.key for obj in prefix_bucket.objects.all()}
+    assert remaining == {key.replace(SRC_PREFIX, DST_PREFIX) for key in KEYS} | {
+        "results/run10/other.json"
+    }
+
+
+def test_copy_prefix_same_size(prefix_bucket: Bucket) -> None:
+    """Tests that objects of the same size but other content are copied."""
+    prefix_bucket.put_object(Key=f"{SRC_PREFIX}data.txt", Body=b"NEW!")
+    prefix_bucket.put_object(Key=f"{DST_PREFIX}data.txt", Body=b"OLD!")
+
+    s3_utils.move_prefix(prefix_bucket.name, SRC_PREFIX, prefix_bucket.name, DST_PREFIX)
+
+    assert _body(prefix_bucket, f"{DST_PREFIX}data.txt") == b"NEW!"
+
+
+def test_copy_prefix_multipart_resume(bucket: Bucket) -> None:
+    """Tests that multipart copies are recognized by their source ETag."""
+    bucket.put_object(Key=f"{SRC_PREFIX}large.bin", Body=b"x" * (6 * 1024**2))
+    kwargs: Dict[str, Any] = {
+        "multipart_threshold": 5 * 1024**2,
+        "part_size": 5 * 1024**2,
+    }
+    s3_utils.copy_prefix(bucket.name, SRC_PREFIX, bucket.name, DST_PREFIX, **kwargs)
+    progress: List[Tuple[int, int]] = []
+
+    s3_utils.copy_prefix(
+        bucket.name,
+        SRC_PREFIX,
+        bucket.name,
+        DST_PREFIX,
+        progress=lambda done, total: progress.append((done, total)),
+        **kwargs,
+    )
+
+    assert progress == [(1, 1)]
+    # A changed source of the same size is copied again.
+    bucket.put_object(Key=f"{SRC_PREFIX}large.bin", Body=b"y" * (6 * 1024**2))
+    s3_utils.copy_prefix(bucket.name, SRC_PREFIX, bucket.name, DST_PREFIX, **kwargs)
+    assert _body(bucket, f"{DST_PREFIX}large.bin")[:1] == b"y"
+
+
+def test_copy_prefix_multipart_threshold(bucket: Bucket) -> None:
+    """Tests copying an object of exactly the multipart threshold."""
+    bucket.put_object(
+        Key=f"{SRC_PREFIX}large.bin",
+        Body=b"x" * (5 * 1024**2),
+        ContentType="application/x-raw",
+        Metadata={"run": "1"},
+    )
+    kwargs: Dict[str, Any] = {
+        "multipart_threshold": 5 * 1024**2,
+        "part_size": 5 * 1024**2,
+    }
+    s3_utils.copy_prefix(bucket.name, SRC_PREFIX, bucket.name, DST_PREFIX, **kwargs)
+
+    copied = bucket.Object(f"{DST_PREFIX}large.bin")
+    assert copied.content_type == "application/x-raw"
+    assert copied.metadata == {
+        "run": "1",
+        s3_utils.SOURCE_ETAG_METADATA: bucket.Object(f"{SRC_PREFIX}large.bin").e_tag,
+    }
+    progress: List[Tuple[int, int]] = []
+    s3_utils.copy_prefix(
+        bucket.name,
+        SRC_PREFIX,
+        bucket.name,
+        DST_PREFIX,
+        progress=lambda done, total: progress.append((done, total)),
+        **kwargs,
+    )
+    assert progress == [(1, 1)]
+
+
+@pytest.mark.parametrize("dst_prefix", [SRC_PREFIX, "results/", f"{SRC_PREFIX}copy/"])
+def test_move_prefix_overlap(prefix_bucket: Bucket, dst_prefix: str) -> None:
+    """Tests that overlapping prefixes are rejected before any change."""
+    with pytest.raises(ValueError, match="overlap"):
+        s3_utils.move_prefix(
+            prefix_bucket.name, SRC_PREFIX, prefix_bucket.name, dst_prefix
+        )
+
+    assert len(list(prefix_bucket.objects.all())) == len(KEYS) + 1
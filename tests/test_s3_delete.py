@@ -0,0 +1,97 @@
+"""Test cases for bulk deletion of objects."""
+from typing import Any, Iterable, List
+
+import pytest
+
+from botocore.exceptions import EndpointConnectionError
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+from talus_aws_utils.clients import get_client
+
+
+PREFIX = "intermediate/"
+KEYS = [f"{PREFIX}part{i:04d}.parquet" for i in range(25)]
+OTHER_KEY = "results/final.parquet"
+
+
+@pytest.fixture
+def prefix_bucket(bucket: Bucket, monkeypatch: Any) -> Iterable[Bucket]:
+    """Fixture for a bucket with objects under a prefix, in batches of 10."""
+    monkeypatch.setattr(s3_utils, "DELETE_BATCH_SIZE", 10)
+    for key in KEYS:
+        bucket.put_object(Key=key, Body=b"")
+    bucket.put_object(Key=OTHER_KEY, Body=b"")
+    yield bucket
+
+
+def _keys(bucket: Bucket) -> List[str]:
+    return [obj.key for obj in bucket.objects.all()]
+
+
+def test_delete_prefix(prefix_bucket: Bucket) -> None:
+    """Tests delete_prefix across several batches."""
+    result = s3_utils.delete_prefix(bucket=prefix_bucket.name, prefix=PREFIX)
+
+    assert sorted(result.deleted) == KEYS
+    assert result.errors == {}
+    assert _keys(prefix_bucket) == [OTHER_KEY]
+
+
+def test_delete_prefix_dry_run(prefix_bucket: Bucket) -> None:
+    """Tests that delete_prefix doesn't delete anything in dry run mode."""
+    result = s3_utils.delete_prefix(
+        bucket=prefix_bucket.name, prefix=PREFIX, dry_run=True
+    )
+
+    assert sorted(result.deleted) == KEYS
+    assert len(_keys(prefix_bucket)) == len(KEYS) + 1
+
+
+def test_delete_prefix_empty(prefix_bucket: Bucket) -> None:
+    """Tests that delete_prefix refuses to empty the whole bucket."""
+    with pytest.raises(ValueError, match="Prefix must not be empty."):
+        _ = s3_utils.delete_prefix(bucket=prefix_bucket.name, prefix="")
+
+
+def test_delete_keys_partial_failure(prefix_bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests that delete_keys reports keys that couldn't be deleted."""
+    s3_client = get_client("s3")
+    delete_objects = s3_client.delete_objects
+
+    def fail_first_key(**kwargs: Any) -> Any:
+        failed, *rest = kwargs["Delete"]["Objects"]
+        kwargs["Delete"]["Objects"] = rest
+        response = delete_objects(**kwargs)
+        response["Errors"] = [
+            {"Key": failed["Key"], "Code": "AccessDenied", "Message": "Denied"}
+        ]
+        return response
+
+    monkeypatch.setattr(s3_client, "delete_objects", fail_first_key)
+    result = s3_utils.delete_keys(bucket=prefix_bucket.name, keys=KEYS[:10])
+
+    assert result.deleted == KEYS[1:10]
+    assert result.errors == {KEYS[0]: "AccessDenied: Denied"}
+
+
+def test_delete_prefix_connection_error(
+    prefix_bucket: Bucket, monkeypatch: Any
+) -> None:
+    """Tests that a failed batch is reported without losing the others."""
+    s3_client = get_client("s3")
+    delete_objects = s3_client.delete_objects
+
+    def fail_first_batch(**kwargs: Any) -> Any:
+        if kwargs["Delete"]["Objects"][0]["Key"] == KEYS[0]:
+            raise EndpointConnectionError(endpoint_url="https://s3.amazonaws.com")
+        return delete_objects(**kwargs)
+
+    monkeypatch.setattr(s3_client, "delete_objects", fail_first_batch)
+    result = s3_utils.delete_prefix(bucket=prefix_bucket.name, prefix=PREFIX)
+
+    assert sorted(result.deleted) == KEYS[10:]
+    assert sorted(result.errors) == KEYS[:10]
+    assert result.errors[KEYS[0]].startswith("EndpointConnectionError: ")
+    assert sorted(_keys(prefix_bucket)) == sorted(KEYS[:10] + [OTHER_KEY])
@@ -0,0 +1,114 @@
+"""Test cases for the ranged download path of the read_* functions."""
+import os
+
+from typing import Any
+
+import pytest
+
+from botocore.exceptions import ReadTimeoutError
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+from talus_aws_utils import metrics, tracing
+from talus_aws_utils.clients import get_client
+
+
+def test_read_object_parts(bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests reading an object in concurrent ranged parts."""
+    monkeypatch.setattr(s3_utils, "DOWNLOAD_PART_SIZE", 1000)
+    body = os.urandom(5500)
+    bucket.put_object(Key="data.bin", Body=body)
+
+    with tracing.trace() as t:
+        data = s3_utils._read_object(bucket.name, "data.bin")
+
+    assert data.getvalue() == body
+    assert data.tell() == 0
+    summary = {row["name"]: row for row in t.summary()}
+    assert summary["GetObject"]["count"] == 6
+    assert summary["GetObject"]["bytes"] == len(body)
+
+
+def test_read_object_buffer(bucket: Bucket) -> None:
+    """Tests that no views of the buffer are left exported."""
+    bucket.put_object(Key="data.bin", Body=b"abc")
+
+    data = s3_utils._read_object(bucket.name, "data.bin")
+
+    # getvalue only returns the buffer itself, without copying it, if no
+    # views of it are still exported.
+    assert data.getvalue() is data.getvalue()
+    assert data.read() == b"abc"
+
+
+def test_read_object_empty(bucket: Bucket) -> None:
+    """Tests reading an empty object, which has no satisfiable range."""
+    bucket.put_object(Key="empty.json", Body=b"")
+
+    assert s3_utils._read_object(bucket.name, "empty.json").getvalue() == b""
+
+
+class _FailingBody:
+    """A response body that fails after its first chunk."""
+
+    def __init__(self, body: Any) -> None:
+        """Wrap a response body."""
+        self.body = body
+        self.reads = 0
+
+    def read(self, size: int) -> bytes:
+        """Read a chunk, raising a read timeout after the first."""
+        self.reads += 1
+        if self.reads > 1:
+            raise ReadTimeoutError(endpoint_url="https://s3")
+        return self.body.read(size)  # type: ignore
+
+
+def test_read_object_stream_retry(bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests that parts whose body fails while streaming are read again."""
+    monkeypatch.setattr(s3_utils, "DOWNLOAD_PART_SIZE", 1000)
+    monkeypatch.setattr(s3_utils, "READ_CHUNK_SIZE", 100)
+    body = os.urandom(2500)
+    bucket.put_object(Key="data.bin", Body=body)
+    s3_client = get_client("s3")
+    get_object = s3_client.get_object
+    failed = []
+
+    def flaky_get_object(**kwargs: Any) -> Any:
+        response = get_object(**kwargs)
+        if kwargs["Range"] not in failed:
+            failed.append(kwargs["Range"])
+            response["Body"] = _FailingBody(response["Body"])
+        return response
+
+    monkeypatch.setattr(s3_client, "get_object", flaky_get_object)
+    recorder = metrics.register(metrics.MetricsRecorder())
+    try:
+        data = s3_utils._read_object(bucket.name, "data.bin")
+    finally:
+        metrics.unregister(recorder)
+
+    assert data.getvalue() == body
+    retries = [row for row in recorder.summary() if row["name"] == "stream_retries"]
+    assert retries[0]["value"] == 3
+
+
+def test_read_object_stream_retry_exhausted(bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests that reads fail after DOWNLOAD_ATTEMPTS failed attempts."""
+    bucket.put_object(Key="data.bin", Body=b"x" * 200)
+    monkeypatch.setattr(s3_utils, "READ_CHUNK_SIZE", 100)
+    s3_client = get_client("s3")
+    get_object = s3_client.get_object
+    calls = []
+
+    def failing_get_object(**kwargs: Any) -> Any:
+        calls.append(kwargs)
+        response = get_object(**kwargs)
+        response["Body"] = _FailingBody(response["Body"])
+        return response
+
+    monkeypatch.setattr(s3_client, "get_object", failing_get_object)
+    with pytest.raises(ReadTimeoutError):
+        s3_utils._read_object(bucket.name, "data.bin")
+    assert len(calls) == s3_utils.DOWNLOAD_ATTEMPTS
@@ -0,0 +1,189 @@
+"""Test cases for the client, retry and hedging configuration."""
+import json
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable
+
+import pytest
+
+from botocore.exceptions import ClientError, ReadTimeoutError
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+from talus_aws_utils import metrics
+from talus_aws_utils.clients import configure_endpoint, configure_retries, get_client
+
+
+JSON_FILE_KEY = "peptide_proteins.json"
+JSON_OBJECT = {"PEPTIDE": ["PROTEIN1", "PROTEIN2"]}
+
+
+@pytest.fixture
+def hedging() -> Iterable[None]:
+    """Enable hedging with a short initial delay."""
+    s3_utils.configure_hedging(initial_delay=0.05)
+    yield
+    s3_utils.configure_hedging(enabled=False)
+
+
+@pytest.fixture
+def json_bucket(bucket: Bucket) -> Iterable[Bucket]:
+    """Fixture for a bucket with a json file."""
+    bucket.put_object(Key=JSON_FILE_KEY, Body=json.dumps(JSON_OBJECT))
+    yield bucket
+
+
+def test_configure_retries() -> None:
+    """Tests that configure_retries applies to newly created clients."""
+    configure_retries(mode="adaptive", max_attempts=5, read_timeout=10)
+    try:
+        config = get_client("s3").meta.config
+        assert config.retries == {"mode": "adaptive", "total_max_attempts": 5}
+        assert config.read_timeout == 10
+    finally:
+        configure_retries()
+
+    with pytest.raises(ValueError, match="Invalid retry mode."):
+        configure_retries(mode="aggressive")
+
+
+def test_hedged_read(json_bucket: Bucket, hedging: None, monkeypatch: Any) -> None:
+    """Tests that a slow GET is hedged and the faster response is used."""
+    s3_client = get_client("s3")
+    get_object = s3_client.get_object
+    calls = []
+
+    def slow_first_get_object(**kwargs: Any) -> Any:
+        calls.append(kwargs)
+        if len(calls) == 1:
+            time.sleep(0.5)
+        return get_object(**kwargs)
+
+    monkeypatch.setattr(s3_client, "get_object", slow_first_get_object)
+    recorder = metrics.register(metrics.MetricsRecorder())
+    try:
+        json_actual = s3_utils.read_json(bucket=json_bucket.name, key=JSON_FILE_KEY)
+    finally:
+        metrics.unregister(recorder)
+
+    assert json_actual == JSON_OBJECT
+    assert len(calls) == 2
+    counters = {
+        row["name"]: row["value"] for row in recorder.summary() if "value" in row
+    }
+    assert counters["hedges"] == counters["hedge_wins"] == 1
+
+
+def test_hedged_read_fast(json_bucket: Bucket, hedging: None) -> None:
+    """Tests that fast GETs aren't hedged."""
+    recorder = metrics.register(metrics.MetricsRecorder())
+    try:
+        json_actual = s3_utils.read_json(bucket=json_bucket.name, key=JSON_FILE_KEY)
+    finally:
+        metrics.unregister(recorder)
+
+    assert json_actual == JSON_OBJECT
+    assert "hedges" not in {row["name"] for row in recorder.summary()}
+
+
+def test_hedged_read_file_doesnt_exist(json_bucket: Bucket, hedging: None) -> None:
+    """Tests hedged reads of a nonexisting file."""
+    with pytest.raises(ValueError, match="File doesn't exist."):
+        _ = s3_utils.read_json(bucket=json_bucket.name, key="random_file.json")
+
+
+def test_hedged_read_queued(json_bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests that time waiting for a thread doesn't trigger hedges."""
+    s3_utils.configure_hedging(initial_delay=0.05, max_concurrency=1)
+    s3_client = get_client("s3")
+    get_object = s3_client.get_object
+
+    def get_object_30ms(**kwargs: Any) -> Any:
+        time.sleep(0.03)
+        return get_object(**kwargs)
+
+    monkeypatch.setattr(s3_client, "get_object", get_object_30ms)
+    recorder = metrics.register(metrics.MetricsRecorder())
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(
+                pool.map(
+                    lambda _: s3_utils.read_json(json_bucket.name, JSON_FILE_KEY),
+                    range(8),
+                )
+            )
+    finally:
+        metrics.unregister(recorder)
+        s3_utils.configure_hedging(enabled=False)
+
+    assert results == [JSON_OBJECT] * 8
+    assert "hedges" not in {row["name"] for row in recorder.summary()}
+
+
+def test_hedged_read_primary_fails(
+    json_bucket: Bucket, hedging: None, monkeypatch: Any
+) -> None:
+    """Tests that a hedge is used if the first GET fails."""
+    s3_client = get_client("s3")
+    get_object = s3_client.get_object
+    calls = []
+
+    def failing_first_get_object(**kwargs: Any) -> Any:
+        calls.append(kwargs)
+        if len(calls) == 1:
+            time.sleep(0.2)
+            raise ClientError(
+                {"Error": {"Code": "InternalError", "Message": ""}}, "GetObject"
+            )
+        time.sleep(0.4)
+        return get_object(**kwargs)
+
+    monkeypatch.setattr(s3_client, "get_object", failing_first_get_object)
+    json_actual = s3_utils.read_json(bucket=json_bucket.name, key=JSON_FILE_KEY)
+
+    assert json_actual == JSON_OBJECT
+    assert len(calls) == 2
+
+
+def test_configure_endpoint() -> None:
+    """Tests that configure_endpoint applies to newly created clients."""
+    configure_endpoint("s3", "http://127.0.0.1:9000")
+    try:
+        assert get_client("s3").meta.endpoint_url == "http://127.0.0.1:9000"
+    finally:
+        configure_endpoint("s3")
+
+    assert get_client("s3").meta.endpoint_url != "http://127.0.0.1:9000"
+
+
+class _FailingBody:
+    """A response body that fails while streaming."""
+
+    def read(self, size: int) -> bytes:
+        """Raise a read timeout."""
+        raise ReadTimeoutError(endpoint_url="https://s3")
+
+
+def test_hedged_read_stream_retry(
+    json_bucket: Bucket, hedging: None, monkeypatch: Any
+) -> None:
+    """Tests that a hedged body failing while streaming is requested again."""
+    s3_client = get_client("s3")
+    get_object = s3_client.get_object
+    calls = []
+
+    def flaky_get_object(**kwargs: Any) -> Any:
+        calls.append(kwargs)
+        response = get_object(**kwargs)
+        if len(calls) == 1:
+            response["Body"] = _FailingBody()
+        return response
+
+    monkeypatch.setattr(s3_client, "get_object", flaky_get_object)
+    json_actual = s3_utils.read_json(bucket=json_bucket.name, key=JSON_FILE_KEY)
+
+    assert json_actual == JSON_OBJECT
+    assert len(calls) == 2
+    assert calls[1]["IfMatch"] == json_bucket.Object(JSON_FILE_KEY).e_tag
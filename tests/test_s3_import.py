@@ -0,0 +1,18 @@
+"""Test cases for the import cost of the s3 module."""
+import subprocess
+import sys
+
+
+def test_import_does_not_load_heavy_dependencies() -> None:
+    """Tests that importing the s3 module doesn't import pandas, numpy or joblib."""
+    code = (
+        "import sys\n"
+        "import talus_aws_utils.s3\n"
+        "heavy = ['pandas', 'numpy', 'pyarrow', 'joblib', 'hurry.filesize']\n"
+        "print(','.join(m for m in heavy if m in sys.modules))\n"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+
+    assert result.stdout.strip() == ""
@@ -0,0 +1,89 @@
+"""Test cases for streaming JSON Lines reads and writes."""
+import gzip
+import json
+
+from typing import Any, Dict, Iterator
+
+import pandas as pd
+import pytest
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+
+def _records(count: int) -> Iterator[Dict[str, Any]]:
+    for i in range(count):
+        yield {"id": i, "peptide": "PEPTIDE" * (i % 5)}
+
+
+def test_jsonl_round_trip(bucket: Bucket) -> None:
+    """Tests writing and streaming back plain and gzipped records."""
+    for key in ("records.jsonl", "records.jsonl.gz"):
+        assert s3_utils.write_jsonl(_records(100), bucket.name, key) == 100
+
+        assert list(s3_utils.iter_jsonl(bucket.name, key)) == list(_records(100))
+
+    body = bucket.Object("records.jsonl.gz").get()["Body"].read()
+    lines = gzip.decompress(body).decode("utf-8").splitlines()
+    assert json.loads(lines[1]) == {"id": 1, "peptide": "PEPTIDE"}
+
+
+def test_iter_jsonl_batches(bucket: Bucket) -> None:
+    """Tests reading records in batches and as DataFrames."""
+    body = "\n".join(json.dumps(record) for record in _records(25)) + "\n\n"
+    bucket.put_object(Key="records.jsonl", Body=body.encode("utf-8"))
+
+    batches = list(s3_utils.iter_jsonl(bucket.name, "records.jsonl", batch_size=10))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+
+    dataframes = list(
+        s3_utils.iter_jsonl(
+            bucket.name, "records.jsonl", batch_size=20, as_dataframe=True
+        )
+    )
+    assert [len(df) for df in dataframes] == [20, 5]
+    pd.testing.assert_frame_equal(
+        pd.concat(dataframes, ignore_index=True),
+        pd.DataFrame.from_records(list(_records(25))),
+    )
+
+
+def test_write_jsonl_multipart(bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests uploading records in parts, including DataFrames of records."""
+    monkeypatch.setattr(s3_utils, "READ_CHUNK_SIZE", 1000)
+    part_size = 5 * 1024**2
+    records = list(_records(150000))
+    dataframe = pd.DataFrame.from_records(records[:1000])
+
+    count = s3_utils.write_jsonl(
+        [dataframe] + records[1000:], bucket.name, "records.jsonl", part_size=part_size
+    )
+
+    assert count == len(records)
+    assert bucket.Object("records.jsonl").content_length > part_size
+    assert "-" in bucket.Object("records.jsonl").e_tag
+    assert list(s3_utils.iter_jsonl(bucket.name, "records.jsonl")) == records
+
+
+def test_write_jsonl_abort(bucket: Bucket) -> None:
+    """Tests that a failing record iterable leaves no object behind."""
+
+    def failing() -> Iterator[Dict[str, Any]]:
+        yield {"id": 0}
+        raise RuntimeError("Upstream failure.")
+
+    with pytest.raises(RuntimeError):
+        s3_utils.write_jsonl(failing(), bucket.name, "records.jsonl")
+
+    assert list(bucket.objects.all()) == []
+
+
+def test_jsonl_errors(bucket: Bucket) -> None:
+    """Tests missing objects and invalid arguments."""
+    with pytest.raises(ValueError):
+        list(s3_utils.iter_jsonl(bucket.name, "missing.jsonl"))
+    with pytest.raises(ValueError):
+        s3_utils.write_jsonl([], bucket.name, "records.jsonl", compression="zstd")
+    with pytest.raises(ValueError):
+        s3_utils.write_jsonl([], bucket.name, "records.jsonl", part_size=1024)
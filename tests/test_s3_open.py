@@ -0,0 +1,116 @@
+"""Test cases for reading S3 objects as file objects."""
+import io
+
+from typing import Iterable
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from botocore.exceptions import ClientError
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+from talus_aws_utils import metrics
+
+
+BODY = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def recorder() -> Iterable[metrics.MetricsRecorder]:
+    """Fixture for a registered metrics recorder."""
+    recorder = metrics.MetricsRecorder()
+    metrics.register(recorder)
+    yield recorder
+    metrics.unregister(recorder)
+
+
+def _range_requests(recorder: metrics.MetricsRecorder) -> float:
+    return float(
+        sum(
+            row["value"]
+            for row in recorder.summary()
+            if row["name"] == "requests" and row["operation"] == "read_range"
+        )
+    )
+
+
+def test_open_object_seek_and_read(bucket: Bucket) -> None:
+    """Tests random access reads across block boundaries."""
+    bucket.put_object(Key="data.bin", Body=BODY)
+
+    with s3_utils.open_object(bucket.name, "data.bin", block_size=1000) as f:
+        assert f.seekable() and f.readable()
+        assert f.read(10) == BODY[:10]
+        f.seek(2995)
+        assert f.read(10) == BODY[2995:3005]
+        assert f.tell() == 3005
+        f.seek(-5, io.SEEK_END)
+        assert f.read() == BODY[-5:]
+        assert f.read(10) == b""
+        f.seek(0)
+        assert f.read() == BODY
+
+
+def test_open_object_readahead(
+    bucket: Bucket, recorder: metrics.MetricsRecorder
+) -> None:
+    """Tests that sequential reads fetch several blocks per request."""
+    bucket.put_object(Key="data.bin", Body=BODY)
+
+    with s3_utils.open_object(
+        bucket.name, "data.bin", block_size=1000, readahead_blocks=3
+    ) as f:
+        chunks = iter(lambda: f.read(100), b"")
+        assert b"".join(chunks) == BODY
+    # 11 blocks of 1000 bytes, fetched 4 at a time.
+    assert _range_requests(recorder) == 3
+
+    recorder.reset()
+    with s3_utils.open_object(
+        bucket.name, "data.bin", block_size=1000, readahead_blocks=0
+    ) as f:
+        f.seek(5000)
+        assert f.read(10) == BODY[5000:5010]
+    assert _range_requests(recorder) == 1
+
+
+def test_open_object_formats(bucket: Bucket) -> None:
+    """Tests passing the reader to parquet, numpy and joblib readers."""
+    dataframe = pd.DataFrame({"a": range(100), "b": [str(i) for i in range(100)]})
+    s3_utils.write_dataframe(dataframe, bucket.name, "data.parquet")
+    with s3_utils.open_object(bucket.name, "data.parquet", block_size=512) as f:
+        result = pd.read_parquet(f, columns=["b"])
+    pd.testing.assert_frame_equal(result, dataframe[["b"]])
+
+    array = np.arange(1000)
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    bucket.put_object(Key="array.npy", Body=buffer.getvalue())
+    with s3_utils.open_object(bucket.name, "array.npy", block_size=512) as f:
+        np.testing.assert_array_equal(np.load(f), array)
+
+    s3_utils.write_joblib({"weights": array}, bucket.name, "model.joblib")
+    with s3_utils.open_object(bucket.name, "model.joblib", block_size=512) as f:
+        np.testing.assert_array_equal(joblib.load(f)["weights"], array)
+
+
+def test_open_object_overwritten(bucket: Bucket) -> None:
+    """Tests that reads fail once the object is overwritten."""
+    bucket.put_object(Key="data.bin", Body=BODY)
+
+    with s3_utils.open_object(bucket.name, "data.bin", block_size=1000) as f:
+        f.read(10)
+        bucket.put_object(Key="data.bin", Body=BODY[::-1])
+        f.seek(5000)
+        with pytest.raises(ClientError, match="PreconditionFailed"):
+            f.read(10)
+
+
+def test_open_object_missing(bucket: Bucket) -> None:
+    """Tests opening a missing object."""
+    with pytest.raises(ValueError):
+        s3_utils.open_object(bucket.name, "missing.bin")
@@ -0,0 +1,109 @@
+"""Test cases for prefetching objects from S3."""
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+
+@pytest.fixture(autouse=True)
+def clear_prefetched() -> Iterable[None]:
+    """Drop prefetched objects after each test."""
+    yield
+    s3_utils.clear_prefetched()
+
+
+@pytest.fixture
+def objects_bucket(bucket: Bucket) -> Bucket:
+    """Fixture for a bucket with a dataframe, json and numpy array."""
+    s3_utils.write_dataframe(pd.DataFrame({"a": [1, 2]}), bucket.name, "df.parquet")
+    s3_utils.write_json({"a": 1}, bucket.name, "a.json")
+    s3_utils.write_numpy_array(np.arange(3), bucket.name, "a.npy")
+    return bucket
+
+
+def _delete_all(bucket: Bucket) -> None:
+    bucket.objects.all().delete()
+
+
+def test_prefetch(objects_bucket: Bucket) -> None:
+    """Tests that prefetched objects are read from memory, once."""
+    futures = s3_utils.prefetch(objects_bucket.name, ["df.parquet", "a.json", "a.npy"])
+    for future in futures.values():
+        future.result()
+    _delete_all(objects_bucket)
+
+    dataframe = s3_utils.read_dataframe(objects_bucket.name, "df.parquet")
+    assert dataframe["a"].tolist() == [1, 2]
+    assert s3_utils.read_json(objects_bucket.name, "a.json") == {"a": 1}
+    array = s3_utils.read_numpy_array(objects_bucket.name, "a.npy")
+    np.testing.assert_array_equal(array, np.arange(3))
+
+    with pytest.raises(ValueError):
+        s3_utils.read_json(objects_bucket.name, "a.json")
+
+
+def test_prefetch_directory(objects_bucket: Bucket, tmp_path: Path) -> None:
+    """Tests prefetching objects to local files."""
+    futures = s3_utils.prefetch(objects_bucket.name, ["a.json"], str(tmp_path))
+    path = futures["a.json"].result()
+    _delete_all(objects_bucket)
+
+    assert path == str(tmp_path / objects_bucket.name / "a.json")
+    assert s3_utils.read_json(objects_bucket.name, "a.json") == {"a": 1}
+
+
+def test_prefetch_missing(bucket: Bucket) -> None:
+    """Tests that errors of prefetched downloads are raised when read."""
+    futures = s3_utils.prefetch(bucket.name, ["missing.json"])
+
+    with pytest.raises(ValueError):
+        futures["missing.json"].result()
+    with pytest.raises(ValueError):
+        s3_utils.read_json(bucket.name, "missing.json")
+
+
+def test_prefetch_invalidated(objects_bucket: Bucket) -> None:
+    """Tests that writes, copies and deletes drop prefetched objects."""
+    name = objects_bucket.name
+    s3_utils.prefetch(name, ["a.json", "b.json", "df.parquet"])["a.json"].result()
+    s3_utils.write_json({"a": 2}, name, "a.json")
+    assert s3_utils.read_json(name, "a.json") == {"a": 2}
+
+    s3_utils.write_json({"b": 1}, name, "b.json")
+    s3_utils.prefetch(name, ["b.json"])["b.json"].result()
+    s3_utils.copy_object(name, "a.json", name, "b.json")
+    assert s3_utils.read_json(name, "b.json") == {"a": 2}
+
+    s3_utils.prefetch(name, ["a.json"])["a.json"].result()
+    s3_utils.delete_keys(name, ["a.json"])
+    with pytest.raises(ValueError):
+        s3_utils.read_json(name, "a.json")
+
+
+def test_prefetch_directory_traversal(bucket: Bucket, tmp_path: Path) -> None:
+    """Tests that keys can't be prefetched outside of the directory."""
+    with pytest.raises(ValueError, match="outside"):
+        s3_utils.prefetch(bucket.name, ["a.json", "../../a.json"], str(tmp_path))
+
+    assert s3_utils._PREFETCHED == {}
+
+
+def test_prefetch_eviction(objects_bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests that unread prefetched objects are dropped."""
+    monkeypatch.setattr(s3_utils, "PREFETCH_MAX_OBJECTS", 2)
+    s3_utils.prefetch(objects_bucket.name, ["df.parquet", "a.json", "a.npy"])
+
+    assert list(s3_utils._PREFETCHED) == [
+        (objects_bucket.name, "a.json"),
+        (objects_bucket.name, "a.npy"),
+    ]
+
+    monkeypatch.setattr(s3_utils, "PREFETCH_TTL", 0.0)
+    s3_utils.prefetch(objects_bucket.name, [])
+    assert s3_utils._PREFETCHED == {}
@@ -0,0 +1,49 @@
+"""Test cases for reading many objects from S3."""
+from typing import Optional
+
+import pandas as pd
+import pytest
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_read_dataframes(bucket: Bucket, processes: Optional[int]) -> None:
+    """Tests reading dataframes in threads and in decoding processes."""
+    dataframes = [
+        pd.DataFrame({"peptide": [f"PEPTIDE{i}", "K"], "score": [0.5 * i, 1.0]})
+        for i in range(4)
+    ]
+    keys = [f"results/{i}.csv" for i in range(3)] + ["results/3.parquet"]
+    for dataframe, key in zip(dataframes, keys):
+        s3_utils.write_dataframe(dataframe, bucket.name, key)
+
+    results = s3_utils.read_dataframes(bucket.name, keys, processes=processes)
+
+    assert len(results) == len(keys)
+    for result, dataframe in zip(results, dataframes):
+        pd.testing.assert_frame_equal(result, dataframe)
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_read_jsons(bucket: Bucket, processes: Optional[int]) -> None:
+    """Tests reading json objects in threads and in decoding processes."""
+    keys = [f"status/{i}.json" for i in range(5)]
+    for i, key in enumerate(keys):
+        s3_utils.write_json({"index": i}, bucket.name, key)
+
+    results = s3_utils.read_jsons(bucket.name, keys, processes=processes)
+
+    assert results == [{"index": i} for i in range(5)]
+
+
+def test_read_dataframes_errors(bucket: Bucket) -> None:
+    """Tests that decoding errors of worker processes are raised."""
+    s3_utils.write_json({}, bucket.name, "results/0.json")
+
+    with pytest.raises(ValueError):
+        s3_utils.read_dataframes(bucket.name, ["results/0.json"], processes=1)
+    with pytest.raises(ValueError):
+        s3_utils.read_dataframes(bucket.name, ["results/missing.csv"])
@@ -0,0 +1,73 @@
+"""Test cases for skipping writes of unchanged content."""
+import hashlib
+
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+from talus_aws_utils import tracing
+
+
+DATAFRAME = pd.DataFrame({"peptide": ["PEPTIDE", "PEPTIDES"], "score": [0.1, 0.2]})
+
+
+def _put_count(t: tracing.Trace) -> int:
+    return sum(1 for span in t.spans if span.name == "PutObject")
+
+
+@pytest.mark.parametrize("key", ["results.parquet", "results.csv", "results.tsv"])
+def test_write_dataframe_skip_if_unchanged(bucket: Bucket, key: str) -> None:
+    """Tests that rewriting an unchanged dataframe skips the upload."""
+    with tracing.trace() as t:
+        assert s3_utils.write_dataframe(
+            DATAFRAME, bucket.name, key, skip_if_unchanged=True
+        )
+        assert not s3_utils.write_dataframe(
+            DATAFRAME, bucket.name, key, skip_if_unchanged=True
+        )
+        assert s3_utils.write_dataframe(
+            DATAFRAME.head(1), bucket.name, key, skip_if_unchanged=True
+        )
+    assert _put_count(t) == 2
+    pd.testing.assert_frame_equal(
+        s3_utils.read_dataframe(bucket.name, key), DATAFRAME.head(1)
+    )
+
+
+def test_write_skip_if_unchanged_formats(bucket: Bucket) -> None:
+    """Tests skipping unchanged json, joblib and numpy writes."""
+    array = np.arange(10)
+    writes: List[Callable[[], bool]] = [
+        lambda: s3_utils.write_json({"a": 1}, bucket.name, "a.json", True),
+        lambda: s3_utils.write_joblib({"w": array}, bucket.name, "m.joblib", True),
+        lambda: s3_utils.write_numpy_array(array, bucket.name, "a.npy", True),
+    ]
+    assert all(write() for write in writes)
+    assert not any(write() for write in writes)
+    # Without the option the upload always happens.
+    assert s3_utils.write_json({"a": 1}, bucket.name, "a.json")
+
+
+def test_skip_if_unchanged_etag(bucket: Bucket) -> None:
+    """Tests comparing against the ETag of objects written by others."""
+    bucket.put_object(Key="a.json", Body=b'{"a": 1}')
+
+    assert not s3_utils.write_json({"a": 1}, bucket.name, "a.json", True)
+
+
+def test_hashing_buffer() -> None:
+    """Tests the incremental md5, including writers that seek back."""
+    buffer = s3_utils._HashingBuffer()
+    buffer.write(b"abc")
+    buffer.write(memoryview(b"def"))
+    assert buffer.hexdigest() == hashlib.md5(b"abcdef").hexdigest()
+
+    buffer.seek(0)
+    buffer.write(b"x")
+    assert buffer.hexdigest() == hashlib.md5(b"xbcdef").hexdigest()
@@ -0,0 +1,55 @@
+"""Test cases for reading and writing sparse matrices."""
+import sys
+
+from typing import Any
+
+import pytest
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+
+# scipy is an optional dependency of the sparse matrix functions.
+sparse = pytest.importorskip("scipy.sparse")
+
+
+@pytest.mark.parametrize("fmt", ["csr", "csc", "coo"])
+def test_sparse_matrix_roundtrip(bucket: Bucket, fmt: str) -> None:
+    """Tests writing and reading sparse matrices in their format."""
+    matrix = sparse.random(200, 50, density=0.01, format=fmt, random_state=0)
+
+    assert s3_utils.write_sparse_matrix(matrix, bucket.name, "matrix.npz")
+    result = s3_utils.read_sparse_matrix(bucket.name, "matrix.npz")
+
+    assert result.format == fmt
+    assert (result != matrix).nnz == 0
+
+
+def test_sparse_matrix_compressed(bucket: Bucket) -> None:
+    """Tests that compression shrinks the object and skipping unchanged writes."""
+    matrix = sparse.eye(10000, format="csr")
+
+    s3_utils.write_sparse_matrix(matrix, bucket.name, "raw.npz")
+    assert s3_utils.write_sparse_matrix(
+        matrix, bucket.name, "compressed.npz", compressed=True, skip_if_unchanged=True
+    )
+
+    raw_size = bucket.Object("raw.npz").content_length
+    assert bucket.Object("compressed.npz").content_length < raw_size / 2
+    result = s3_utils.read_sparse_matrix(bucket.name, "compressed.npz")
+    assert (result != matrix).nnz == 0
+    assert not s3_utils.write_sparse_matrix(
+        matrix, bucket.name, "compressed.npz", compressed=True, skip_if_unchanged=True
+    )
+
+
+def test_sparse_matrix_without_scipy(bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests that a missing scipy names the extra to install."""
+    monkeypatch.setitem(sys.modules, "scipy", None)
+    monkeypatch.setitem(sys.modules, "scipy.sparse", None)
+
+    with pytest.raises(ImportError, match=r"talus-aws-utils\[sparse\]"):
+        s3_utils.read_sparse_matrix(bucket.name, "matrix.npz")
+    with pytest.raises(ImportError, match=r"talus-aws-utils\[sparse\]"):
+        s3_utils.write_sparse_matrix(sparse.eye(3), bucket.name, "matrix.npz")
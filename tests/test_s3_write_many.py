@@ -0,0 +1,93 @@
+"""Test cases for concurrent batch writes."""
+import json
+
+from typing import Any, List
+
+import pandas as pd
+
+from botocore.exceptions import ClientError
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+from talus_aws_utils import metrics
+from talus_aws_utils.clients import get_client
+
+
+def _dataframe(i: int) -> pd.DataFrame:
+    return pd.DataFrame({"sample": [i] * 3, "peptide": ["A", "B", "C"]})
+
+
+def test_write_dataframes(bucket: Bucket) -> None:
+    """Tests writing DataFrames from a generator and skipping unchanged ones."""
+    keys = [f"samples/{i}.{fmt}" for i, fmt in enumerate(["parquet", "csv", "tsv"])]
+    items = ((_dataframe(i), key) for i, key in enumerate(keys))
+
+    result = s3_utils.write_dataframes(items, bucket.name, max_workers=2)
+
+    assert sorted(result.written) == sorted(keys)
+    assert result.errors == {}
+    for i, dataframe in enumerate(s3_utils.read_dataframes(bucket.name, keys)):
+        pd.testing.assert_frame_equal(dataframe, _dataframe(i))
+
+    result = s3_utils.write_dataframes(
+        [(_dataframe(0), keys[0]), (_dataframe(9), keys[1])],
+        bucket.name,
+        skip_if_unchanged=True,
+    )
+    assert result.written == [keys[1]]
+    assert result.skipped == [keys[0]]
+
+
+def test_write_jsons_processes(bucket: Bucket) -> None:
+    """Tests encoding json objects on a process pool."""
+    items = [({"sample": i}, f"samples/{i}.json") for i in range(4)]
+
+    result = s3_utils.write_jsons(items, bucket.name, processes=2)
+
+    assert sorted(result.written) == [key for _, key in items]
+    for obj, key in items:
+        assert json.loads(bucket.Object(key).get()["Body"].read()) == obj
+
+
+def test_write_many_errors(bucket: Bucket) -> None:
+    """Tests that failed keys are reported without stopping the batch."""
+    result = s3_utils.write_dataframes(
+        [(_dataframe(0), "a.parquet"), (_dataframe(1), "b.xlsx")], bucket.name
+    )
+
+    assert result.written == ["a.parquet"]
+    assert list(result.errors) == ["b.xlsx"]
+    assert result.errors["b.xlsx"].startswith("ValueError")
+
+    result = s3_utils.write_jsons([({}, "a.json")], "missing-bucket")
+    assert "NoSuchBucket" in result.errors["a.json"]
+
+
+def test_write_many_retry(bucket: Bucket, monkeypatch: Any) -> None:
+    """Tests that throttled uploads are retried."""
+    s3_client = get_client("s3")
+    put_object = s3_client.put_object
+    failures: List[str] = []
+
+    def throttled_put_object(**kwargs: Any) -> Any:
+        if not failures:
+            failures.append(kwargs["Key"])
+            error: Any = {
+                "Error": {"Code": "SlowDown", "Message": ""},
+                "ResponseMetadata": {"HTTPStatusCode": 503},
+            }
+            raise ClientError(error, "PutObject")
+        return put_object(**kwargs)
+
+    monkeypatch.setattr(s3_client, "put_object", throttled_put_object)
+    recorder = metrics.register(metrics.MetricsRecorder())
+    try:
+        result = s3_utils.write_jsons([({"a": 1}, "a.json")], bucket.name)
+    finally:
+        metrics.unregister(recorder)
+
+    assert result.written == ["a.json"]
+    assert failures == ["a.json"]
+    retries = [row for row in recorder.summary() if row["name"] == "write_retries"]
+    assert retries[0]["value"] == 1
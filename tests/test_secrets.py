@@ -0,0 +1,228 @@
+"""Test cases for the secrets module."""
+import base64
+import json
+
+from typing import Any, Iterable
+
+import boto3
+import pytest
+
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+from moto import mock_secretsmanager
+
+import talus_aws_utils.secrets as secrets_utils
+
+
+REGION = "us-west-2"
+STRING_SECRET_NAME = "string_secret"
+BINARY_SECRET_NAME = "binary_secret"
+STRING_SECRET_EXPECTED = {"user": "talus", "password": "hunter2"}
+BINARY_SECRET_EXPECTED = {"token": "abc123"}
+
+
+@pytest.fixture(autouse=True)
+def clear_secret_cache() -> Iterable[None]:
+    """Clear the secret cache before and after each test."""
+    secrets_utils.clear_cache()
+    yield
+    secrets_utils.clear_cache()
+
+
+@pytest.fixture
+def secrets_client() -> Iterable[Any]:
+    """Fixture for a Secrets Manager with a string and a binary secret."""
+    with mock_secretsmanager():
+        client = boto3.client("secretsmanager", region_name=REGION)
+        client.create_secret(
+            Name=STRING_SECRET_NAME, SecretString=json.dumps(STRING_SECRET_EXPECTED)
+        )
+        client.create_secret(
+            Name=BINARY_SECRET_NAME,
+            SecretBinary=base64.b64encode(
+                json.dumps(BINARY_SECRET_EXPECTED).encode("utf-8")
+            ),
+        )
+        yield client
+
+
+def test_get_secret(secrets_client: Any) -> None:
+    """Tests get_secret for string and binary secrets."""
+    assert (
+        secrets_utils.get_secret(STRING_SECRET_NAME, REGION) == STRING_SECRET_EXPECTED
+    )
+    assert (
+        secrets_utils.get_secret(BINARY_SECRET_NAME, REGION) == BINARY_SECRET_EXPECTED
+    )
+
+
+def test_get_secret_cached(secrets_client: Any) -> None:
+    """Tests that get_secret only serves lookups from the cache on request."""
+    secret = secrets_utils.get_secret(STRING_SECRET_NAME, REGION, use_cache=True)
+    secret["password"] = "changed"
+    secrets_client.update_secret(SecretId=STRING_SECRET_NAME, SecretString="{}")
+
+    # Callers get copies, so mutating them doesn't change the cache
+    assert (
+        secrets_utils.get_secret(STRING_SECRET_NAME, REGION, use_cache=True)
+        == STRING_SECRET_EXPECTED
+    )
+    assert secrets_utils.get_secret(STRING_SECRET_NAME, REGION) == {}
+
+
+def test_get_secrets_fallback(secrets_client: Any, monkeypatch: Any) -> None:
+    """Tests get_secrets falling back to concurrent single calls."""
+
+    def access_denied(client: Any, secret_names: Any) -> None:
+        raise ClientError(
+            {"Error": {"Code": "AccessDeniedException", "Message": ""}},
+            "BatchGetSecretValue",
+        )
+
+    monkeypatch.setattr(secrets_utils, "_batch_get_secret_values", access_denied)
+    secrets_actual = secrets_utils.get_secrets(
+        [STRING_SECRET_NAME, BINARY_SECRET_NAME], REGION, use_cache=True
+    )
+
+    assert secrets_actual == {
+        STRING_SECRET_NAME: STRING_SECRET_EXPECTED,
+        BINARY_SECRET_NAME: BINARY_SECRET_EXPECTED,
+    }
+    # get_secret is served from the cache filled by get_secrets
+    monkeypatch.setattr(secrets_utils, "get_client", None)
+    assert (
+        secrets_utils.get_secret(BINARY_SECRET_NAME, REGION, use_cache=True)
+        == BINARY_SECRET_EXPECTED
+    )
+
+
+def test_get_secrets_fallback_not_found(secrets_client: Any, monkeypatch: Any) -> None:
+    """Tests that get_secrets raises if a secret doesn't exist."""
+
+    def access_denied(client: Any, secret_names: Any) -> None:
+        raise ClientError(
+            {"Error": {"Code": "AccessDeniedException", "Message": ""}},
+            "BatchGetSecretValue",
+        )
+
+    monkeypatch.setattr(secrets_utils, "_batch_get_secret_values", access_denied)
+    with pytest.raises(ClientError):
+        _ = secrets_utils.get_secrets([STRING_SECRET_NAME, "random_secret"], REGION)
+
+
+def test_get_secrets_batch(monkeypatch: Any) -> None:
+    """Tests get_secrets using the BatchGetSecretValue API."""
+    client = boto3.client(
+        "secretsmanager",
+        region_name=REGION,
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    )
+    stubber = Stubber(client)
+    stubber.add_response(
+        "batch_get_secret_value",
+        {
+            "SecretValues": [
+                {
+                    "Name": STRING_SECRET_NAME,
+                    "SecretString": json.dumps(STRING_SECRET_EXPECTED),
+                },
+                {
+                    "Name": BINARY_SECRET_NAME,
+                    "ARN": "arn:aws:secretsmanager:us-west-2:123:secret:binary-AbCdEf",
+                    "SecretBinary": base64.b64encode(
+                        json.dumps(BINARY_SECRET_EXPECTED).encode("utf-8")
+                    ),
+                },
+            ],
+            "Errors": [],
+        },
+        {
+            "SecretIdList": [
+                STRING_SECRET_NAME,
+                "arn:aws:secretsmanager:us-west-2:123:secret:binary",
+            ]
+        },
+    )
+    monkeypatch.setattr(secrets_utils, "get_client", lambda *args, **kwargs: client)
+
+    with stubber:
+        secrets_actual = secrets_utils.get_secrets(
+            [STRING_SECRET_NAME, "arn:aws:secretsmanager:us-west-2:123:secret:binary"],
+            REGION,
+        )
+        stubber.assert_no_pending_responses()
+
+    assert secrets_actual == {
+        STRING_SECRET_NAME: STRING_SECRET_EXPECTED,
+        "arn:aws:secretsmanager:us-west-2:123:secret:binary": BINARY_SECRET_EXPECTED,
+    }
+
+
+def test_get_secrets_batch_unmatched(monkeypatch: Any) -> None:
+    """Tests that get_secrets raises if a requested secret isn't returned."""
+    client = boto3.client(
+        "secretsmanager",
+        region_name=REGION,
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    )
+    stubber = Stubber(client)
+    stubber.add_response(
+        "batch_get_secret_value",
+        {
+            "SecretValues": [
+                {
+                    "Name": "other_secret",
+                    "ARN": "arn:aws:secretsmanager:us-west-2:123:secret:other-AbCdEf",
+                    "SecretString": json.dumps(STRING_SECRET_EXPECTED),
+                },
+            ],
+            "Errors": [],
+        },
+        {"SecretIdList": [STRING_SECRET_NAME]},
+    )
+    monkeypatch.setattr(secrets_utils, "get_client", lambda *args, **kwargs: client)
+
+    with stubber, pytest.raises(ClientError, match=STRING_SECRET_NAME):
+        _ = secrets_utils.get_secrets([STRING_SECRET_NAME], REGION)
+
+
+def test_get_secrets_batch_partial_arn_sibling(monkeypatch: Any) -> None:
+    """Tests that a partial ARN doesn't match secrets extending its name."""
+    partial_arn = "arn:aws:secretsmanager:us-west-2:123:secret:db"
+    client = boto3.client(
+        "secretsmanager",
+        region_name=REGION,
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    )
+    stubber = Stubber(client)
+    stubber.add_response(
+        "batch_get_secret_value",
+        {
+            "SecretValues": [
+                {
+                    "Name": "db",
+                    "ARN": f"{partial_arn}-AbCdEf",
+                    "SecretString": json.dumps(STRING_SECRET_EXPECTED),
+                },
+                {
+                    "Name": "db-prod",
+                    "ARN": f"{partial_arn}-prod-GhIjKl",
+                    "SecretString": json.dumps(BINARY_SECRET_EXPECTED),
+                },
+            ],
+            "Errors": [],
+        },
+        {"SecretIdList": [partial_arn, "db-prod"]},
+    )
+    monkeypatch.setattr(secrets_utils, "get_client", lambda *args, **kwargs: client)
+
+    with stubber:
+        secrets_actual = secrets_utils.get_secrets([partial_arn, "db-prod"], REGION)
+
+    assert secrets_actual == {
+        partial_arn: STRING_SECRET_EXPECTED,
+        "db-prod": BINARY_SECRET_EXPECTED,
+    }
@@ -0,0 +1,182 @@
+"""Test cases for syncing directories with S3."""
+import hashlib
+import os
+import threading
+
+from pathlib import Path
+from typing import Any, List, Tuple
+
+import pytest
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.sync as sync_utils
+
+
+FILES = {
+    "a.txt": b"alpha",
+    "nested/b.json": b'{"b": 1}',
+    "nested/deeper/c.csv": b"c\n1\n",
+}
+
+
+def _make_tree(directory: Path) -> None:
+    for relative, body in FILES.items():
+        path = directory / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+
+
+def test_upload_directory(bucket: Bucket, tmp_path: Path) -> None:
+    """Tests uploading a directory and skipping unchanged files."""
+    _make_tree(tmp_path)
+    progress: List[Tuple[int, int]] = []
+
+    result = sync_utils.upload_directory(
+        str(tmp_path), bucket.name, "run1", progress=lambda *args: progress.append(args)
+    )
+
+    assert sorted(result.transferred) == sorted(FILES)
+    assert result.skipped == []
+    assert progress[-1] == (3, 3)
+    for relative, body in FILES.items():
+        assert bucket.Object(f"run1/{relative}").get()["Body"].read() == body
+
+    (tmp_path / "a.txt").write_bytes(b"ALPHA!")
+    result = sync_utils.upload_directory(str(tmp_path), bucket.name, "run1/")
+
+    assert result.transferred == ["a.txt"]
+    assert len(result.skipped) == 2
+
+
+def test_download_directory(bucket: Bucket, tmp_path: Path) -> None:
+    """Tests downloading a prefix with the remote modification times."""
+    for relative, body in FILES.items():
+        bucket.put_object(Key=f"run1/{relative}", Body=body)
+    bucket.put_object(Key="run10/other.txt", Body=b"other")
+
+    result = sync_utils.download_directory(bucket.name, "run1", str(tmp_path))
+
+    assert sorted(result.transferred) == sorted(FILES)
+    for relative, body in FILES.items():
+        assert (tmp_path / relative).read_bytes() == body
+    assert not (tmp_path / "other.txt").exists()
+    last_modified = bucket.Object("run1/a.txt").last_modified.timestamp()
+    assert os.stat(tmp_path / "a.txt").st_mtime == pytest.approx(last_modified)
+
+    result = sync_utils.download_directory(
+        bucket.name, "run1", str(tmp_path), compare="mtime"
+    )
+    assert result.transferred == []
+
+
+def test_sync_etag(bucket: Bucket, tmp_path: Path) -> None:
+    """Tests that etag comparison detects same-size changes."""
+    _make_tree(tmp_path)
+    sync_utils.sync(str(tmp_path), f"s3://{bucket.name}/run1")
+
+    result = sync_utils.sync(str(tmp_path), f"s3://{bucket.name}/run1", "etag")
+    assert result.transferred == []
+
+    (tmp_path / "a.txt").write_bytes(b"ALPHA")
+    result = sync_utils.sync(str(tmp_path), f"s3://{bucket.name}/run1", "size")
+    assert result.transferred == []
+    result = sync_utils.sync(str(tmp_path), f"s3://{bucket.name}/run1", "etag")
+    assert result.transferred == ["a.txt"]
+
+    download = tmp_path / "download"
+    result = sync_utils.sync(f"s3://{bucket.name}/run1/", str(download), "etag")
+    assert (download / "a.txt").read_bytes() == b"ALPHA"
+
+
+def test_upload_directory_same_size(bucket: Bucket, tmp_path: Path) -> None:
+    """Tests that the default comparison detects same-size edits."""
+    (tmp_path / "f.txt").write_bytes(b"AAAA")
+    sync_utils.sync(str(tmp_path), f"s3://{bucket.name}/run1")
+
+    (tmp_path / "f.txt").write_bytes(b"BBBB")
+    result = sync_utils.sync(str(tmp_path), f"s3://{bucket.name}/run1")
+
+    assert result.transferred == ["f.txt"]
+    assert bucket.Object("run1/f.txt").get()["Body"].read() == b"BBBB"
+
+
+def test_sync_compares_on_pool(
+    bucket: Bucket, tmp_path: Path, monkeypatch: Any
+) -> None:
+    """Tests that unchanged files are hashed on the transfer threads."""
+    _make_tree(tmp_path)
+    sync_utils.sync(str(tmp_path), f"s3://{bucket.name}/run1")
+    etag_matches = sync_utils._etag_matches
+    threads: List[threading.Thread] = []
+
+    def record_thread(*args: Any) -> bool:
+        threads.append(threading.current_thread())
+        return etag_matches(*args)
+
+    monkeypatch.setattr(sync_utils, "_etag_matches", record_thread)
+    progress: List[Tuple[int, int]] = []
+    result = sync_utils.sync(
+        str(tmp_path),
+        f"s3://{bucket.name}/run1",
+        progress=lambda *args: progress.append(args),
+    )
+
+    assert result.transferred == []
+    assert sorted(result.skipped) == sorted(FILES)
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
+    assert progress[0] == (0, 3) and progress[-1] == (3, 3)
+
+
+def test_download_directory_traversal(bucket: Bucket, tmp_path: Path) -> None:
+    """Tests that keys can't be downloaded outside of the directory."""
+    bucket.put_object(Key="dl/a.txt", Body=b"a")
+    bucket.put_object(Key="dl/../../escaped.txt", Body=b"escaped")
+
+    with pytest.raises(ValueError, match="outside"):
+        sync_utils.download_directory(bucket.name, "dl", str(tmp_path / "dl"))
+
+    assert not (tmp_path / "escaped.txt").exists()
+    assert not (tmp_path / "dl").exists()
+
+
+def test_etag_matches_chunks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests hashing files in chunks smaller than their parts."""
+    monkeypatch.setattr(sync_utils, "HASH_CHUNK_SIZE", 7)
+    path = tmp_path / "small.bin"
+    body = os.urandom(100)
+    path.write_bytes(body)
+
+    assert sync_utils._etag_matches(
+        str(path), 100, f'"{hashlib.md5(body).hexdigest()}"'
+    )
+    assert sync_utils._md5_parts(str(path), 30) == [
+        hashlib.md5(body[i : i + 30]).digest() for i in range(0, 100, 30)
+    ]
+
+
+def test_etag_matches_multipart(tmp_path: Path) -> None:
+    """Tests the multipart ETag computation of a local file."""
+    path = tmp_path / "large.bin"
+    body = os.urandom(sync_utils.MULTIPART_CHUNKSIZE + 10)
+    path.write_bytes(body)
+    parts = [
+        body[: sync_utils.MULTIPART_CHUNKSIZE],
+        body[sync_utils.MULTIPART_CHUNKSIZE :],
+    ]
+    digests = b"".join(hashlib.md5(part).digest() for part in parts)
+    etag = f'"{hashlib.md5(digests).hexdigest()}-2"'
+
+    assert sync_utils._etag_matches(str(path), len(body), etag)
+    assert not sync_utils._etag_matches(str(path), len(body), '"00-2"')
+
+
+def test_sync_invalid_arguments(tmp_path: Path) -> None:
+    """Tests invalid sync directions and compare modes."""
+    with pytest.raises(ValueError):
+        sync_utils.sync(str(tmp_path), str(tmp_path))
+    with pytest.raises(ValueError):
+        sync_utils.sync("s3://a/b", "s3://c/d")
+    with pytest.raises(ValueError):
+        sync_utils.upload_directory(str(tmp_path), "bucket", "prefix", "hash")
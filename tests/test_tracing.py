@@ -0,0 +1,54 @@
+"""Test cases for the tracing module."""
+import json
+
+from pathlib import Path
+
+import pandas as pd
+
+from mypy_boto3_s3.service_resource import Bucket
+
+import talus_aws_utils.s3 as s3_utils
+
+from talus_aws_utils import tracing
+
+
+DATAFRAME = pd.DataFrame({"peptide": ["PEPTIDE", "PEPTIDES", "PEPTIDER"]})
+PARQUET_FILE_KEY = "peptides.parquet"
+
+
+def test_trace_dataframe_roundtrip(bucket: Bucket, tmp_path: Path) -> None:
+    """Tests the spans recorded for write_dataframe and read_dataframe."""
+    with tracing.trace() as t:
+        s3_utils.write_dataframe(
+            dataframe=DATAFRAME, bucket=bucket.name, key=PARQUET_FILE_KEY
+        )
+        _ = s3_utils.read_dataframe(bucket=bucket.name, key=PARQUET_FILE_KEY)
+
+    summary = {row["name"]: row for row in t.summary()}
+    assert {"encode", "write_object", "PutObject"} <= set(summary)
+    assert {"read_object", "GetObject", "decode"} <= set(summary)
+    # Small objects are read with a single request.
+    assert "HeadObject" not in summary
+    assert summary["GetObject"]["count"] == 1
+    assert summary["encode"]["rows"] == summary["decode"]["rows"] == 3
+    object_size = summary["write_object"]["bytes"]
+    assert summary["PutObject"]["bytes"] == object_size
+    assert summary["GetObject"]["bytes"] == object_size
+    assert summary["read_object"]["bytes"] == object_size
+    assert "decode" in t.format_summary()
+
+    path = tmp_path.joinpath("trace.json")
+    t.save_chrome_trace(str(path))
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+    assert len(events) == len(t.spans)
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+
+def test_no_spans_outside_trace(bucket: Bucket) -> None:
+    """Tests that spans are only recorded within a trace block."""
+    with tracing.trace() as t:
+        pass
+    s3_utils.write_json(dict_obj={}, bucket=bucket.name, key="empty.json")
+
+    assert t.spans == []